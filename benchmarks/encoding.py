@@ -0,0 +1,60 @@
+"""
+Benchmark of encoding the event data into the bound values of the query
+tables: through a dictionary per row, as insert_data did, through
+DataFrame.itertuples, and through column arrays converted once.
+
+Usage (from the repository root):
+    python -m benchmarks.encoding [path_to_raw_event_data]
+"""
+import sys
+import timeit
+import pandas as pd
+from libs.databases.managers.tables import ColumnChunk
+from libs.files.collector import FileCollector
+from libs.files.readers.csv_reader import CSVReader
+from libs.files.readers.filters import notnull
+from libs.files.readers.schema import EVENT_SCHEMA
+from libs.pipeline.pipeline import EVENT_TABLES
+
+PATH_RAW_DATA = 'data/raw/event_data'
+# Copies of the data encoded, to measure more than a few thousand rows
+COPIES = 20
+
+
+def main(path=PATH_RAW_DATA, repeat=5):
+    reader = CSVReader(FileCollector(path).collect_files(), dtype=EVENT_SCHEMA,
+                       filters=[notnull('artist')])
+    data = pd.concat([reader.get_data()] * COPIES, ignore_index=True)
+    tables = [(table.column_names, table.column_types())
+              for table in EVENT_TABLES]
+
+    def dicts():
+        return [[list(row.values()) for row in
+                 data[columns].to_dict(orient='records')]
+                for columns, _ in tables]
+
+    def itertuples():
+        return [list(data[columns].itertuples(index=False, name=None))
+                for columns, _ in tables]
+
+    def column_arrays():
+        types = {}
+        for _, column_types in tables:
+            types.update(column_types)
+        chunk = ColumnChunk.from_frame(data, list(types), types)
+        return [list(chunk.rows(columns)) for columns, _ in tables]
+
+    rows = len(data) * len(tables)
+    print(f"rows: {len(data)} x {len(tables)} tables")
+    baseline = None
+    for name, func in (('dict per row', dicts), ('itertuples', itertuples),
+                       ('column arrays', column_arrays)):
+        elapsed = min(timeit.repeat(func, number=1, repeat=repeat))
+        baseline = baseline or elapsed
+        print(f"{name:<14} {elapsed * 1000:10.2f} ms  "
+              f"{rows / elapsed:12.0f} rows/s  "
+              f"speedup: {baseline / elapsed:5.1f}x")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
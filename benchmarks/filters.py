@@ -0,0 +1,38 @@
+"""
+Benchmark of the row-wise and the vectorized filters on the raw event data.
+
+Usage (from the repository root):
+    python -m benchmarks.filters [path_to_raw_event_data]
+"""
+import sys
+import timeit
+import pandas as pd
+from libs.files.collector import FileCollector
+from libs.files.readers.csv_reader import CSVReader
+from libs.files.readers.filters import filter_frame, notnull
+
+PATH_RAW_DATA = 'data/raw/event_data'
+
+
+def main(path=PATH_RAW_DATA, repeat=5):
+    data = CSVReader(FileCollector(path).collect_files()).get_data()
+
+    def row_wise():
+        return filter_frame(data, lambda row: pd.notnull(row['artist']))
+
+    def vectorized():
+        return filter_frame(data, notnull('artist'))
+
+    assert row_wise().equals(vectorized())
+
+    row_time = min(timeit.repeat(row_wise, number=1, repeat=repeat))
+    vector_time = min(timeit.repeat(vectorized, number=1, repeat=repeat))
+
+    print(f"rows: {len(data)}")
+    print(f"row-wise filter:   {row_time * 1000:10.2f} ms")
+    print(f"vectorized filter: {vector_time * 1000:10.2f} ms")
+    print(f"speedup:           {row_time / vector_time:10.1f}x")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
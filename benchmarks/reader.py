@@ -0,0 +1,59 @@
+"""
+Benchmark of reading the raw event data with and without pushing the
+projection and the filters down into the CSV parsing.
+
+Usage (from the repository root):
+    python -m benchmarks.reader [path_to_raw_event_data]
+"""
+import sys
+import time
+import tracemalloc
+from libs.files.collector import FileCollector
+from libs.files.readers.csv_reader import CSVReader
+from libs.files.readers.filters import notnull
+
+PATH_RAW_DATA = 'data/raw/event_data'
+
+COLUMNS = [
+    'artist', 'firstName', 'gender', 'itemInSession', 'lastName', 'length',
+    'level', 'location', 'sessionId', 'song', 'userId',
+]
+
+
+def measure(func, repeat=5):
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = func()
+        elapsed.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run, as tracing slows parsing down
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, min(elapsed), peak
+
+
+def main(path=PATH_RAW_DATA):
+    file_paths = FileCollector(path).collect_files()
+
+    def full_parse():
+        reader = CSVReader(file_paths)
+        reader.apply_filter(notnull('artist'))
+        return reader.get_data()[COLUMNS]
+
+    def pushdown():
+        reader = CSVReader(file_paths, columns=COLUMNS,
+                           filters=[notnull('artist')])
+        return reader.get_data()
+
+    for name, func in (('full parse', full_parse), ('pushdown', pushdown)):
+        data, elapsed, peak = measure(func)
+        print(f"{name:<10} rows: {len(data):>8}  "
+              f"time: {elapsed * 1000:8.2f} ms  "
+              f"peak memory: {peak / 2 ** 20:8.2f} MiB")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
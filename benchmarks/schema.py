@@ -0,0 +1,24 @@
+"""
+Report of the memory used by the raw event data with the inferred dtypes
+and with the declared event schema.
+
+Usage (from the repository root):
+    python -m benchmarks.schema [path_to_raw_event_data]
+"""
+import sys
+from libs.files.collector import FileCollector
+from libs.files.readers.csv_reader import CSVReader
+from libs.files.readers.schema import EVENT_SCHEMA, memory_report
+
+PATH_RAW_DATA = 'data/raw/event_data'
+
+
+def main(path=PATH_RAW_DATA):
+    file_paths = FileCollector(path).collect_files()
+    inferred = CSVReader(file_paths).get_data()
+    declared = CSVReader(file_paths, dtype=EVENT_SCHEMA).get_data()
+    print(memory_report(inferred, declared))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
@@ -0,0 +1,291 @@
+import asyncio
+from typing import (
+    Any, AsyncIterator, Awaitable, Dict, Iterable, List, Sequence, Union
+)
+from .cassandra_db import (
+    DEFAULT_CONCURRENCY, DEFAULT_FETCH_SIZE, CassandraConnector
+)
+from .config import TUPLE_ROWS_PROFILE
+from cassandra.cluster import ResponseFuture
+from cassandra.query import PreparedStatement, SimpleStatement, Statement
+import pandas as pd
+
+
+async def gather_or_cancel(*awaitables: Awaitable) -> List[Any]:
+    """
+    Run awaitables concurrently like asyncio.gather, but cancel the
+    remaining ones as soon as one fails, so no new query is sent after
+    an error and none is left running once the error is raised.
+
+    Args:
+        *awaitables: The awaitables to run.
+
+    Returns:
+        A list of their results, in the order of the awaitables.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AsyncPages:
+    """
+    Asynchronous iterator over the pages of rows of a ResponseFuture.
+
+    The driver completes the future on its event thread; every page is
+    handed over to the asyncio loop, and the next page is only requested
+    once the current one was consumed, so at most one page is held in
+    memory.
+    """
+
+    def __init__(self, response_future: ResponseFuture,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Initialize a new instance of AsyncPages.
+
+        Args:
+            response_future: The future of the query, as returned by
+                             Session.execute_async.
+            loop: The loop the pages are awaited on (default is None,
+                  which uses the running loop).
+        """
+        self.response_future = response_future
+        self._loop = loop or asyncio.get_running_loop()
+        self._pages = asyncio.Queue()
+        self._started = False
+        # The driver calls the callbacks again for every fetched page
+        response_future.add_callbacks(self._on_page, self._on_error)
+
+    def _on_page(self, rows) -> None:
+        self._loop.call_soon_threadsafe(self._pages.put_nowait, rows)
+
+    def _on_error(self, error: Exception) -> None:
+        self._loop.call_soon_threadsafe(self._pages.put_nowait, error)
+
+    def __aiter__(self) -> 'AsyncPages':
+        return self
+
+    async def __anext__(self) -> List[Any]:
+        if self._started:
+            if not self.response_future.has_more_pages:
+                raise StopAsyncIteration
+            self.response_future.start_fetching_next_page()
+        self._started = True
+
+        page = await self._pages.get()
+        if isinstance(page, BaseException):
+            raise page
+        return list(page)
+
+    @property
+    def column_names(self) -> List[str]:
+        """
+        The names of the columns of the result, once a page was fetched.
+        """
+        # The future holds a completed page, so result() does not block
+        return list(self.response_future.result().column_names or [])
+
+
+class AsyncCassandraConnector:
+    """
+    Asyncio counterpart of CassandraConnector.
+
+    Queries are sent with the asynchronous API of the driver and awaited
+    on the event loop, so many concurrent queries share the driver's
+    connections instead of blocking a thread each. The connection,
+    execution profiles and prepared statement cache are those of the
+    wrapped CassandraConnector.
+    """
+
+    def __init__(self, connector: CassandraConnector):
+        """
+        Initialize a new instance of AsyncCassandraConnector.
+
+        Args:
+            connector: The connected CassandraConnector to send the
+                       queries through.
+        """
+        self.connector = connector
+
+    async def prepare(self, query: str) -> PreparedStatement:
+        """
+        Get the prepared statement of a query from the cache of the
+        connector. On a cache miss, the query is prepared on a thread of
+        the default executor, as preparing blocks until every node
+        answered.
+
+        Args:
+            query: The CQL text of the query.
+
+        Returns:
+            PreparedStatement: The prepared statement.
+        """
+        statement = self.connector.get_prepared(query)
+        if statement is None:
+            statement = await asyncio.get_running_loop().run_in_executor(
+                None, self.connector.prepare, query)
+        return statement
+
+    async def _execute_async(self, query: Union[str, Statement],
+                             parameters: Sequence[Any] = None,
+                             profile: str = None) -> ResponseFuture:
+        """
+        Send a query without waiting for its result.
+
+        Args:
+            query: The query to execute, or a statement.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None). When set, the query is
+                        executed as a cached prepared statement.
+            profile: The execution profile to run the query with
+                     (default is None, which uses the default profile).
+
+        Returns:
+            ResponseFuture: The future of the query.
+        """
+        statement = query
+        if parameters is not None and isinstance(query, str):
+            statement = await self.prepare(query)
+        args = (statement,) if parameters is None else (statement, parameters)
+        if profile is None:
+            return self.connector.session.execute_async(*args)
+        return self.connector.session.execute_async(
+            *args, execution_profile=profile)
+
+    async def execute_query(self, query: Union[str, Statement],
+                            parameters: Sequence[Any] = None,
+                            profile: str = None) -> List[Any]:
+        """
+        Execute a query and await all the rows of its result.
+
+        Args:
+            query: The query to execute, or a statement.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None). When set, the query is
+                        executed as a cached prepared statement.
+            profile: The execution profile to run the query with
+                     (default is None, which uses the default profile).
+
+        Returns:
+            A list of the rows of the result.
+        """
+        rows = []
+        async for page in AsyncPages(
+                await self._execute_async(query, parameters, profile)):
+            rows.extend(page)
+        return rows
+
+    async def execute_concurrent(self, query: Union[str, Statement],
+                                 parameters_list: Iterable[Sequence[Any]],
+                                 concurrency: int = DEFAULT_CONCURRENCY,
+                                 profile: str = None) -> List[List[Any]]:
+        """
+        Execute a query once per set of parameters, with up to
+        concurrency queries in flight.
+
+        Args:
+            query: The query to execute, with ? placeholders, or a
+                   statement.
+            parameters_list: An iterable of parameter sequences.
+            concurrency: The maximum number of queries in flight
+                         (default is 64).
+            profile: The execution profile to run the queries with
+                     (default is None, which uses the default profile).
+
+        Returns:
+            A list of the rows of each query, in the order of
+            parameters_list.
+
+        Raises:
+            Exception: The error of the first failed query. The queries
+                       not sent yet are cancelled.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be a positive integer.")
+        slots = asyncio.Semaphore(concurrency)
+
+        async def execute(parameters):
+            async with slots:
+                return await self.execute_query(query, parameters, profile)
+
+        return await gather_or_cancel(
+            *(execute(parameters) for parameters in parameters_list))
+
+    async def iter_pages(self, query: str, parameters: Sequence[Any] = None,
+                         fetch_size: int = DEFAULT_FETCH_SIZE
+                         ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a query and iterate over its result page by page, so only
+        one page of rows is held in memory at a time.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            An asynchronous iterator of pages, each one a dictionary with
+            the 'columns' names and the 'rows' of the page as tuples.
+        """
+        if parameters is None:
+            statement = SimpleStatement(query, fetch_size=fetch_size)
+        else:
+            statement = (await self.prepare(query)).bind(parameters)
+            statement.fetch_size = fetch_size
+
+        pages = AsyncPages(
+            await self._execute_async(statement, profile=TUPLE_ROWS_PROFILE))
+        async for rows in pages:
+            yield {'columns': pages.column_names, 'rows': rows}
+
+    async def iter_rows(self, query: str, parameters: Sequence[Any] = None,
+                        fetch_size: int = DEFAULT_FETCH_SIZE
+                        ) -> AsyncIterator[tuple]:
+        """
+        Execute a query and iterate over the rows of its result, fetching
+        one page at a time.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            An asynchronous iterator of rows as tuples.
+        """
+        async for page in self.iter_pages(query, parameters, fetch_size):
+            for row in page['rows']:
+                yield row
+
+    async def query_to_dataframe(self, query: str,
+                                 parameters: Sequence[Any] = None,
+                                 fetch_size: int = DEFAULT_FETCH_SIZE
+                                 ) -> pd.DataFrame:
+        """
+        Convert the result of a query to a pandas DataFrame.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            pd.DataFrame: The result set as a pandas DataFrame.
+        """
+        names = []
+        rows = []
+        async for page in self.iter_pages(query, parameters, fetch_size):
+            names = page['columns']
+            rows.extend(page['rows'])
+        return pd.DataFrame.from_records(rows, columns=names)
@@ -1,24 +1,54 @@
+import threading
+from collections import OrderedDict
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+)
 from .base import DatabaseConnector
-from cassandra.cluster import Cluster
+from .config import (
+    READ_PROFILE, TUPLE_ROWS_PROFILE, WRITE_PROFILE, CassandraConfig
+)
+from libs.metrics.registry import timed
+from cassandra import ConsistencyLevel
+from cassandra.cluster import EXEC_PROFILE_DEFAULT, Cluster
+from cassandra.query import PreparedStatement, SimpleStatement, Statement
 import pandas as pd
 
+# Default number of rows fetched per page by the paged queries
+DEFAULT_FETCH_SIZE = 5000
+# Default number of requests in flight of the concurrent queries
+DEFAULT_CONCURRENCY = 64
+
 
 class CassandraConnector(DatabaseConnector):
     """
     Connector class for interacting with Cassandra database.
     """
 
-    def __init__(self, contact_points: list):
+    def __init__(self, contact_points: list, prepared_cache_size: int = 256,
+                 config: CassandraConfig = None):
         """
         Initialize a new instance of CassandraConnector.
 
         Args:
             contact_points: A list of contact points for the Cassandra cluster.
+            prepared_cache_size: The maximum number of prepared statements
+                                 kept in the cache (default is 256).
+            config: The connection tuning options (default is None, which
+                    uses CassandraConfig defaults).
         """
         self.contact_points = contact_points
-        self.cluster = Cluster(contact_points=self.contact_points)
+        self.config = config if config is not None else CassandraConfig()
+        self.cluster = Cluster(contact_points=self.contact_points,
+                               **self.config.cluster_kwargs())
+        self.config.configure_pool(self.cluster)
         self.session = None
 
+        self.prepared_cache_size = prepared_cache_size
+        self.prepared_hits = 0
+        self.prepared_misses = 0
+        self._prepared = OrderedDict()
+        self._prepared_lock = threading.Lock()
+
     def connect(self):
         """
         Connect to the Cassandra database.
@@ -33,15 +63,221 @@ class CassandraConnector(DatabaseConnector):
             self.cluster.shutdown()
         if self.session:
             self.session.shutdown()
+        self.invalidate_prepared()
+
+    def get_prepared(self, query: str) -> Optional[PreparedStatement]:
+        """
+        Get the cached prepared statement of a query, without preparing
+        it on a cache miss.
+
+        Args:
+            query: The CQL text of the query.
+
+        Returns:
+            PreparedStatement: The prepared statement, or None if the
+            query is not in the cache.
+        """
+        with self._prepared_lock:
+            statement = self._prepared.get(query)
+            if statement is not None:
+                self._prepared.move_to_end(query)
+                self.prepared_hits += 1
+            return statement
+
+    def prepare(self, query: str) -> PreparedStatement:
+        """
+        Get the prepared statement of a query, preparing it on a cache
+        miss. The cache keeps the most recently used statements.
+
+        Args:
+            query: The CQL text of the query.
+
+        Returns:
+            PreparedStatement: The prepared statement.
+        """
+        statement = self.get_prepared(query)
+        if statement is not None:
+            return statement
+        with self._prepared_lock:
+            self.prepared_misses += 1
+
+        statement = self.session.prepare(query)
+
+        with self._prepared_lock:
+            self._prepared[query] = statement
+            self._prepared.move_to_end(query)
+            while len(self._prepared) > self.prepared_cache_size:
+                self._prepared.popitem(last=False)
+        return statement
+
+    def invalidate_prepared(self):
+        """
+        Clear the prepared statement cache, e.g. after a schema change.
+        """
+        with self._prepared_lock:
+            self._prepared.clear()
+
+    def prepared_cache_info(self) -> dict:
+        """
+        Get the statistics of the prepared statement cache.
+
+        Returns:
+            dict: The hits, misses, current size and maximum size.
+        """
+        with self._prepared_lock:
+            return {
+                'hits': self.prepared_hits,
+                'misses': self.prepared_misses,
+                'size': len(self._prepared),
+                'max_size': self.prepared_cache_size,
+            }
 
-    def execute_query(self, query: str):
+    def execute_query(self, query: str, parameters: Sequence[Any] = None,
+                      profile: str = None):
         """
         Execute a query on the Cassandra database.
 
         Args:
             query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None). When set, the query is
+                        executed as a cached prepared statement.
+            profile: The execution profile to run the query with, e.g.
+                     READ_PROFILE or WRITE_PROFILE (default is None,
+                     which uses the default profile).
+        """
+        statement = query if parameters is None else self.prepare(query)
+        args = (statement,) if parameters is None else (statement, parameters)
+        with timed('cassandra_query_seconds',
+                   {'profile': profile or 'default'}):
+            if profile is None:
+                return self.session.execute(*args)
+            return self.session.execute(*args, execution_profile=profile)
+
+    def execute_concurrent(self, query: str,
+                           parameters_list: Iterable[Sequence[Any]],
+                           concurrency: int = DEFAULT_CONCURRENCY,
+                           profile: str = None) -> List[List[Any]]:
+        """
+        Execute a prepared query once per set of parameters, with up to
+        concurrency asynchronous requests in flight. Each request is
+        routed to a replica of its partition by the token-aware policy,
+        so the total latency approaches a few round trips rather than
+        one per request.
+
+        Args:
+            query: The query to execute, with ? placeholders.
+            parameters_list: An iterable of parameter sequences.
+            concurrency: The maximum number of requests in flight
+                         (default is 64).
+            profile: The execution profile to run the queries with
+                     (default is None, which uses the default profile).
+
+        Returns:
+            A list of the rows of each request, in the order of
+            parameters_list.
+
+        Raises:
+            Exception: The error of the first failed request. No request
+                       is sent once one has failed.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be a positive integer.")
+        statement = self.prepare(query)
+        return self.execute_statements(
+            ((statement, parameters) for parameters in parameters_list),
+            concurrency, profile)
+
+    def execute_statements(self, requests: Iterable[
+                               Tuple[Statement, Optional[Sequence[Any]]]],
+                           concurrency: int = DEFAULT_CONCURRENCY,
+                           profile: str = None) -> List[List[Any]]:
+        """
+        Execute statements, e.g. prepared inserts and batches, with up to
+        concurrency asynchronous requests in flight.
+
+        Args:
+            requests: An iterable of (statement, parameters) pairs, the
+                      parameters being None for a statement without
+                      placeholders, such as a batch.
+            concurrency: The maximum number of requests in flight
+                         (default is 64).
+            profile: The execution profile to run the statements with
+                     (default is None, which uses the default profile).
+
+        Returns:
+            A list of the rows of each request, in the order of
+            requests.
+
+        Raises:
+            Exception: The error of the first failed request. No request
+                       is sent once one has failed.
+        """
+        # cassandra.concurrent.execute_concurrent_with_args is not used
+        # as it sends every request with timeout=None, overriding the
+        # request timeout of the execution profile
+        if concurrency <= 0:
+            raise ValueError("concurrency must be a positive integer.")
+        kwargs = {} if profile is None else {'execution_profile': profile}
+        slots = threading.BoundedSemaphore(concurrency)
+        errors = []
+
+        def release(*_):
+            slots.release()
+
+        def fail(error):
+            errors.append(error)
+            slots.release()
+
+        futures = []
+        for statement, parameters in requests:
+            slots.acquire()
+            if errors:
+                slots.release()
+                break
+            try:
+                future = self.session.execute_async(statement, parameters,
+                                                    **kwargs)
+            except Exception:
+                slots.release()
+                raise
+            future.add_callbacks(release, fail)
+            futures.append(future)
+        if errors:
+            raise errors[0]
+        return [list(future.result()) for future in futures]
+
+    def effective_config(self) -> Dict[str, Any]:
         """
-        return self.session.execute(query)
+        Get the effective connection configuration: the configured
+        options and the settings of each execution profile.
+
+        Returns:
+            dict: The configuration.
+        """
+        profiles = {}
+        for name in (EXEC_PROFILE_DEFAULT, READ_PROFILE, WRITE_PROFILE,
+                     TUPLE_ROWS_PROFILE):
+            profile = self.cluster.profile_manager.profiles[name]
+            label = 'default' if name is EXEC_PROFILE_DEFAULT else name
+            profiles[label] = {
+                'consistency_level':
+                    ConsistencyLevel.value_to_name[
+                        profile.consistency_level],
+                'request_timeout': profile.request_timeout,
+                'load_balancing_policy':
+                    type(profile.load_balancing_policy).__name__,
+                'retry_policy': type(profile.retry_policy).__name__,
+                'row_factory': profile.row_factory.__name__,
+            }
+        return {
+            'contact_points': list(self.contact_points),
+            **self.config.to_dict(),
+            # The protocol version is negotiated on connection
+            'negotiated_protocol_version':
+                self.cluster.protocol_version if self.session else None,
+            'execution_profiles': profiles,
+        }
 
     def set_keyspace(self, keyspace: str):
         """
@@ -51,30 +287,122 @@ class CassandraConnector(DatabaseConnector):
             keyspace: The name of the keyspace to set.
         """
         self.session.set_keyspace(keyspace)
+        # Statements may have been prepared against another keyspace
+        self.invalidate_prepared()
 
-    def print_query_result(self, query: str):
+    def print_query_result(self, query: str, parameters: Sequence[Any] = None):
         """
         Execute a query on the Cassandra database and print the result.
 
         Args:
             query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
         """
-        result = self.execute_query(query)
+        result = self.execute_query(query, parameters)
         for row in result:
             print(row)
 
-    def query_to_dataframe(self, query: str) -> pd.DataFrame:
+    def query_to_dataframe(self, query: str,
+                           parameters: Sequence[Any] = None) -> pd.DataFrame:
         """
         Convert the result of a query to a pandas DataFrame.
 
         Args:
             query: The query to execute.
-            result_set: The result set of the query.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
 
         Returns:
             pd.DataFrame: The result set as a pandas DataFrame.
         """
-        result_set = self.execute_query(query)
+        result_set = self.execute_query(query, parameters)
         rows = list(result_set)
         df = pd.DataFrame(rows)
         return df
+
+    def iter_pages(self, query: str, parameters: Sequence[Any] = None,
+                   fetch_size: int = DEFAULT_FETCH_SIZE
+                   ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a query and iterate over its result page by page, so only
+        one page of rows is held in memory at a time.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            An iterator of pages, each one a dictionary with the
+            'columns' names and the 'rows' of the page as tuples.
+        """
+        if parameters is None:
+            statement = SimpleStatement(query, fetch_size=fetch_size)
+        else:
+            statement = self.prepare(query).bind(parameters)
+            statement.fetch_size = fetch_size
+
+        result_set = self.session.execute(
+            statement, execution_profile=TUPLE_ROWS_PROFILE)
+        while True:
+            yield {
+                'columns': list(result_set.column_names or []),
+                'rows': result_set.current_rows,
+            }
+            if not result_set.has_more_pages:
+                break
+            result_set.fetch_next_page()
+
+    def iter_dataframes(self, query: str, parameters: Sequence[Any] = None,
+                        fetch_size: int = DEFAULT_FETCH_SIZE
+                        ) -> Iterator[pd.DataFrame]:
+        """
+        Execute a query and iterate over its result as one DataFrame
+        per page.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            An iterator of DataFrames.
+        """
+        for page in self.iter_pages(query, parameters, fetch_size):
+            yield pd.DataFrame.from_records(page['rows'],
+                                            columns=page['columns'])
+
+    def paged_query_to_dataframe(self, query: str,
+                                 parameters: Sequence[Any] = None,
+                                 fetch_size: int = DEFAULT_FETCH_SIZE
+                                 ) -> pd.DataFrame:
+        """
+        Convert the result of a query to a pandas DataFrame, building one
+        DataFrame per page and concatenating them once at the end.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            pd.DataFrame: The result set as a pandas DataFrame.
+        """
+        first = None
+        frames = []
+        for frame in self.iter_dataframes(query, parameters, fetch_size):
+            if first is None:
+                first = frame
+            # Empty pages would turn the concatenated columns into objects
+            if not frame.empty:
+                frames.append(frame)
+        if not frames:
+            return first if first is not None else pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,175 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Union
+from cassandra import ConsistencyLevel
+from cassandra.cluster import EXEC_PROFILE_DEFAULT, ExecutionProfile
+from cassandra.policies import (
+    DCAwareRoundRobinPolicy, FallthroughRetryPolicy, HostDistance,
+    RetryPolicy, TokenAwarePolicy
+)
+from cassandra.query import tuple_factory
+
+# Names of the execution profiles registered on the cluster
+READ_PROFILE = 'read'
+WRITE_PROFILE = 'write'
+# Read profile returning rows as plain tuples, used by the paged
+# queries to avoid allocating a namedtuple per row
+TUPLE_ROWS_PROFILE = 'tuple_rows'
+
+RETRY_POLICIES = {
+    'default': RetryPolicy,
+    'fallthrough': FallthroughRetryPolicy,
+}
+
+
+@dataclass
+class CassandraConfig:
+    """
+    Tuning options of a Cassandra connection.
+
+    Reads and writes get their own execution profiles, so latency
+    sensitive reads and write-heavy loads can be tuned independently.
+
+    Attributes:
+        port: The native protocol port of the cluster.
+        local_dc: The local datacenter for the DC-aware load balancing
+                  policy (default is None, which infers it from the
+                  contact points).
+        token_aware: Whether requests are routed to a replica of their
+                     partition key.
+        compression: True to use the best compression supported by both
+                     ends (lz4 when the lz4 package is installed), 'lz4'
+                     or 'snappy' to require one, False to disable it.
+        protocol_version: The native protocol version (default is None,
+                          which negotiates the highest supported one).
+        connect_timeout: The timeout in seconds to open a connection.
+        read_timeout: The request timeout in seconds of reads.
+        write_timeout: The request timeout in seconds of writes.
+        read_consistency: The consistency level name of reads.
+        write_consistency: The consistency level name of writes.
+        retry_policy: The retry policy name, 'default' or 'fallthrough'.
+        executor_threads: The number of driver threads handling
+                          asynchronous tasks.
+        max_requests_per_connection: The number of concurrent requests
+                on a connection to a local host above which a new
+                connection is opened.
+        core_connections_per_host: The minimum number of connections per
+                local host.
+        max_connections_per_host: The maximum number of connections per
+                local host.
+
+    The connection pool settings (default is None, which keeps the driver
+    defaults) are only supported with protocol versions 1 and 2; newer
+    versions multiplex requests over a single connection per host.
+    """
+    port: int = 9042
+    local_dc: Optional[str] = None
+    token_aware: bool = True
+    compression: Union[bool, str] = True
+    protocol_version: Optional[int] = None
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    write_timeout: float = 10.0
+    read_consistency: str = 'LOCAL_ONE'
+    write_consistency: str = 'LOCAL_ONE'
+    retry_policy: str = 'default'
+    executor_threads: int = 2
+    max_requests_per_connection: Optional[int] = None
+    core_connections_per_host: Optional[int] = None
+    max_connections_per_host: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ('read_consistency', 'write_consistency'):
+            if getattr(self, name) not in ConsistencyLevel.name_to_value:
+                raise ValueError(
+                    f"Unknown consistency level '{getattr(self, name)}'.")
+        if self.retry_policy not in RETRY_POLICIES:
+            raise ValueError(
+                f"Unknown retry policy '{self.retry_policy}', "
+                f"expected one of {sorted(RETRY_POLICIES)}."
+            )
+        if self.compression not in (True, False, 'lz4', 'snappy'):
+            raise ValueError(
+                f"Unknown compression '{self.compression}'.")
+        pool_settings = (self.max_requests_per_connection,
+                         self.core_connections_per_host,
+                         self.max_connections_per_host)
+        if any(setting is not None for setting in pool_settings) \
+                and self.protocol_version not in (1, 2):
+            raise ValueError(
+                "The connection pool can only be sized with "
+                "protocol_version 1 or 2."
+            )
+
+    def load_balancing_policy(self):
+        """
+        Build the load balancing policy.
+        """
+        policy = DCAwareRoundRobinPolicy(local_dc=self.local_dc)
+        if self.token_aware:
+            policy = TokenAwarePolicy(policy)
+        return policy
+
+    def _profile(self, consistency: str, timeout: float,
+                 **kwargs) -> ExecutionProfile:
+        return ExecutionProfile(
+            load_balancing_policy=self.load_balancing_policy(),
+            retry_policy=RETRY_POLICIES[self.retry_policy](),
+            consistency_level=ConsistencyLevel.name_to_value[consistency],
+            request_timeout=timeout,
+            **kwargs
+        )
+
+    def execution_profiles(self) -> Dict[Any, ExecutionProfile]:
+        """
+        Build the execution profiles: the default and read profiles use
+        the read settings, the write profile the write settings.
+        """
+        return {
+            EXEC_PROFILE_DEFAULT: self._profile(self.read_consistency,
+                                                self.read_timeout),
+            READ_PROFILE: self._profile(self.read_consistency,
+                                        self.read_timeout),
+            WRITE_PROFILE: self._profile(self.write_consistency,
+                                         self.write_timeout),
+            TUPLE_ROWS_PROFILE: self._profile(self.read_consistency,
+                                              self.read_timeout,
+                                              row_factory=tuple_factory),
+        }
+
+    def cluster_kwargs(self) -> Dict[str, Any]:
+        """
+        Build the keyword arguments of cassandra.cluster.Cluster.
+        """
+        kwargs = {
+            'port': self.port,
+            'compression': self.compression,
+            'connect_timeout': self.connect_timeout,
+            'executor_threads': self.executor_threads,
+            'execution_profiles': self.execution_profiles(),
+        }
+        if self.protocol_version is not None:
+            kwargs['protocol_version'] = self.protocol_version
+        return kwargs
+
+    def configure_pool(self, cluster) -> None:
+        """
+        Apply the connection pool settings to a cluster.
+
+        Args:
+            cluster: The cassandra.cluster.Cluster to configure.
+        """
+        if self.max_requests_per_connection is not None:
+            cluster.set_max_requests_per_connection(
+                HostDistance.LOCAL, self.max_requests_per_connection)
+        if self.max_connections_per_host is not None:
+            cluster.set_max_connections_per_host(
+                HostDistance.LOCAL, self.max_connections_per_host)
+        if self.core_connections_per_host is not None:
+            cluster.set_core_connections_per_host(
+                HostDistance.LOCAL, self.core_connections_per_host)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the configuration as a dictionary.
+        """
+        return asdict(self)
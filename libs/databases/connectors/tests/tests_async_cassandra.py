@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import unittest
+from libs.databases.connectors.async_cassandra_db import (
+    AsyncCassandraConnector, AsyncPages
+)
+from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.connectors.config import TUPLE_ROWS_PROFILE
+from libs.databases.tests import fakes
+from libs.databases.tests.fakes import PagedFuture, PagedSession
+
+
+class TestAsyncCassandraConnector(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.connector = CassandraConnector(contact_points=['127.0.0.1'])
+        self.session = self.connector.session = PagedSession(
+            pages=[[(1, 'x'), (2, 'y')], [(3, 'z')]])
+        self.async_connector = AsyncCassandraConnector(self.connector)
+
+    async def test_execute_query(self):
+        rows = await self.async_connector.execute_query(
+            "SELECT a, b FROM t WHERE a = ?", [1])
+
+        self.assertEqual(rows, [(1, 'x'), (2, 'y'), (3, 'z')])
+        self.session.prepare.assert_called_once_with(
+            "SELECT a, b FROM t WHERE a = ?")
+        self.assertEqual(self.session.requests[0][1], [1])
+
+    async def test_execute_query_error(self):
+        self.session.error = RuntimeError("read timeout")
+
+        with self.assertRaises(RuntimeError):
+            await self.async_connector.execute_query("SELECT * FROM t")
+
+    async def test_iter_pages_fetches_on_demand(self):
+        pages = self.async_connector.iter_pages("SELECT a, b FROM t",
+                                                fetch_size=2)
+
+        first = await pages.__anext__()
+        await asyncio.sleep(0.01)
+        # The second page is only requested once the first was consumed
+        self.assertEqual(self.session.fetches, 1)
+        self.assertEqual(first, {'columns': ['a', 'b'],
+                                 'rows': [(1, 'x'), (2, 'y')]})
+        rest = [page async for page in pages]
+        self.assertEqual(rest[0]['rows'], [(3, 'z')])
+
+        statement, _, kwargs = self.session.requests[0]
+        self.assertEqual(statement.fetch_size, 2)
+        self.assertEqual(kwargs, {'execution_profile': TUPLE_ROWS_PROFILE})
+
+    async def test_iter_rows(self):
+        rows = [row async for row in
+                self.async_connector.iter_rows("SELECT a, b FROM t")]
+
+        self.assertEqual(rows, [(1, 'x'), (2, 'y'), (3, 'z')])
+
+    async def test_query_to_dataframe(self):
+        data = await self.async_connector.query_to_dataframe(
+            "SELECT a, b FROM t")
+
+        self.assertEqual(list(data.columns), ['a', 'b'])
+        self.assertEqual(data['a'].tolist(), [1, 2, 3])
+
+    async def test_execute_concurrent(self):
+        self.session.pages = None
+
+        rows = await self.async_connector.execute_concurrent(
+            "SELECT a FROM t WHERE a = ?", [[i] for i in range(30)],
+            concurrency=4)
+
+        self.assertEqual(rows, [[[i]] for i in range(30)])
+        self.assertLessEqual(self.session.max_in_flight, 4)
+        self.assertEqual(self.session.prepare.call_count, 1)
+
+    async def test_execute_concurrent_error_cancels(self):
+        self.session.error = RuntimeError("read timeout")
+
+        with self.assertRaises(RuntimeError):
+            await self.async_connector.execute_concurrent(
+                "SELECT a FROM t WHERE a = ?", [[i] for i in range(30)],
+                concurrency=2)
+        await asyncio.sleep(0.05)
+
+        # The queries waiting for a slot were cancelled, not sent; one
+        # may take the slot freed by the failure before the cancellation
+        self.assertLessEqual(len(self.session.requests), 3)
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+    async def test_prepare_off_loop(self):
+        threads = []
+
+        def prepare(query):
+            threads.append(threading.current_thread())
+            return fakes.prepare(query)
+
+        self.session.prepare.side_effect = prepare
+        query = "SELECT a, b FROM t WHERE a = ?"
+
+        statement = await self.async_connector.prepare(query)
+
+        self.assertIsNot(threads[0], threading.current_thread())
+        self.assertIs(await self.async_connector.prepare(query), statement)
+        self.assertEqual(len(threads), 1)
+        self.assertEqual(self.connector.prepared_cache_info()['hits'], 1)
+
+    async def test_pages_of_future(self):
+        future = PagedFuture(self.session, [[(1,)], [(2,)]])
+
+        pages = [page async for page in AsyncPages(future)]
+
+        self.assertEqual(pages, [[(1,)], [(2,)]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,10 @@ import unittest
 from unittest.mock import Mock
 from cassandra.cluster import Cluster
 import pandas as pd
-from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.connectors.cassandra_db import (
+    TUPLE_ROWS_PROFILE, CassandraConnector
+)
+from libs.databases.tests.fakes import FakeSession
 
 
 class TestCassandraConnector(unittest.TestCase):
@@ -91,6 +94,121 @@ class TestCassandraConnector(unittest.TestCase):
         expected_df = pd.DataFrame(mock_result_set)
         pd.testing.assert_frame_equal(df, expected_df)
 
+    def test_execute_query_with_parameters(self):
+        # Test that parameterized queries go through prepared statements
+        query = "SELECT * FROM table WHERE id = ?"
+        self.connector.execute_query(query, (1,))
+        self.connector.execute_query(query, (2,))
+
+        self.mock_session.prepare.assert_called_once_with(query)
+        self.mock_session.execute.assert_called_with(
+            self.mock_session.prepare.return_value, (2,))
+        info = self.connector.prepared_cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['size']),
+                         (1, 1, 1))
+
+    def test_prepared_cache_eviction(self):
+        # Test that the least recently used statement is evicted
+        self.connector.prepared_cache_size = 2
+        self.connector.prepare("query 1")
+        self.connector.prepare("query 2")
+        self.connector.prepare("query 1")
+        self.connector.prepare("query 3")
+        self.connector.prepare("query 1")
+        self.connector.prepare("query 2")
+
+        self.assertEqual(self.mock_session.prepare.call_count, 4)
+        self.assertEqual(self.connector.prepared_cache_info()['size'], 2)
+
+    def test_invalidate_prepared(self):
+        # Test that invalidation forces statements to be prepared again
+        self.connector.prepare("query")
+        self.connector.invalidate_prepared()
+        self.connector.prepare("query")
+
+        self.assertEqual(self.mock_session.prepare.call_count, 2)
+
+    def mock_paged_result(self, pages, column_names=('song', 'userId')):
+        # Set up a mock result set returning the given pages
+        result_set = Mock()
+        result_set.column_names = list(column_names)
+        result_set.current_rows = pages[0]
+        remaining = list(pages[1:])
+        result_set.has_more_pages = bool(remaining)
+
+        def fetch_next_page():
+            result_set.current_rows = remaining.pop(0)
+            result_set.has_more_pages = bool(remaining)
+
+        result_set.fetch_next_page.side_effect = fetch_next_page
+        self.mock_session.execute.return_value = result_set
+
+    def test_iter_dataframes(self):
+        # Test iterating over the result one page at a time
+        self.mock_paged_result([[('a', 1), ('a', 2)], [('b', 3)]])
+
+        frames = list(self.connector.iter_dataframes(
+            "SELECT * FROM users_by_song", fetch_size=2))
+
+        self.assertEqual([len(frame) for frame in frames], [2, 1])
+        self.assertEqual(frames[1].to_dict(orient='records'),
+                         [{'song': 'b', 'userId': 3}])
+        statement = self.mock_session.execute.call_args.args[0]
+        self.assertEqual(statement.fetch_size, 2)
+        self.assertEqual(
+            self.mock_session.execute.call_args.kwargs['execution_profile'],
+            TUPLE_ROWS_PROFILE)
+
+    def test_paged_query_to_dataframe(self):
+        # Test building one DataFrame from several pages
+        self.mock_paged_result([[('a', 1), ('a', 2)], [('b', 3)], []])
+
+        df = self.connector.paged_query_to_dataframe(
+            "SELECT * FROM users_by_song")
+
+        expected_df = pd.DataFrame({'song': ['a', 'a', 'b'],
+                                    'userId': [1, 2, 3]})
+        pd.testing.assert_frame_equal(df, expected_df)
+
+    def test_paged_query_to_dataframe_empty(self):
+        # Test that an empty result keeps its columns
+        self.mock_paged_result([[]])
+
+        df = self.connector.paged_query_to_dataframe(
+            "SELECT * FROM users_by_song")
+
+        self.assertTrue(df.empty)
+        self.assertEqual(df.columns.tolist(), ['song', 'userId'])
+
+    def test_execute_concurrent(self):
+        # Test that at most concurrency requests are in flight
+        session = self.connector.session = FakeSession(
+            results=lambda parameters: [tuple(parameters) * 2])
+
+        rows = self.connector.execute_concurrent(
+            "SELECT a, b FROM t WHERE a = ?", [[i] for i in range(30)],
+            concurrency=4)
+
+        self.assertEqual(rows, [[(i, i)] for i in range(30)])
+        self.assertEqual(len(session.requests), 30)
+        self.assertLessEqual(session.max_in_flight, 4)
+        session.prepare.assert_called_once_with(
+            "SELECT a, b FROM t WHERE a = ?")
+
+    def test_execute_concurrent_error(self):
+        # Test that the first error is raised and stops the requests
+        session = self.connector.session = FakeSession(fail_on=[5])
+
+        with self.assertRaisesRegex(RuntimeError, "write timeout"):
+            self.connector.execute_concurrent(
+                "SELECT a FROM t WHERE a = ?", [[i] for i in range(30)],
+                concurrency=1)
+
+        self.assertEqual(len(session.requests), 6)
+        with self.assertRaises(ValueError):
+            self.connector.execute_concurrent("SELECT a FROM t", [[1]],
+                                              concurrency=0)
+
 
 if __name__ == "__main__":
     unittest.main()
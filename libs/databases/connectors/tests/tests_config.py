@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import Mock
+from cassandra import ConsistencyLevel
+from cassandra.cluster import EXEC_PROFILE_DEFAULT
+from cassandra.policies import (
+    DCAwareRoundRobinPolicy, FallthroughRetryPolicy, HostDistance,
+    TokenAwarePolicy
+)
+from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.connectors.config import (
+    READ_PROFILE, TUPLE_ROWS_PROFILE, WRITE_PROFILE, CassandraConfig
+)
+
+
+class TestCassandraConfig(unittest.TestCase):
+    def test_execution_profiles(self):
+        config = CassandraConfig(
+            local_dc='dc1',
+            read_consistency='LOCAL_ONE',
+            write_consistency='LOCAL_QUORUM',
+            read_timeout=2.0,
+            write_timeout=30.0,
+            retry_policy='fallthrough',
+        )
+        profiles = config.execution_profiles()
+
+        self.assertEqual(
+            set(profiles),
+            {EXEC_PROFILE_DEFAULT, READ_PROFILE, WRITE_PROFILE,
+             TUPLE_ROWS_PROFILE})
+        write = profiles[WRITE_PROFILE]
+        self.assertEqual(write.consistency_level,
+                         ConsistencyLevel.LOCAL_QUORUM)
+        self.assertEqual(write.request_timeout, 30.0)
+        self.assertIsInstance(write.retry_policy, FallthroughRetryPolicy)
+        self.assertEqual(profiles[READ_PROFILE].request_timeout, 2.0)
+
+        policy = write.load_balancing_policy
+        self.assertIsInstance(policy, TokenAwarePolicy)
+        self.assertIsInstance(policy._child_policy, DCAwareRoundRobinPolicy)
+        self.assertEqual(policy._child_policy.local_dc, 'dc1')
+
+    def test_without_token_awareness(self):
+        policy = CassandraConfig(token_aware=False).load_balancing_policy()
+        self.assertIsInstance(policy, DCAwareRoundRobinPolicy)
+
+    def test_cluster_kwargs(self):
+        kwargs = CassandraConfig(compression='lz4',
+                                 protocol_version=4).cluster_kwargs()
+        self.assertEqual(kwargs['compression'], 'lz4')
+        self.assertEqual(kwargs['protocol_version'], 4)
+        self.assertNotIn('protocol_version',
+                         CassandraConfig().cluster_kwargs())
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            CassandraConfig(read_consistency='MOST')
+        with self.assertRaises(ValueError):
+            CassandraConfig(retry_policy='forever')
+        with self.assertRaises(ValueError):
+            CassandraConfig(compression='zip')
+        with self.assertRaises(ValueError):
+            CassandraConfig(max_connections_per_host=4)
+
+    def test_configure_pool(self):
+        cluster = Mock()
+        CassandraConfig(protocol_version=2, max_connections_per_host=8,
+                        core_connections_per_host=4).configure_pool(cluster)
+        cluster.set_max_connections_per_host.assert_called_once_with(
+            HostDistance.LOCAL, 8)
+        cluster.set_core_connections_per_host.assert_called_once_with(
+            HostDistance.LOCAL, 4)
+        cluster.set_max_requests_per_connection.assert_not_called()
+
+
+class TestCassandraConnectorConfig(unittest.TestCase):
+    def setUp(self):
+        self.config = CassandraConfig(write_consistency='QUORUM',
+                                      compression=False)
+        self.connector = CassandraConnector(contact_points=['127.0.0.1'],
+                                            config=self.config)
+
+    def test_cluster_uses_config(self):
+        self.assertFalse(self.connector.cluster.compression)
+        profile = self.connector.cluster.profile_manager \
+            .profiles[WRITE_PROFILE]
+        self.assertEqual(profile.consistency_level, ConsistencyLevel.QUORUM)
+
+    def test_effective_config(self):
+        config = self.connector.effective_config()
+        self.assertEqual(config['write_consistency'], 'QUORUM')
+        self.assertEqual(
+            config['execution_profiles']['write']['consistency_level'],
+            'QUORUM')
+        self.assertEqual(
+            config['execution_profiles']['tuple_rows']['row_factory'],
+            'tuple_factory')
+        self.assertIn('default', config['execution_profiles'])
+
+    def test_execute_query_with_profile(self):
+        self.connector.session = Mock()
+        self.connector.execute_query("SELECT 1", profile=READ_PROFILE)
+        self.connector.session.execute.assert_called_once_with(
+            "SELECT 1", execution_profile=READ_PROFILE)
+
+
+if __name__ == '__main__':
+    unittest.main()
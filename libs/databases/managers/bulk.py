@@ -0,0 +1,517 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional, Sequence
+from cassandra import OperationTimedOut, Unavailable, WriteTimeout
+from cassandra.protocol import OverloadedErrorMessage
+from cassandra.query import BatchStatement, BatchType, PreparedStatement
+from libs.metrics.registry import SIZE_BUCKETS, increment, observe
+
+# Default limits of a batch. Cassandra warns about batches larger than
+# batch_size_warn_threshold_in_kb, which defaults to 5KB.
+MAX_BATCH_ROWS = 100
+MAX_BATCH_BYTES = 5 * 1024
+
+# Errors signalling an overloaded cluster, after which an idempotent
+# write can safely be sent again
+RETRYABLE_ERRORS = (WriteTimeout, OperationTimedOut, OverloadedErrorMessage,
+                    Unavailable)
+
+
+def estimate_row_size(values: Sequence[Any]) -> int:
+    """
+    Estimate the serialized size in bytes of a row of values.
+
+    Args:
+        values: The column values of the row.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    size = 0
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, str):
+            size += len(value.encode('utf8'))
+        elif isinstance(value, (bytes, bytearray)):
+            size += len(value)
+        else:
+            size += 8
+    return size
+
+
+def partition_batches(rows: Iterable[Sequence[Any]],
+                      partition_key_indexes: Sequence[int],
+                      max_rows: int = MAX_BATCH_ROWS,
+                      max_bytes: int = MAX_BATCH_BYTES
+                      ) -> Iterable[List[Sequence[Any]]]:
+    """
+    Group rows by partition key into batches bounded in rows and bytes.
+    Every batch only holds rows of a single partition.
+
+    Args:
+        rows: An iterable of rows, each one a sequence of column values.
+        partition_key_indexes: The positions of the partition key
+                               columns in each row.
+        max_rows: The maximum number of rows per batch.
+        max_bytes: The maximum estimated size of a batch in bytes. A row
+                   larger than max_bytes gets a batch of its own.
+
+    Returns:
+        An iterator of lists of rows.
+    """
+    groups = {}
+    for values in rows:
+        key = tuple(values[i] for i in partition_key_indexes)
+        size = estimate_row_size(values)
+        group = groups.get(key)
+        if group is not None and (len(group[0]) >= max_rows
+                                  or group[1] + size > max_bytes):
+            yield groups.pop(key)[0]
+            group = None
+        if group is None:
+            group = groups[key] = [[], 0]
+        group[0].append(values)
+        group[1] += size
+
+    for group_rows, _ in groups.values():
+        yield group_rows
+
+
+class AdaptiveThrottle:
+    """
+    AIMD controller of the number of requests in flight and of the
+    number of rows per batch.
+
+    Both limits grow additively while requests succeed within the target
+    latency and are cut multiplicatively when the cluster shows signs of
+    overload: a retryable error or a latency above the target. Cuts are
+    spaced by a cooldown, so the burst of timeouts caused by a single
+    overload only cuts the limits once.
+
+    The throttle is not thread-safe; BulkLoader calls it under its lock.
+    """
+
+    def __init__(self, max_concurrency: int = 64, min_concurrency: int = 1,
+                 initial_concurrency: Optional[int] = None,
+                 max_batch_rows: int = MAX_BATCH_ROWS,
+                 min_batch_rows: int = 1,
+                 target_latency: Optional[float] = None,
+                 decrease_factor: float = 0.5,
+                 cooldown: float = 1.0):
+        """
+        Initialize a new instance of AdaptiveThrottle.
+
+        Args:
+            max_concurrency: The maximum number of requests in flight
+                             (default is 64).
+            min_concurrency: The minimum number of requests in flight
+                             (default is 1).
+            initial_concurrency: The starting number of requests in
+                                 flight (default is None, which starts
+                                 at a quarter of max_concurrency).
+            max_batch_rows: The maximum number of rows per batch
+                            (default is 100).
+            min_batch_rows: The minimum number of rows per batch
+                            (default is 1).
+            target_latency: The request latency in seconds above which
+                            the limits are cut (default is None, which
+                            only reacts to errors).
+            decrease_factor: The factor applied to the limits on
+                             overload (default is 0.5).
+            cooldown: The minimum time in seconds between two cuts
+                      (default is 1.0).
+        """
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError(
+                "Expected 1 <= min_concurrency <= max_concurrency.")
+        if not 1 <= min_batch_rows <= max_batch_rows:
+            raise ValueError(
+                "Expected 1 <= min_batch_rows <= max_batch_rows.")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1.")
+        if initial_concurrency is None:
+            initial_concurrency = max_concurrency // 4
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_batch_rows = max_batch_rows
+        self.min_batch_rows = min_batch_rows
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+
+        self.concurrency = min(max(initial_concurrency, min_concurrency),
+                               max_concurrency)
+        self.batch_rows = max_batch_rows
+        self.decreases = 0
+        self._successes = 0
+        self._last_decrease = None
+
+    def on_success(self, latency: float) -> None:
+        """
+        Record a successful request.
+
+        Args:
+            latency: The latency of the request in seconds.
+        """
+        if self.target_latency is not None \
+                and latency > self.target_latency:
+            self.on_overload()
+            return
+
+        # Grow once per window of concurrency successful requests
+        self._successes += 1
+        if self._successes < self.concurrency:
+            return
+        self._successes = 0
+        self.concurrency = min(self.concurrency + 1, self.max_concurrency)
+        self.batch_rows = min(
+            self.batch_rows + max(self.max_batch_rows // 10, 1),
+            self.max_batch_rows)
+
+    def on_overload(self) -> None:
+        """
+        Record a sign of overload, cutting the limits unless they were
+        cut less than cooldown seconds ago.
+        """
+        now = time.monotonic()
+        if self._last_decrease is not None \
+                and now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        self.decreases += 1
+        self.concurrency = max(int(self.concurrency * self.decrease_factor),
+                               self.min_concurrency)
+        self.batch_rows = max(int(self.batch_rows * self.decrease_factor),
+                              self.min_batch_rows)
+
+
+class RateLimiter:
+    """
+    Ceiling on the number of rows written per second.
+
+    Requests are spaced so that, over time, no more than rows_per_second
+    rows are sent, without bursts above the rate.
+    """
+
+    def __init__(self, rows_per_second: float):
+        """
+        Initialize a new instance of RateLimiter.
+
+        Args:
+            rows_per_second: The maximum number of rows per second.
+        """
+        if rows_per_second <= 0:
+            raise ValueError("rows_per_second must be positive.")
+        self.rows_per_second = rows_per_second
+        self._next = None
+
+    def acquire(self, rows: int) -> float:
+        """
+        Wait until rows can be sent.
+
+        Args:
+            rows: The number of rows about to be sent.
+
+        Returns:
+            float: The time in seconds spent waiting.
+        """
+        now = time.monotonic()
+        if self._next is None or self._next < now:
+            self._next = now
+        delay = self._next - now
+        self._next += rows / self.rows_per_second
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+@dataclass
+class LoadReport:
+    """
+    Summary of a bulk load.
+
+    Attributes:
+        rows: The number of rows written successfully.
+        failures: The number of rows that could not be written.
+        requests: The number of requests sent to the cluster, retries
+                  excluded.
+        retries: The number of requests sent again after a retryable
+                 error.
+        throttled: The time in seconds spent waiting for the rate limit.
+        elapsed: The duration of the load in seconds.
+        errors: The first errors raised by the failed requests.
+    """
+    rows: int = 0
+    failures: int = 0
+    requests: int = 0
+    retries: int = 0
+    throttled: float = 0.0
+    elapsed: float = 0.0
+    errors: List[Exception] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        The throughput of the load, in rows written per second.
+        """
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class BulkLoader:
+    """
+    Concurrent loader issuing asynchronous inserts with a bounded number
+    of requests in flight.
+
+    With a throttle, the number of requests in flight and the rows per
+    batch adapt to the latency and errors of the cluster. Idempotent
+    requests failing with a retryable error, such as a write timeout,
+    are sent again after an exponential backoff. Retries wait in a queue
+    ordered by due time, which the thread calling load drains while it
+    waits, so a burst of errors does not start a thread per retry.
+    """
+
+    # Number of errors kept in the report
+    max_errors = 10
+
+    def __init__(self, session, statement: PreparedStatement,
+                 concurrency: int = 64,
+                 partition_key_indexes: Optional[Sequence[int]] = None,
+                 max_batch_rows: int = MAX_BATCH_ROWS,
+                 max_batch_bytes: int = MAX_BATCH_BYTES,
+                 execution_profile: Optional[str] = None,
+                 throttle: Optional[AdaptiveThrottle] = None,
+                 max_rows_per_second: Optional[float] = None,
+                 max_retries: int = 3,
+                 retry_delay: float = 0.1):
+        """
+        Initialize a new instance of BulkLoader.
+
+        Args:
+            session: The Cassandra session used to execute the inserts.
+            statement: The prepared INSERT statement.
+            concurrency: The maximum number of requests in flight
+                         (default is 64).
+            partition_key_indexes: The positions of the partition key
+                    columns in each row. When set, rows sharing a
+                    partition key are grouped into single-partition
+                    UNLOGGED batches instead of individual inserts
+                    (default is None).
+            max_batch_rows: The maximum number of rows per batch
+                            (default is 100).
+            max_batch_bytes: The maximum estimated size of a batch in
+                             bytes (default is 5KB).
+            execution_profile: The execution profile of the requests
+                               (default is None, which uses the default
+                               profile).
+            throttle: The AdaptiveThrottle controlling the requests in
+                      flight and the rows per batch (default is None,
+                      which keeps concurrency and max_batch_rows fixed).
+            max_rows_per_second: The ceiling on the rows written per
+                                 second (default is None, no ceiling).
+            max_retries: The maximum number of times an idempotent
+                         request is sent again after a retryable error
+                         (default is 3).
+            retry_delay: The delay in seconds before the first retry,
+                         doubled on each attempt (default is 0.1).
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be a positive integer.")
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative.")
+        self.session = session
+        self.statement = statement
+        self.concurrency = concurrency
+        self.partition_key_indexes = partition_key_indexes
+        self.max_batch_rows = max_batch_rows
+        self.max_batch_bytes = max_batch_bytes
+        self.execution_profile = execution_profile
+        self.throttle = throttle
+        self.rate_limiter = RateLimiter(max_rows_per_second) \
+            if max_rows_per_second is not None else None
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._report = None
+        # Heap of the pending retries: (due time, sequence, request,
+        # attempt), the sequence keeping requests out of comparisons
+        self._retries = []
+        self._sequence = itertools.count()
+
+    def load(self, rows: Iterable[Sequence[Any]]) -> LoadReport:
+        """
+        Insert rows of values and wait for all the requests to finish.
+
+        Args:
+            rows: An iterable of rows, each one a sequence of column
+                  values in the order of the prepared statement.
+
+        Returns:
+            LoadReport: The summary of the load.
+        """
+        self._report = LoadReport()
+        start = time.perf_counter()
+
+        try:
+            for request in self._requests(rows):
+                self._submit(request)
+
+            with self._condition:
+                self._wait_for(lambda: self._in_flight == 0)
+        finally:
+            # Retries still pending when the load fails are cancelled,
+            # releasing their slots
+            with self._condition:
+                for _, _, request, _ in self._retries:
+                    self._report.failures += request[2]
+                    self._in_flight -= 1
+                self._retries.clear()
+
+        self._report.elapsed = time.perf_counter() - start
+        return self._report
+
+    def _wait_for(self, predicate) -> None:
+        """
+        Wait until a predicate holds, sending the retries as they fall
+        due. Must be called with the condition held.
+        """
+        while not predicate():
+            if not self._retries:
+                self._condition.wait()
+                continue
+            delay = self._retries[0][0] - time.monotonic()
+            if delay > 0:
+                self._condition.wait(delay)
+                continue
+            _, _, request, attempt = heapq.heappop(self._retries)
+            # Sending may fail at once and call _on_error, which takes
+            # the condition
+            self._condition.release()
+            try:
+                self._send(request, attempt)
+            finally:
+                self._condition.acquire()
+
+    def _requests(self, rows: Iterable[Sequence[Any]]):
+        """
+        Turn rows into (statement, parameters, row count) requests.
+        """
+        if self.partition_key_indexes is None:
+            for values in rows:
+                yield self.statement, values, 1
+            return
+
+        for group in partition_batches(rows, self.partition_key_indexes,
+                                       self.max_batch_rows,
+                                       self.max_batch_bytes):
+            # The throttle may allow fewer rows than max_batch_rows
+            batch_rows = self.throttle.batch_rows \
+                if self.throttle is not None else len(group)
+            for i in range(0, len(group), batch_rows):
+                yield self._batch(group[i:i + batch_rows])
+
+    def _batch(self, group: List[Sequence[Any]]):
+        """
+        Build the request for rows sharing a partition key.
+        """
+        if len(group) == 1:
+            return self.statement, group[0], 1
+
+        batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+        batch.is_idempotent = getattr(self.statement, 'is_idempotent',
+                                      False)
+        for values in group:
+            batch.add(self.statement, values)
+        return batch, None, len(group)
+
+    def _concurrency(self) -> int:
+        """
+        Get the current limit of requests in flight.
+        """
+        if self.throttle is not None:
+            return self.throttle.concurrency
+        return self.concurrency
+
+    def _submit(self, request) -> None:
+        """
+        Send a request, waiting for the rate limit and while the
+        concurrency limit is reached.
+        """
+        if self.rate_limiter is not None:
+            self._report.throttled += self.rate_limiter.acquire(request[2])
+
+        with self._condition:
+            self._wait_for(lambda: self._in_flight < self._concurrency())
+            self._in_flight += 1
+            self._report.requests += 1
+
+        self._send(request, 0)
+
+    def _send(self, request, attempt: int) -> None:
+        """
+        Execute a request asynchronously; the request already holds a
+        slot of the concurrency limit.
+        """
+        statement, values, size = request
+        kwargs = {}
+        if self.execution_profile is not None:
+            kwargs['execution_profile'] = self.execution_profile
+        start = time.perf_counter()
+        try:
+            future = self.session.execute_async(statement, values, **kwargs)
+        except Exception as error:
+            self._on_error(error, request, attempt)
+            return
+
+        future.add_callbacks(
+            self._on_success, self._on_error,
+            callback_args=(size, start), errback_args=(request, attempt)
+        )
+
+    def _on_success(self, _result, size: int, start: float) -> None:
+        latency = time.perf_counter() - start
+        observe('cassandra_request_seconds', latency)
+        observe('cassandra_batch_rows', size, buckets=SIZE_BUCKETS)
+        with self._condition:
+            self._report.rows += size
+            if self.throttle is not None:
+                self.throttle.on_success(latency)
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _on_error(self, error: Exception, request, attempt: int) -> None:
+        retryable = isinstance(error, RETRYABLE_ERRORS)
+        retry = retryable and attempt < self.max_retries \
+            and getattr(request[0], 'is_idempotent', False)
+
+        with self._condition:
+            if retryable and self.throttle is not None:
+                self.throttle.on_overload()
+            if retry:
+                # The request keeps its slot until it is sent again.
+                # Exponential backoff with jitter, so retries of requests
+                # that failed together are spread out.
+                self._report.retries += 1
+                delay = self.retry_delay * 2 ** attempt \
+                    * random.uniform(0.5, 1)
+                heapq.heappush(self._retries, (
+                    time.monotonic() + delay, next(self._sequence),
+                    request, attempt + 1))
+                self._condition.notify_all()
+            else:
+                self._report.failures += request[2]
+                increment('cassandra_write_failures_total', request[2])
+                if len(self._report.errors) < self.max_errors:
+                    self._report.errors.append(error)
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+        if retry:
+            increment('cassandra_retries_total')
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# Default bounds of a lookup cache
+DEFAULT_CACHE_ENTRIES = 1024
+DEFAULT_CACHE_TTL = 60.0
+
+_MISSING = object()
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of query results whose entries expire after a
+    time to live.
+
+    Every invalidation starts a new generation. A reader captures the
+    generation before running its query and passes it to put, so a
+    result read before a write that invalidated the cache in between is
+    not cached.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES,
+                 ttl: Optional[float] = DEFAULT_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a new instance of QueryCache.
+
+        Args:
+            max_entries: The maximum number of cached results; the least
+                         recently used ones are evicted beyond it
+                         (default is 1024).
+            ttl: The time in seconds a result stays valid (default is
+                 60, None keeps results until evicted or invalidated).
+            clock: The function returning the current time in seconds
+                   (default is time.monotonic).
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached result, counting a hit or a miss.
+
+        Args:
+            key: The key of the result.
+            default: The value returned on a miss (default is None).
+
+        Returns:
+            The cached result, or default if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires = entry
+                if expires is None or self.clock() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any,
+            generation: Optional[int] = None) -> bool:
+        """
+        Cache a result.
+
+        Args:
+            key: The key of the result.
+            value: The result.
+            generation: The generation of the cache when the result was
+                        read (default is None, which always caches it).
+
+        Returns:
+            bool: Whether the result was cached, i.e. the cache was not
+            invalidated since generation.
+        """
+        expires = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        """
+        Invalidate all the cached results.
+        """
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.generation += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The share of the lookups served from the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def info(self) -> dict:
+        """
+        Get the statistics of the cache.
+
+        Returns:
+            dict: The hits, misses, hit rate, evictions, expirations,
+                  invalidations, current size and maximum size.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'max_size': self.max_entries,
+            }
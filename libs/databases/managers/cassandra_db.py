@@ -1,17 +1,42 @@
+import asyncio
 from .base import BaseTableManager
-from typing import Dict, List, Any
-from ..connectors.cassandra_db import CassandraConnector
-from cassandra.query import BatchStatement
+from typing import (
+    Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Any, Union
+)
+from ..connectors.async_cassandra_db import (
+    AsyncCassandraConnector, gather_or_cancel
+)
+from ..connectors.cassandra_db import (
+    DEFAULT_CONCURRENCY, DEFAULT_FETCH_SIZE, CassandraConnector
+)
+from ..connectors.config import WRITE_PROFILE
+from .bulk import (
+    MAX_BATCH_BYTES, MAX_BATCH_ROWS, AdaptiveThrottle, BulkLoader,
+    LoadReport, partition_batches
+)
+from .cache import DEFAULT_CACHE_ENTRIES, DEFAULT_CACHE_TTL, QueryCache
+from .checkpoint import LoadCheckpoint
+from .scan import DEFAULT_SCAN_WORKERS, DEFAULT_SPLITS, TableScanner
+from .tables import ColumnChunk, TableDefinition, check_type
+from libs.metrics.registry import SIZE_BUCKETS, increment, observe, timed
+from cassandra.query import BatchStatement, BatchType, PreparedStatement
 from cassandra.cluster import ResultSet
 import pandas as pd
 
+# Maximum number of keys of a lookup coalesced into an IN query. Larger
+# IN queries make a single coordinator wait on many replicas.
+MAX_IN_KEYS = 20
+
 
 class CassandraTableManager(BaseTableManager):
     """
     Class for managing tables in Cassandra.
     """
 
-    def __init__(self, connector: CassandraConnector, keyspace: str):
+    def __init__(self, connector: CassandraConnector, keyspace: str,
+                 max_batch_rows: int = MAX_BATCH_ROWS,
+                 max_batch_bytes: int = MAX_BATCH_BYTES,
+                 concurrency: int = DEFAULT_CONCURRENCY):
         """
         Initialize a new instance of CassandraTableManager.
 
@@ -19,10 +44,26 @@ class CassandraTableManager(BaseTableManager):
             connector (CassandraConnector): The Cassandra connector
                                             to use for database operations.
             keyspace (str): The keyspace to use for table operations.
+            max_batch_rows (int): The maximum number of rows per batch
+                                  (default is 100).
+            max_batch_bytes (int): The maximum estimated size of a batch
+                                   in bytes (default is 5KB, Cassandra's
+                                   default batch size warning threshold).
+            concurrency (int): The maximum number of insert requests in
+                               flight (default is 64).
         """
 
         super().__init__(connector)
         self.keyspace = keyspace
+        self.max_batch_rows = max_batch_rows
+        self.max_batch_bytes = max_batch_bytes
+        self.concurrency = concurrency
+        # Key definitions of the tables created through this manager
+        self.tables = {}
+        # Lookup caches, by table name
+        self.caches = {}
+        # Asyncio connector sharing the connection, created on first use
+        self._async_connector = None
 
     def create_keyspace(self, replication_strategy: str = "SimpleStrategy",
                         replication_factor: int = 1) -> None:
@@ -77,6 +118,27 @@ class CassandraTableManager(BaseTableManager):
         )
 
         self.connector.session.execute(query)
+        self.connector.invalidate_prepared()
+        self._invalidate_cache(table_name)
+        self.tables[table_name] = {
+            'columns': dict(columns),
+            'partition_key': list(partition_key),
+            'clustering_key': list(clustering_key),
+        }
+
+    def create_table_from(self, definition: TableDefinition) -> None:
+        """
+        Create a table in Cassandra from its definition.
+
+        Args:
+            definition: The definition of the table.
+
+        Returns:
+            None.
+        """
+        self.create_table(definition.name, definition.column_types(),
+                          partition_key=definition.partition_key,
+                          clustering_key=definition.clustering_key)
 
     def _build_primary_key_str(self, partition_key: List[str],
                                clustering_key: List[str]) -> str:
@@ -106,42 +168,500 @@ class CassandraTableManager(BaseTableManager):
 
         return primary_key_str
 
-    def insert_data(self, table_name: str, data: List[Dict[str, Any]]) -> None:
+    def insert_data(self, table_name: str,
+                    data: Union[pd.DataFrame, Dict[str, Sequence[Any]],
+                                List[Dict[str, Any]]],
+                    partition_key: List[str] = None) -> int:
         """
         Insert data into the specified Cassandra table.
 
+        When the partition key of the table is known, rows are grouped by
+        partition key so every batch targets a single partition and is
+        sent UNLOGGED. Otherwise rows are sent in input order in logged
+        batches.
+
+        DataFrames and column arrays are bound without building a
+        dictionary per row: each column is converted once, missing
+        values becoming null and float columns of integer CQL columns
+        becoming integers when the table was created through this
+        manager.
+
+        Args:
+            table_name: The name of the table to insert data into.
+            data: The data to insert, either a DataFrame, a dictionary
+                of column names and arrays of values, or a list of
+                dictionaries, each one a row of data.
+                Key: The column name.
+                Value: The corresponding data.
+            partition_key List[str]:
+                    List of partition key columns (default is None, which
+                    uses the key of the table if it was created through
+                    this manager).
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        column_names, rows = self._to_rows(table_name, data)
+        if not rows:
+            return 0
+        return self.insert_rows(table_name, column_names, rows,
+                                partition_key)
+
+    def _to_rows(self, table_name: str,
+                 data: Union[pd.DataFrame, Dict[str, Sequence[Any]],
+                             List[Dict[str, Any]]]
+                 ) -> Tuple[List[str], List[Sequence[Any]]]:
+        """
+        Convert the data taken by insert_data to rows of values.
+
+        Args:
+            table_name: The name of the table the data is inserted into.
+            data: A DataFrame, a dictionary of column arrays or a list of
+                  dictionaries.
+
+        Returns:
+            The names of the columns and the rows of values.
+        """
+        if isinstance(data, dict):
+            data = pd.DataFrame(data, copy=False)
+        if len(data) == 0:
+            return [], []
+
+        if isinstance(data, pd.DataFrame):
+            column_names = list(data.columns)
+            chunk = ColumnChunk.from_frame(
+                data, column_names, self._column_types(table_name))
+            return column_names, list(chunk.rows())
+
+        column_names = list(data[0].keys())
+        return column_names, [list(row.values()) for row in data]
+
+    def _column_types(self, table_name: str) -> Dict[str, str]:
+        """
+        Get the CQL types of the columns of a table created through this
+        manager, or an empty dictionary for other tables.
+        """
+        return self.tables.get(table_name, {}).get('columns', {})
+
+    def insert_rows(self, table_name: str, column_names: List[str],
+                    rows: List[Sequence[Any]],
+                    partition_key: List[str] = None) -> int:
+        """
+        Insert rows of values into the specified Cassandra table.
+
+        Args:
+            table_name: The name of the table to insert data into.
+            column_names: The names of the columns of each row.
+            rows: A list of rows, each one a sequence of column values
+                  in the order of column_names.
+            partition_key List[str]:
+                    List of partition key columns (default is None, which
+                    uses the key of the table if it was created through
+                    this manager).
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        prepared_statement = self._prepare_insert(table_name, column_names)
+        try:
+            with timed('cassandra_insert_seconds', {'table': table_name}):
+                self._insert_rows(
+                    prepared_statement, rows,
+                    self._partition_key_indexes(table_name, column_names,
+                                                partition_key)
+                )
+        finally:
+            # After the write, so a lookup racing with it cannot cache
+            # the rows it replaces; also after a failure, which may have
+            # written part of the rows
+            self._invalidate_cache(table_name)
+        increment('cassandra_rows_inserted_total', len(rows),
+                  {'table': table_name})
+        return len(rows)
+
+    def insert_chunks(self, table_name: str,
+                      chunks: Iterable[pd.DataFrame],
+                      columns: List[str],
+                      partition_key: List[str] = None) -> int:
+        """
+        Insert an iterable of DataFrame chunks into the specified
+        Cassandra table, one chunk at a time, so the whole dataset
+        never has to be held in memory.
+
+        Args:
+            table_name: The name of the table to insert data into.
+            chunks: An iterable of DataFrames with the data to insert.
+            columns: The columns of each chunk to insert.
+            partition_key List[str]:
+                    List of partition key columns (default is None, which
+                    uses the key of the table if it was created through
+                    this manager).
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        total_rows = 0
+        for chunk in chunks:
+            total_rows += self.insert_data(table_name, chunk[columns],
+                                           partition_key)
+        return total_rows
+
+    def insert_resumable(self, table_name: str,
+                         sources: Union[
+                             Dict[str, Iterable[pd.DataFrame]],
+                             Iterable[Tuple[str, Iterable[pd.DataFrame]]]],
+                         checkpoint: LoadCheckpoint,
+                         columns: List[str] = None,
+                         partition_key: List[str] = None) -> int:
+        """
+        Insert the chunks of several sources, such as files, into the
+        specified Cassandra table, committing the progress of each source
+        to a checkpoint after every chunk.
+
+        Running the load again after a failure skips the sources already
+        done and the chunks already committed, so it resumes from the
+        last committed chunk instead of starting over. The chunks of a
+        source must come in the same order on every run, e.g.
+
+            sources = ((path, reader.iter_file_chunks(path, 50_000))
+                       for path in reader.file_paths)
+            manager.insert_resumable('song_length', sources, checkpoint)
+
+        Args:
+            table_name: The name of the table to insert data into.
+            sources: A dictionary or an iterable of pairs of source
+                     identifiers and their iterables of DataFrame chunks.
+                     The chunks of a skipped source are not iterated.
+            checkpoint: The LoadCheckpoint recording the progress. Reset
+                        it for the table when the table is recreated.
+            columns: The columns of each chunk to insert (default is
+                     None, which inserts all columns).
+            partition_key List[str]:
+                    List of partition key columns (default is None, which
+                    uses the key of the table if it was created through
+                    this manager).
+
+        Returns:
+            int: The number of rows inserted by this run.
+        """
+        if isinstance(sources, dict):
+            sources = sources.items()
+
+        total_rows = 0
+        for source, chunks in sources:
+            if checkpoint.is_done(table_name, source):
+                continue
+
+            offset = checkpoint.offset(table_name, source)
+            position = 0
+            for chunk in chunks:
+                start = position
+                position += len(chunk)
+                if position <= offset:
+                    continue
+                if start < offset:
+                    # The chunk size changed since the checkpoint
+                    chunk = chunk.iloc[offset - start:]
+                if columns is not None:
+                    chunk = chunk[columns]
+                total_rows += self.insert_data(table_name, chunk,
+                                               partition_key)
+                checkpoint.commit(table_name, source, position)
+
+            checkpoint.commit(table_name, source, position, done=True)
+        return total_rows
+
+    def bulk_insert(self, table_name: str, data: List[Dict[str, Any]],
+                    concurrency: int = 64,
+                    group_by_partition: bool = False,
+                    adaptive: bool = True,
+                    target_latency: Optional[float] = None,
+                    max_rows_per_second: Optional[float] = None,
+                    max_retries: int = 3) -> LoadReport:
+        """
+        Insert data into the specified Cassandra table with concurrent
+        asynchronous requests instead of synchronous logged batches.
+
+        Inserts are marked idempotent, so the ones failing with a write
+        timeout or an overloaded error are retried with backoff.
+
         Args:
             table_name: The name of the table to insert data into.
             data: A list of dictionaries containing the data to insert.
                 Each dictionary represents a row of data.
                 Key: The column name.
                 Value: The corresponding data.
+            concurrency: The maximum number of requests in flight
+                         (default is 64).
+            group_by_partition: If True, rows sharing a partition key are
+                    sent together in UNLOGGED batches. Requires the table
+                    to have been created through this manager
+                    (default is False).
+            adaptive: If True, the requests in flight and the rows per
+                      batch adapt to the latency and errors of the
+                      cluster (AIMD), up to concurrency and
+                      max_batch_rows (default is True).
+            target_latency: The request latency in seconds above which
+                            an adaptive load slows down (default is None,
+                            which only slows down on errors).
+            max_rows_per_second: The ceiling on the rows written per
+                                 second (default is None, no ceiling).
+            max_retries: The maximum number of retries of a request
+                         (default is 3).
 
         Returns:
-            None.
+            LoadReport: The rows written, failures and throughput.
+        """
+        if not data:
+            return LoadReport()
+
+        column_names = list(data[0].keys())
+        partition_key_indexes = None
+        if group_by_partition:
+            partition_key_indexes = self._partition_key_indexes(
+                table_name, column_names)
+            if partition_key_indexes is None:
+                raise ValueError(
+                    f"The partition key of '{table_name}' is unknown.")
+
+        loader = BulkLoader(
+            self.connector.session,
+            self._prepare_insert(table_name, column_names),
+            concurrency=concurrency,
+            partition_key_indexes=partition_key_indexes,
+            max_batch_rows=self.max_batch_rows,
+            max_batch_bytes=self.max_batch_bytes,
+            execution_profile=WRITE_PROFILE,
+            throttle=AdaptiveThrottle(
+                max_concurrency=concurrency,
+                max_batch_rows=self.max_batch_rows,
+                target_latency=target_latency,
+            ) if adaptive else None,
+            max_rows_per_second=max_rows_per_second,
+            max_retries=max_retries,
+        )
+        try:
+            report = loader.load(list(row.values()) for row in data)
+        finally:
+            self._invalidate_cache(table_name)
+        increment('cassandra_rows_inserted_total', report.rows,
+                  {'table': table_name})
+        return report
+
+    @staticmethod
+    def _insert_query(table_name: str, column_names: List[str]) -> str:
+        """
+        Build the INSERT query for the given table and columns, with a ?
+        placeholder per column.
         """
-        column_names = data[0].keys()
         placeholders = ', '.join(['?' for _ in column_names])
-        prepared_query = (
+        return (
             f"INSERT INTO {table_name} "
             f"({', '.join(column_names)}) "
             f"VALUES ({placeholders})"
         )
 
-        prepared_statement = self.connector.session.prepare(prepared_query)
+    def _prepare_insert(self, table_name: str,
+                        column_names: List[str]) -> PreparedStatement:
+        """
+        Prepare the INSERT statement for the given table and columns.
+
+        Args:
+            table_name: The name of the table to insert data into.
+            column_names: The names of the columns to insert.
+
+        Returns:
+            PreparedStatement: The prepared INSERT statement.
+        """
+        prepared_statement = self.connector.prepare(
+            self._insert_query(table_name, column_names))
+        # Plain inserts can be applied twice, so they are safe to retry
+        prepared_statement.is_idempotent = True
+        return prepared_statement
+
+    def _partition_key_indexes(self, table_name: str,
+                               column_names: List[str],
+                               partition_key: List[str] = None
+                               ) -> Optional[List[int]]:
+        """
+        Get the positions of the partition key columns in a row.
+
+        Args:
+            table_name: The name of the table.
+            column_names: The names of the columns of each row.
+            partition_key List[str]:
+                    List of partition key columns (default is None, which
+                    uses the partition columns of the table if it was
+                    created through this manager).
+
+        Returns:
+            The positions of the partition key columns, or None if the
+            partition key is unknown or not part of the columns.
+        """
+        if partition_key is None:
+            partition_key = self._partition_columns(table_name)
+        if not partition_key or \
+                not set(partition_key).issubset(column_names):
+            return None
+        return [column_names.index(column) for column in partition_key]
+
+    def _insert_rows(self, prepared_statement: PreparedStatement,
+                     rows: List[List[Any]],
+                     partition_key_indexes: List[int] = None) -> None:
+        """
+        Insert rows of values in batches with a prepared statement, with
+        up to concurrency requests in flight.
+
+        Args:
+            prepared_statement: The prepared INSERT statement.
+            rows: A list of rows, each one a list of column values.
+            partition_key_indexes: The positions of the partition key
+                    columns in each row (default is None, which batches
+                    the rows in input order in logged batches).
+
+        Returns:
+            None.
+        """
+        if partition_key_indexes is None:
+            groups = (rows[i:i + self.max_batch_rows]
+                      for i in range(0, len(rows), self.max_batch_rows))
+            batch_type = BatchType.LOGGED
+        else:
+            groups = partition_batches(rows, partition_key_indexes,
+                                       self.max_batch_rows,
+                                       self.max_batch_bytes)
+            batch_type = BatchType.UNLOGGED
+
+        def requests():
+            for group in groups:
+                observe('cassandra_batch_rows', len(group),
+                        buckets=SIZE_BUCKETS)
+                # A single row partition is sent without a batch
+                if len(group) == 1 and batch_type == BatchType.UNLOGGED:
+                    yield prepared_statement, group[0]
+                    continue
+                batch = BatchStatement(batch_type=batch_type)
+                for values in group:
+                    batch.add(prepared_statement, values)
+                yield batch, None
+
+        self.connector.execute_statements(requests(), self.concurrency,
+                                          WRITE_PROFILE)
+
+    @property
+    def async_connector(self) -> AsyncCassandraConnector:
+        """
+        The asyncio connector sharing the connection of the manager.
+        """
+        if self._async_connector is None:
+            self._async_connector = AsyncCassandraConnector(self.connector)
+        return self._async_connector
+
+    async def insert_data_async(self, table_name: str,
+                                data: Union[pd.DataFrame,
+                                            Dict[str, Sequence[Any]],
+                                            List[Dict[str, Any]]],
+                                partition_key: List[str] = None,
+                                concurrency: int = DEFAULT_CONCURRENCY
+                                ) -> int:
+        """
+        Insert data into the specified Cassandra table without blocking
+        the event loop, with up to concurrency requests in flight.
+
+        When the partition key of the table is known, rows of a partition
+        are sent together in UNLOGGED batches; otherwise every row is
+        sent as its own request.
+
+        Args:
+            table_name: The name of the table to insert data into.
+            data: The data to insert, either a DataFrame, a dictionary
+                of column names and arrays of values, or a list of
+                dictionaries (see insert_data).
+            partition_key List[str]:
+                    List of partition key columns (default is None, which
+                    uses the key of the table if it was created through
+                    this manager).
+            concurrency: The maximum number of requests in flight
+                         (default is 64).
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be a positive integer.")
+        column_names, rows = self._to_rows(table_name, data)
+        if not rows:
+            return 0
+
+        prepared_statement = await self.async_connector.prepare(
+            self._insert_query(table_name, column_names))
+        prepared_statement.is_idempotent = True
+        partition_key_indexes = self._partition_key_indexes(
+            table_name, column_names, partition_key)
+        if partition_key_indexes is None:
+            groups = [[values] for values in rows]
+        else:
+            groups = partition_batches(rows, partition_key_indexes,
+                                       self.max_batch_rows,
+                                       self.max_batch_bytes)
+
+        slots = asyncio.Semaphore(concurrency)
+
+        async def send(group):
+            if len(group) == 1:
+                statement, parameters = prepared_statement, group[0]
+            else:
+                statement = BatchStatement(batch_type=BatchType.UNLOGGED)
+                for values in group:
+                    statement.add(prepared_statement, values)
+                parameters = None
+            async with slots:
+                await self.async_connector.execute_query(
+                    statement, parameters, WRITE_PROFILE)
 
-        batch = BatchStatement()
+        try:
+            await gather_or_cancel(*(send(group) for group in groups))
+        finally:
+            self._invalidate_cache(table_name)
+        return len(rows)
 
-        batch_size = 100  # Adjust the batch size as per your requirements
-        total_rows = len(data)
+    async def execute_query_async(self, query: str,
+                                  parameters: Sequence[Any] = None
+                                  ) -> List[Any]:
+        """
+        Execute a query without blocking the event loop.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None). When set, the query is
+                        executed as a cached prepared statement.
 
-        for i in range(0, total_rows, batch_size):
-            batch = BatchStatement()
-            for row in data[i:i+batch_size]:
-                values = list(row.values())
-                batch.add(prepared_statement, values)
+        Returns:
+            A list of the rows of the result.
+        """
+        return await self.async_connector.execute_query(query, parameters)
 
-            self.connector.session.execute(batch)
+    async def query_to_dataframe_async(self, query: str,
+                                       parameters: Sequence[Any] = None,
+                                       fetch_size: int = DEFAULT_FETCH_SIZE
+                                       ) -> pd.DataFrame:
+        """
+        Convert the result of a query to a pandas DataFrame without
+        blocking the event loop.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            pd.DataFrame: The result set as a pandas DataFrame.
+        """
+        return await self.async_connector.query_to_dataframe(
+            query, parameters, fetch_size)
 
     def drop_table(self, table_name: str) -> None:
         """
@@ -155,18 +675,317 @@ class CassandraTableManager(BaseTableManager):
         """
         query = f"DROP TABLE IF EXISTS {table_name}"
         self.connector.session.execute(query)
+        self.connector.invalidate_prepared()
+        self._invalidate_cache(table_name)
+        self.tables.pop(table_name, None)
+
+    def enable_lookup_cache(self, table_name: str = None,
+                            max_entries: int = DEFAULT_CACHE_ENTRIES,
+                            ttl: Optional[float] = DEFAULT_CACHE_TTL
+                            ) -> None:
+        """
+        Serve the lookups of a table from an in-process read-through
+        cache. Writes and schema changes issued through this manager
+        invalidate the cache of their table; writes from other clients
+        are only seen once the cached results expire.
+
+        Args:
+            table_name: The name of the table (default is None, which
+                        enables the cache of every table created through
+                        this manager).
+            max_entries: The maximum number of cached lookups of the
+                         table (default is 1024).
+            ttl: The time in seconds a cached lookup stays valid
+                 (default is 60, None keeps it until evicted or
+                 invalidated).
+        """
+        table_names = [table_name] if table_name is not None \
+            else list(self.tables)
+        for name in table_names:
+            self.caches[name] = QueryCache(max_entries, ttl)
+
+    def disable_lookup_cache(self, table_name: str = None) -> None:
+        """
+        Stop caching the lookups of a table.
+
+        Args:
+            table_name: The name of the table (default is None, which
+                        disables the cache of every table).
+        """
+        if table_name is None:
+            self.caches.clear()
+        else:
+            self.caches.pop(table_name, None)
+
+    def lookup_cache_info(self) -> Dict[str, dict]:
+        """
+        Get the statistics of the lookup caches.
+
+        Returns:
+            A dictionary of table names and the hits, misses, hit rate,
+            evictions, expirations, invalidations and size of their
+            cache.
+        """
+        return {name: cache.info() for name, cache in self.caches.items()}
+
+    def _invalidate_cache(self, table_name: str) -> None:
+        """
+        Clear the lookup cache of a table after a write.
+        """
+        cache = self.caches.get(table_name)
+        if cache is not None:
+            cache.clear()
+
+    def lookup(self, table_name: str, key: Dict[str, Any],
+               columns: List[str] = None,
+               use_cache: bool = True) -> List[Any]:
+        """
+        Get the rows of a table matching an exact key, e.g.
+
+            manager.lookup('song_length',
+                           {'sessionId': 338, 'itemInSession': 4})
+
+        When the cache of the table is enabled, repeated lookups are
+        served without a round trip to the cluster.
+
+        Args:
+            table_name: The name of the table.
+            key: A dictionary of key column names and their values. For
+                 tables created through this manager, the columns must
+                 be a prefix of the primary key and the values match
+                 the column types.
+            columns: The columns to select (default is None, which
+                     selects all columns).
+            use_cache: Whether the cache of the table may serve the
+                       lookup (default is True).
+
+        Returns:
+            A list of the matching rows.
+
+        Raises:
+            ValueError: If the key is empty or not a primary key prefix.
+            TypeError: If a key value does not match its column type.
+        """
+        self._check_key(table_name, key)
+        cache = self.caches.get(table_name) if use_cache else None
+        cache_key = self._cache_key(key, columns)
+        if cache is not None:
+            rows = cache.get(cache_key)
+            if rows is not None:
+                return list(rows)
+            # A write completing during the query invalidates its rows
+            generation = cache.generation
+
+        query = self._select_query(table_name, list(key), columns)
+        rows = list(self.connector.execute_query(query, list(key.values())))
+        if cache is not None:
+            cache.put(cache_key, tuple(rows), generation)
+        return rows
+
+    def lookup_many(self, table_name: str, keys: List[Dict[str, Any]],
+                    columns: List[str] = None,
+                    concurrency: int = DEFAULT_CONCURRENCY,
+                    max_in_keys: int = MAX_IN_KEYS,
+                    use_cache: bool = True) -> pd.DataFrame:
+        """
+        Get the rows of a table matching many exact keys, e.g. the
+        sessions of a list of users, in a single DataFrame.
+
+        Keys missing from the cache are fetched with concurrent
+        asynchronous requests instead of one synchronous round trip
+        each. Small groups of keys only differing by their last column
+        are coalesced into a single query with an IN condition on that
+        column, when it is a clustering column, so that each IN query
+        still reads a single partition. The rows of an IN query cannot
+        be told apart by key when the key columns are not selected, so
+        they are returned together, in clustering order, and are not
+        added to the cache: pass max_in_keys=0 for rows in strict key
+        order and every key cached.
+
+        Args:
+            table_name: The name of the table.
+            keys: A list of keys, each one a dictionary of the same key
+                  columns and their values (see lookup).
+            columns: The columns to select (default is None, which
+                     selects all columns).
+            concurrency: The maximum number of requests in flight
+                         (default is 64).
+            max_in_keys: The maximum number of keys coalesced into an IN
+                         query (default is 20, 0 disables coalescing).
+            use_cache: Whether the cache of the table may serve the
+                       lookups (default is True).
+
+        Returns:
+            pd.DataFrame: The rows of all the keys, in the order of the
+            keys, the rows of coalesced keys coming at the position of
+            the first of them.
+
+        Raises:
+            ValueError: If the keys do not have the same columns or are
+                        not primary key prefixes.
+            TypeError: If a key value does not match its column type.
+        """
+        if not keys:
+            return pd.DataFrame(columns=columns)
+        key_columns = list(keys[0])
+        for key in keys:
+            if list(key) != key_columns:
+                raise ValueError("The lookup keys must have the same "
+                                 "columns, in the same order.")
+            self._check_key(table_name, key)
+
+        cache = self.caches.get(table_name) if use_cache else None
+        generation = cache.generation if cache is not None else None
+        # Rows of each key, or of the first key of an IN group
+        results = [None] * len(keys)
+        pending = []
+        for index, key in enumerate(keys):
+            rows = cache.get(self._cache_key(key, columns)) \
+                if cache is not None else None
+            if rows is not None:
+                results[index] = list(rows)
+            else:
+                pending.append(index)
+
+        # Group the pending keys of a partition by all but their last
+        # column
+        groups = {}
+        partition_columns = self._partition_columns(table_name)
+        if partition_columns is not None and \
+                len(key_columns) > len(partition_columns):
+            for index in pending:
+                prefix = tuple(keys[index].values())[:-1]
+                groups.setdefault(prefix, []).append(index)
+        else:
+            groups = {index: [index] for index in pending}
+
+        singles = []
+        coalesced = []
+        for group in groups.values():
+            if 1 < len(group) <= max_in_keys:
+                coalesced.append(group)
+            else:
+                singles.extend(group)
+
+        if singles:
+            singles.sort()
+            rows = self.connector.execute_concurrent(
+                self._select_query(table_name, key_columns, columns),
+                [list(keys[index].values()) for index in singles],
+                concurrency)
+            for index, key_rows in zip(singles, rows):
+                results[index] = key_rows
+                if cache is not None:
+                    cache.put(self._cache_key(keys[index], columns),
+                              tuple(key_rows), generation)
+
+        if coalesced:
+            rows = self.connector.execute_concurrent(
+                self._select_query(table_name, key_columns, columns,
+                                   coalesce_last=True),
+                [list(keys[group[0]].values())[:-1]
+                 + [[keys[index][key_columns[-1]] for index in group]]
+                 for group in coalesced],
+                concurrency)
+            # Not cached: the rows of the keys of a group are mixed
+            for group, group_rows in zip(coalesced, rows):
+                results[group[0]] = group_rows
+                for index in group[1:]:
+                    results[index] = []
+
+        all_rows = [row for key_rows in results for row in key_rows]
+        if not all_rows:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(all_rows)
 
-    def execute_query(self, query: str) -> ResultSet:
+    def _partition_columns(self, table_name: str) -> Optional[List[str]]:
+        """
+        Get the columns Cassandra hashes into the partition of a table
+        created through this manager. Without a clustering key, the
+        primary key is declared without parentheses, so only its first
+        column is the partition key.
+
+        Returns:
+            The partition columns, or None when the table was not created
+            through this manager.
+        """
+        table = self.tables.get(table_name)
+        if table is None:
+            return None
+        if table['clustering_key']:
+            return table['partition_key']
+        return table['partition_key'][:1]
+
+    @staticmethod
+    def _cache_key(key: Dict[str, Any], columns: List[str] = None):
+        """
+        Get the key of a lookup in the lookup cache.
+        """
+        return tuple(columns or ()), tuple(key.items())
+
+    @staticmethod
+    def _select_query(table_name: str, key_columns: List[str],
+                      columns: List[str] = None,
+                      coalesce_last: bool = False) -> str:
+        """
+        Build the SELECT query of a lookup.
+
+        Args:
+            table_name: The name of the table.
+            key_columns: The key columns, each one bound to a ?
+                         placeholder.
+            columns: The columns to select (default is None, which
+                     selects all columns).
+            coalesce_last: Whether the last key column is matched with
+                           IN against a list of values (default is
+                           False).
+
+        Returns:
+            str: The query.
+        """
+        conditions = [f"{column} = ?" for column in key_columns]
+        if coalesce_last:
+            conditions[-1] = f"{key_columns[-1]} IN ?"
+        return (
+            f"SELECT {', '.join(columns) if columns else '*'} "
+            f"FROM {table_name} WHERE {' AND '.join(conditions)}"
+        )
+
+    def _check_key(self, table_name: str, key: Dict[str, Any]) -> None:
+        """
+        Check a lookup key against the definition of its table, when the
+        table was created through this manager.
+        """
+        if not key:
+            raise ValueError("The lookup key must have at least a column.")
+        table = self.tables.get(table_name)
+        if table is None:
+            return
+
+        primary_key = table['partition_key'] + table['clustering_key']
+        if list(key) != primary_key[:len(key)]:
+            raise ValueError(
+                f"The lookup key {list(key)} of '{table_name}' is not a "
+                f"prefix of its primary key {primary_key}."
+            )
+        for column, value in key.items():
+            check_type(column, table['columns'].get(column), value)
+
+    def execute_query(self, query: str,
+                      parameters: Sequence[Any] = None) -> ResultSet:
         """
         Execute a query on the Cassandra database.
 
         Args:
             query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None). When set, the query is
+                        executed as a cached prepared statement.
 
         Returns:
             The result set of the query.
         """
-        return self.connector.session.execute(query)
+        return self.connector.execute_query(query, parameters)
 
     def print_query_result(self, result_set: ResultSet) -> None:
         """
@@ -181,14 +1000,145 @@ class CassandraTableManager(BaseTableManager):
         for row in result_set:
             print(row)
 
-    def query_to_dataframe(self, query: str) -> pd.DataFrame:
+    def query_to_dataframe(self, query: str,
+                           parameters: Sequence[Any] = None) -> pd.DataFrame:
         """
         Convert the result of a query to a pandas DataFrame.
 
         Args:
             query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
 
         Returns:
             pd.DataFrame: The result set as a pandas DataFrame.
         """
-        return self.connector.query_to_dataframe(query)
+        return self.connector.query_to_dataframe(query, parameters)
+
+    def iter_dataframes(self, query: str, parameters: Sequence[Any] = None,
+                        fetch_size: int = DEFAULT_FETCH_SIZE
+                        ) -> Iterator[pd.DataFrame]:
+        """
+        Execute a query and iterate over its result as one DataFrame
+        per page.
+
+        Args:
+            query: The query to execute.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            An iterator of DataFrames.
+        """
+        return self.connector.iter_dataframes(query, parameters, fetch_size)
+
+    def export_query(self, query: str, writer, file_path: str,
+                     parameters: Sequence[Any] = None,
+                     fetch_size: int = DEFAULT_FETCH_SIZE) -> int:
+        """
+        Write the result of a query to a file page by page, so large
+        results are exported without being held in memory.
+
+        Args:
+            query: The query to execute.
+            writer: The writer used to write the pages, e.g. a CSVWriter.
+            file_path: The path of the file to write.
+            parameters: The values bound to the ? placeholders of the
+                        query (default is None).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            int: The number of rows written.
+        """
+        return writer.write_chunks(
+            file_path, self.iter_dataframes(query, parameters, fetch_size))
+
+    def table_scanner(self, table_name: str, columns: List[str] = None,
+                      partition_key: List[str] = None,
+                      splits: int = DEFAULT_SPLITS,
+                      max_workers: int = DEFAULT_SCAN_WORKERS,
+                      fetch_size: int = DEFAULT_FETCH_SIZE) -> TableScanner:
+        """
+        Get a parallel token range scanner of a whole table.
+
+        Args:
+            table_name: The name of the table.
+            columns: The columns to read (default is None, which reads
+                     all columns).
+            partition_key List[str]:
+                    List of partition key columns (default is None, which
+                    uses the key of the table if it was created through
+                    this manager, or the schema of the cluster).
+            splits: The minimum number of token ranges (default is 64).
+            max_workers: The number of ranges scanned in parallel
+                         (default is 8).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+
+        Returns:
+            TableScanner: The scanner of the table.
+        """
+        return TableScanner(
+            self.connector, table_name,
+            partition_key or self._scan_partition_key(table_name),
+            columns=columns, splits=splits, max_workers=max_workers,
+            fetch_size=fetch_size)
+
+    def export_table(self, table_name: str, writer, file_path: str,
+                     columns: List[str] = None,
+                     partition_key: List[str] = None,
+                     splits: int = DEFAULT_SPLITS,
+                     max_workers: int = DEFAULT_SCAN_WORKERS,
+                     fetch_size: int = DEFAULT_FETCH_SIZE,
+                     **kwargs) -> int:
+        """
+        Write a whole table to a file, scanning its token ranges in
+        parallel and streaming the pages into the writer, e.g. for
+        nightly exports. Rows are not written in any particular order.
+
+        Args:
+            table_name: The name of the table.
+            writer: The writer used to write the pages, e.g. a CSVWriter
+                    or a ParquetWriter.
+            file_path: The path of the file to write.
+            columns: The columns to export (default is None, which
+                     exports all columns).
+            partition_key List[str]:
+                    List of partition key columns (default is None, see
+                    table_scanner).
+            splits: The minimum number of token ranges (default is 64).
+            max_workers: The number of ranges scanned in parallel
+                         (default is 8).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+            **kwargs: Other arguments of the write_chunks method of the
+                      writer, e.g. compression for a CSVWriter.
+
+        Returns:
+            int: The number of rows written.
+        """
+        scanner = self.table_scanner(table_name, columns, partition_key,
+                                     splits, max_workers, fetch_size)
+        return scanner.export(writer, file_path, **kwargs)
+
+    def _scan_partition_key(self, table_name: str) -> List[str]:
+        """
+        Get the partition key a token range scan of a table hashes.
+
+        Raises:
+            ValueError: If the partition key of the table is unknown.
+        """
+        partition_columns = self._partition_columns(table_name)
+        if partition_columns:
+            return partition_columns
+
+        keyspace = self.connector.cluster.metadata.keyspaces \
+            .get(self.keyspace)
+        table = keyspace.tables.get(table_name) if keyspace else None
+        if table is None:
+            raise ValueError(
+                f"The partition key of '{table_name}' is unknown.")
+        return [column.name for column in table.partition_key]
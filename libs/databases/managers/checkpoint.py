@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+
+class LoadCheckpoint:
+    """
+    Persistent record of the progress of table loads: for each table and
+    input source, such as a file, the number of rows already written.
+
+    An interrupted load resumes after the last committed chunk. Chunks
+    written but not yet committed are written again, which Cassandra
+    applies as idempotent upserts.
+    """
+
+    def __init__(self, state_path: str):
+        """
+        Initialize a new instance of LoadCheckpoint.
+
+        Args:
+            state_path: The path of the JSON file holding the state. It
+                        is created on the first commit.
+        """
+        self.state_path = state_path
+        self.tables = {}
+        self._lock = threading.Lock()
+        if os.path.exists(state_path):
+            with open(state_path, encoding='utf8') as f:
+                self.tables = json.load(f)
+
+    def get(self, table_name: str, source: str) -> Optional[Dict]:
+        """
+        Get the progress of a source loaded into a table.
+
+        Args:
+            table_name: The name of the table.
+            source: The identifier of the input source.
+
+        Returns:
+            A dictionary with the committed 'rows' and whether the source
+            is 'done', or None if nothing was committed.
+        """
+        return self.tables.get(table_name, {}).get(source)
+
+    def offset(self, table_name: str, source: str) -> int:
+        """
+        Get the number of rows of a source already written to a table.
+
+        Args:
+            table_name: The name of the table.
+            source: The identifier of the input source.
+
+        Returns:
+            int: The committed number of rows.
+        """
+        entry = self.get(table_name, source)
+        return entry['rows'] if entry is not None else 0
+
+    def is_done(self, table_name: str, source: str) -> bool:
+        """
+        Check whether a source was completely loaded into a table.
+
+        Args:
+            table_name: The name of the table.
+            source: The identifier of the input source.
+        """
+        entry = self.get(table_name, source)
+        return entry is not None and entry['done']
+
+    def commit(self, table_name: str, source: str, rows: int,
+               done: bool = False) -> None:
+        """
+        Record the rows of a source written to a table and save the
+        state.
+
+        Args:
+            table_name: The name of the table.
+            source: The identifier of the input source.
+            rows: The number of rows of the source written so far.
+            done: Whether the whole source was written (default is
+                  False).
+        """
+        with self._lock:
+            self.tables.setdefault(table_name, {})[source] = {
+                'rows': rows,
+                'done': done,
+            }
+            self._save()
+
+    def reset(self, table_name: Optional[str] = None) -> None:
+        """
+        Forget the progress of a table, e.g. after it was dropped, or of
+        all the tables.
+
+        Args:
+            table_name: The name of the table (default is None, which
+                        resets all the tables).
+        """
+        with self._lock:
+            if table_name is None:
+                self.tables = {}
+            else:
+                self.tables.pop(table_name, None)
+            self._save()
+
+    def _save(self) -> None:
+        """
+        Write the state atomically, through a temporary file.
+        """
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, 'w', encoding='utf8') as f:
+            json.dump(self.tables, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.state_path)
@@ -0,0 +1,236 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Sequence, Tuple
+import pandas as pd
+from ..connectors.cassandra_db import DEFAULT_FETCH_SIZE, CassandraConnector
+
+# Bounds of the token ring of the Murmur3Partitioner. No partition key
+# hashes to MIN_TOKEN, so the ranges (MIN_TOKEN, MAX_TOKEN] cover them all.
+MIN_TOKEN = -2 ** 63
+MAX_TOKEN = 2 ** 63 - 1
+
+# Default number of token ranges scanned by a full table scan
+DEFAULT_SPLITS = 64
+# Default number of token ranges scanned in parallel
+DEFAULT_SCAN_WORKERS = 8
+
+_RANGE_DONE = object()
+
+TokenRange = Tuple[int, int]
+
+
+def split_token_range(start: int, end: int, splits: int) -> List[TokenRange]:
+    """
+    Split the token range (start, end] into contiguous sub-ranges of
+    equal width.
+
+    Args:
+        start: The exclusive start of the range.
+        end: The inclusive end of the range.
+        splits: The number of sub-ranges.
+
+    Returns:
+        The sub-ranges as (start, end] pairs, in token order.
+    """
+    if splits <= 0:
+        raise ValueError("splits must be a positive integer.")
+    splits = min(splits, end - start)
+    width = (end - start) // splits
+    bounds = [start + i * width for i in range(splits)] + [end]
+    return list(zip(bounds, bounds[1:]))
+
+
+def token_ranges(splits: int = DEFAULT_SPLITS,
+                 ring: Sequence[int] = ()) -> List[TokenRange]:
+    """
+    Split the whole token ring into ranges for a parallel scan.
+
+    Args:
+        splits: The minimum number of ranges (default is 64).
+        ring: The tokens of the nodes of the cluster (default is empty).
+              The ring is first cut at these tokens, so that no range
+              spans the data of two nodes, then every node range is
+              split further.
+
+    Returns:
+        The ranges as (start, end] pairs covering the ring, in token
+        order.
+    """
+    tokens = sorted({token for token in ring if MIN_TOKEN < token < MAX_TOKEN})
+    edges = [MIN_TOKEN] + tokens + [MAX_TOKEN]
+    per_edge = -(-splits // (len(edges) - 1))
+    ranges = []
+    for start, end in zip(edges, edges[1:]):
+        ranges.extend(split_token_range(start, end, per_edge))
+    return ranges
+
+
+def ring_tokens(connector: CassandraConnector) -> List[int]:
+    """
+    Get the tokens of the nodes of a connected cluster.
+
+    Args:
+        connector: The connector of the cluster.
+
+    Returns:
+        The tokens, or an empty list if the token map is unknown, e.g.
+        before connecting.
+    """
+    token_map = connector.cluster.metadata.token_map
+    if token_map is None:
+        return []
+    return [token.value for token in token_map.ring]
+
+
+class TableScanner:
+    """
+    Parallel full scan of a Cassandra table.
+
+    Instead of a single SELECT driven by one coordinator, the token ring
+    is split into ranges queried concurrently with
+    token(partition key) > ? AND token(partition key) <= ?, each range
+    being paged independently. Pages are handed over as DataFrames
+    through a bounded queue, so only a few pages are held in memory
+    whatever the size of the table. Pages of different ranges arrive in
+    no particular order.
+    """
+
+    def __init__(self, connector: CassandraConnector, table_name: str,
+                 partition_key: List[str], columns: List[str] = None,
+                 splits: int = DEFAULT_SPLITS,
+                 max_workers: int = DEFAULT_SCAN_WORKERS,
+                 fetch_size: int = DEFAULT_FETCH_SIZE,
+                 queue_size: int = None):
+        """
+        Initialize a new instance of TableScanner.
+
+        Args:
+            connector: The connector of the cluster.
+            table_name: The name of the table to scan.
+            partition_key: The partition key columns of the table.
+            columns: The columns to read (default is None, which reads
+                     all columns).
+            splits: The minimum number of token ranges (default is 64).
+            max_workers: The number of ranges scanned in parallel
+                         (default is 8).
+            fetch_size: The number of rows fetched per page
+                        (default is 5000).
+            queue_size: The maximum number of pages waiting to be
+                        consumed (default is None, which uses
+                        2 * max_workers).
+        """
+        if not partition_key:
+            raise ValueError("A table scan needs the partition key.")
+        self.connector = connector
+        self.table_name = table_name
+        self.partition_key = list(partition_key)
+        self.columns = columns
+        self.splits = splits
+        self.max_workers = max_workers
+        self.fetch_size = fetch_size
+        self.queue_size = queue_size or 2 * max_workers
+
+    @property
+    def query(self) -> str:
+        """
+        The query reading one token range.
+        """
+        token = f"token({', '.join(self.partition_key)})"
+        columns = ', '.join(self.columns) if self.columns else '*'
+        return (f"SELECT {columns} FROM {self.table_name} "
+                f"WHERE {token} > ? AND {token} <= ?")
+
+    def ranges(self) -> List[TokenRange]:
+        """
+        Get the token ranges of the scan, aligned on the tokens of the
+        nodes when the cluster is connected.
+        """
+        return token_ranges(self.splits, ring_tokens(self.connector))
+
+    def scan_range(self, start: int, end: int) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over the rows of a single token range, one DataFrame per
+        page.
+
+        Args:
+            start: The exclusive start of the range.
+            end: The inclusive end of the range.
+
+        Returns:
+            An iterator of DataFrames.
+        """
+        return self.connector.iter_dataframes(self.query, [start, end],
+                                              self.fetch_size)
+
+    def iter_dataframes(self) -> Iterator[pd.DataFrame]:
+        """
+        Scan the whole table, iterating over one DataFrame per page.
+
+        Returns:
+            An iterator of DataFrames. Closing it early stops the scan.
+
+        Raises:
+            The first error of a range query.
+        """
+        ranges = self.ranges()
+        pages = queue.Queue(self.queue_size)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def scan(token_range):
+            if stop.is_set():
+                return
+            try:
+                for page in self.scan_range(*token_range):
+                    if not put(page):
+                        return
+                put(_RANGE_DONE)
+            except BaseException as error:
+                # Any error, not only an Exception, must reach the consumer,
+                # which otherwise waits forever for the end of the range
+                put(error)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for token_range in ranges:
+                executor.submit(scan, token_range)
+            remaining = len(ranges)
+            while remaining:
+                item = pages.get()
+                if item is _RANGE_DONE:
+                    remaining -= 1
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def export(self, writer, file_path: str, **kwargs) -> int:
+        """
+        Stream the whole table into a file.
+
+        Args:
+            writer: The writer used to write the pages, e.g. a CSVWriter
+                    or a ParquetWriter.
+            file_path: The path of the file to write.
+            **kwargs: Other arguments of the write_chunks method of the
+                      writer, e.g. compression for a CSVWriter, or the
+                      schema of a ParquetWriter when a column may only
+                      hold nulls for more than its first rows.
+
+        Returns:
+            int: The number of rows written.
+        """
+        return writer.write_chunks(file_path, self.iter_dataframes(),
+                                   **kwargs)
@@ -0,0 +1,352 @@
+import numbers
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import pandas as pd
+from pandas.api.types import is_float_dtype
+
+# CQL types bound from Python integers
+INTEGER_TYPES = {'tinyint', 'smallint', 'int', 'bigint', 'varint', 'counter'}
+
+# Python types accepted for the values of CQL types
+PYTHON_TYPES = {
+    **{cql_type: numbers.Integral for cql_type in INTEGER_TYPES},
+    'float': numbers.Real,
+    'double': numbers.Real,
+    'text': str,
+    'varchar': str,
+    'ascii': str,
+    'boolean': bool,
+}
+
+
+def check_type(column: str, cql_type: str, value: Any) -> None:
+    """
+    Check that a value can be bound to a column of a CQL type.
+
+    Args:
+        column: The name of the column.
+        cql_type: The CQL type of the column. Types missing from
+                  PYTHON_TYPES are not checked.
+        value: The value to check.
+
+    Raises:
+        TypeError: If the value does not match the type.
+    """
+    expected = PYTHON_TYPES.get(cql_type)
+    if expected is None:
+        return
+    if not isinstance(value, expected) or \
+            (isinstance(value, bool) and expected is not bool):
+        raise TypeError(
+            f"The column '{column}' expects a {cql_type} value, "
+            f"got {type(value).__name__}."
+        )
+
+
+@dataclass
+class Column:
+    """
+    A column of a Cassandra table.
+
+    Attributes:
+        name: The name of the column in the table.
+        cql_type: The CQL data type of the column, e.g. 'int' or 'text'.
+        source: The name of the input column holding its values
+                (default is None, which uses name).
+    """
+    name: str
+    cql_type: str
+    source: Optional[str] = None
+
+    def __post_init__(self):
+        if self.source is None:
+            self.source = self.name
+
+
+@dataclass
+class TableDefinition:
+    """
+    Declarative definition of a Cassandra table and of how its rows are
+    taken from the input data.
+
+    Attributes:
+        name: The name of the table.
+        columns: The columns of the table, in insert order.
+        partition_key: The partition key columns.
+        clustering_key: The clustering key columns.
+    """
+    name: str
+    columns: List[Column]
+    partition_key: List[str]
+    clustering_key: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        names = self.column_names
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate columns in table '{self.name}'.")
+        if not self.partition_key:
+            raise ValueError(
+                f"The table '{self.name}' needs a partition key.")
+        unknown = set(self.partition_key + self.clustering_key) \
+            .difference(names)
+        if unknown:
+            raise ValueError(
+                f"Unknown key columns {sorted(unknown)} in table "
+                f"'{self.name}'.")
+
+    @classmethod
+    def from_types(cls, name: str, columns: Dict[str, str],
+                   partition_key: List[str],
+                   clustering_key: List[str] = None,
+                   sources: Dict[str, str] = None) -> 'TableDefinition':
+        """
+        Build a definition from a dictionary of column types, as taken
+        by CassandraTableManager.create_table.
+
+        Args:
+            name: The name of the table.
+            columns: A dictionary of column names and their data types.
+            partition_key: The partition key columns.
+            clustering_key: The clustering key columns (default is None).
+            sources: A dictionary of column names and the input columns
+                     holding their values (default is None, which reads
+                     every column from the input column of the same
+                     name).
+
+        Returns:
+            TableDefinition: The table definition.
+        """
+        sources = sources or {}
+        return cls(
+            name,
+            [Column(column, cql_type, sources.get(column))
+             for column, cql_type in columns.items()],
+            partition_key=list(partition_key),
+            clustering_key=list(clustering_key or []),
+        )
+
+    @property
+    def column_names(self) -> List[str]:
+        """
+        The names of the columns, in insert order.
+        """
+        return [column.name for column in self.columns]
+
+    @property
+    def source_columns(self) -> List[str]:
+        """
+        The input columns the table reads, in insert order.
+        """
+        return [column.source for column in self.columns]
+
+    @property
+    def partition_columns(self) -> List[str]:
+        """
+        The columns Cassandra hashes into the partition. Without a
+        clustering key, the primary key is declared without parentheses,
+        so only its first column is the partition key.
+        """
+        if self.clustering_key:
+            return self.partition_key
+        return self.partition_key[:1]
+
+    def column_types(self) -> Dict[str, str]:
+        """
+        Get a dictionary of column names and their data types.
+        """
+        return {column.name: column.cql_type for column in self.columns}
+
+    def rows(self, chunk: 'ColumnChunk') -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate over the rows of values of the table in a chunk of input
+        column arrays, without copying the arrays.
+
+        Args:
+            chunk: The input data as a ColumnChunk.
+
+        Returns:
+            An iterator of tuples of values, in insert order.
+        """
+        return chunk.rows(self.source_columns)
+
+
+def to_python_list(series: pd.Series,
+                   cql_type: Optional[str] = None) -> List[Any]:
+    """
+    Convert a Series to a list of Python values the Cassandra driver can
+    bind, with missing values as None. The conversion is vectorized, so
+    no Python code runs per value.
+
+    Args:
+        series: The Series to convert.
+        cql_type: The CQL type of the target column (default is None).
+                  Float columns bound to an integer type, such as ids
+                  parsed as floats because of missing values, are
+                  converted to integers.
+
+    Returns:
+        A list of values.
+
+    Raises:
+        TypeError: If a float column bound to an integer type holds
+                   non-integral values.
+    """
+    if cql_type in INTEGER_TYPES and is_float_dtype(series.dtype):
+        series = series.astype('Int64')
+    if series.dtype == object and not series.hasnans:
+        return series.tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+class ColumnChunk:
+    """
+    A chunk of input data stored as one list of Python values per
+    column, converted once and shared by every table reading it.
+    """
+
+    def __init__(self, columns: Dict[str, List[Any]], num_rows: int):
+        """
+        Initialize a new instance of ColumnChunk.
+
+        Args:
+            columns: A dictionary of column names and their values.
+            num_rows: The number of rows of the chunk.
+        """
+        self.columns = columns
+        self.num_rows = num_rows
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, columns: Iterable[str] = None,
+                   types: Dict[str, str] = None) -> 'ColumnChunk':
+        """
+        Convert the columns of a DataFrame.
+
+        Args:
+            data: The DataFrame to convert.
+            columns: The columns to convert (default is None, which
+                     converts all columns).
+            types: A dictionary of column names and the CQL types they
+                   are bound to (default is None).
+
+        Returns:
+            ColumnChunk: The converted chunk.
+        """
+        columns = data.columns if columns is None else columns
+        types = types or {}
+        return cls({column: to_python_list(data[column], types.get(column))
+                    for column in columns}, len(data))
+
+    def rows(self, columns: Iterable[str] = None
+             ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate over the rows of values of some columns.
+
+        Args:
+            columns: The columns of each row (default is None, which
+                     uses all columns).
+
+        Returns:
+            An iterator of tuples of values.
+        """
+        columns = self.columns if columns is None else columns
+        return zip(*(self.columns[column] for column in columns))
+
+
+class FanOutLoader:
+    """
+    Loader inserting every input row into several denormalized tables.
+
+    Each chunk is converted once into column arrays, from which the
+    bound values of all the tables are taken, instead of building a
+    list of dictionaries per table.
+    """
+
+    def __init__(self, manager, tables: List[TableDefinition]):
+        """
+        Initialize a new instance of FanOutLoader.
+
+        Args:
+            manager: The CassandraTableManager of the keyspace.
+            tables: The definitions of the tables to load.
+        """
+        self.manager = manager
+        self.tables = list(tables)
+
+    @property
+    def source_columns(self) -> List[str]:
+        """
+        The input columns read by any of the tables.
+        """
+        columns = []
+        for table in self.tables:
+            columns.extend(column for column in table.source_columns
+                           if column not in columns)
+        return columns
+
+    def source_types(self) -> Dict[str, str]:
+        """
+        Get a dictionary of the input columns and the CQL type they are
+        bound to, taken from the first table reading them.
+        """
+        types = {}
+        for table in self.tables:
+            for column in table.columns:
+                types.setdefault(column.source, column.cql_type)
+        return types
+
+    def create_tables(self, drop_existing: bool = False) -> None:
+        """
+        Create the tables.
+
+        Args:
+            drop_existing: Whether existing tables are dropped first
+                           (default is False).
+        """
+        for table in self.tables:
+            if drop_existing:
+                self.manager.drop_table(table.name)
+            self.manager.create_table_from(table)
+
+    def load_table(self, table: TableDefinition,
+                   chunks: Iterable[ColumnChunk]) -> int:
+        """
+        Insert converted chunks into a single table, the rows of each
+        partition batched together and the batches sent concurrently.
+
+        Args:
+            table: The definition of the table.
+            chunks: An iterable of ColumnChunks.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        total_rows = 0
+        for chunk in chunks:
+            total_rows += self.manager.insert_rows(
+                table.name, table.column_names, list(table.rows(chunk)),
+                partition_key=table.partition_columns)
+        return total_rows
+
+    def load(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, int]:
+        """
+        Insert DataFrame chunks into all the tables.
+
+        Args:
+            chunks: An iterable of DataFrames holding the source columns.
+
+        Returns:
+            A dictionary of table names and their number of rows
+            inserted.
+        """
+        rows = {table.name: 0 for table in self.tables}
+        source_columns = self.source_columns
+        source_types = self.source_types()
+        for data in chunks:
+            chunk = ColumnChunk.from_frame(data, source_columns,
+                                           source_types)
+            for table in self.tables:
+                rows[table.name] += self.load_table(table, [chunk])
+        return rows
@@ -0,0 +1,300 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from cassandra import WriteTimeout, WriteType
+from cassandra.query import BatchStatement, BatchType
+from libs.databases.managers.bulk import (
+    AdaptiveThrottle, BulkLoader, LoadReport, RateLimiter,
+    estimate_row_size, partition_batches
+)
+from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.managers.cassandra_db import CassandraTableManager
+from libs.databases.tests.fakes import FakeSession, prepare
+
+
+def write_timeout():
+    return WriteTimeout("timeout", write_type=WriteType.SIMPLE)
+
+
+class TestBulkLoader(unittest.TestCase):
+    def setUp(self):
+        self.statement = prepare("INSERT INTO t (a, b) VALUES (?, ?)")
+
+    def test_load_individual_inserts(self):
+        session = FakeSession()
+        loader = BulkLoader(session, self.statement, concurrency=4)
+        rows = [[i, f"song {i}"] for i in range(50)]
+
+        report = loader.load(rows)
+
+        self.assertEqual(report.rows, 50)
+        self.assertEqual(report.failures, 0)
+        self.assertEqual(report.requests, 50)
+        self.assertLessEqual(session.max_in_flight, 4)
+        self.assertGreater(report.rows_per_second, 0)
+        self.assertEqual(
+            [parameters for _, parameters in session.requests], rows)
+
+    def test_load_reports_failures(self):
+        session = FakeSession(fail_on=[3, 'c'])
+        loader = BulkLoader(session, self.statement, concurrency=2)
+
+        report = loader.load([[1, 'a'], [2, 'b'], [3, 'c']])
+
+        self.assertEqual(report.rows, 2)
+        self.assertEqual(report.failures, 1)
+        self.assertEqual(str(report.errors[0]), "write timeout")
+
+    def test_load_groups_by_partition(self):
+        session = FakeSession()
+        loader = BulkLoader(session, self.statement,
+                            partition_key_indexes=[0], max_batch_rows=2)
+
+        report = loader.load([[1, 'a'], [2, 'b'], [1, 'c'], [1, 'd']])
+
+        self.assertEqual(report.rows, 4)
+        self.assertEqual(report.requests, 3)
+        batches = [statement for statement, _ in session.requests
+                   if isinstance(statement, BatchStatement)]
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].batch_type, BatchType.UNLOGGED)
+
+    def test_retry_idempotent_timeouts(self):
+        self.statement.is_idempotent = True
+        session = FakeSession(errors=[write_timeout(), None,
+                                      write_timeout()])
+        loader = BulkLoader(session, self.statement, concurrency=1,
+                            retry_delay=0.001)
+
+        report = loader.load([[1, 'a'], [2, 'b']])
+
+        self.assertEqual(report.rows, 2)
+        self.assertEqual(report.failures, 0)
+        self.assertEqual(report.requests, 2)
+        self.assertEqual(report.retries, 2)
+        self.assertEqual(len(session.requests), 4)
+
+    def test_retries_sent_from_load_thread(self):
+        self.statement.is_idempotent = True
+        session = FakeSession(errors=[write_timeout()] * 20)
+        threads = []
+        execute_async = session.execute_async
+
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return execute_async(*args, **kwargs)
+
+        session.execute_async = record
+        loader = BulkLoader(session, self.statement, concurrency=20,
+                            retry_delay=0.001)
+
+        report = loader.load([[i, 'a'] for i in range(20)])
+
+        self.assertEqual(report.rows, 20)
+        self.assertEqual(report.retries, 20)
+        # No thread is started per retry
+        self.assertEqual(set(threads), {threading.current_thread()})
+
+    def test_pending_retries_cancelled_on_error(self):
+        self.statement.is_idempotent = True
+        session = FakeSession(errors=[write_timeout()])
+        loader = BulkLoader(session, self.statement, retry_delay=0.05)
+
+        def rows():
+            yield [1, 'a']
+            time.sleep(0.01)
+            raise RuntimeError("bad input")
+
+        with self.assertRaises(RuntimeError):
+            loader.load(rows())
+        time.sleep(0.1)
+
+        self.assertEqual(len(session.requests), 1)
+        # The slot of the cancelled retry is released for the next load
+        self.assertEqual(loader.load([[2, 'b']]).rows, 1)
+
+    def test_no_retry_when_not_idempotent(self):
+        session = FakeSession(errors=[write_timeout()])
+        loader = BulkLoader(session, self.statement, retry_delay=0.001)
+
+        report = loader.load([[1, 'a']])
+
+        self.assertEqual(report.failures, 1)
+        self.assertEqual(report.retries, 0)
+
+    def test_max_retries(self):
+        self.statement.is_idempotent = True
+        session = FakeSession(errors=[write_timeout()] * 3)
+        loader = BulkLoader(session, self.statement, max_retries=2,
+                            retry_delay=0.001)
+
+        report = loader.load([[1, 'a']])
+
+        self.assertEqual(report.failures, 1)
+        self.assertEqual(report.retries, 2)
+        self.assertIsInstance(report.errors[0], WriteTimeout)
+
+    def test_adaptive_batch_rows(self):
+        self.statement.is_idempotent = True
+        throttle = AdaptiveThrottle(max_concurrency=8, max_batch_rows=4,
+                                    cooldown=0)
+        throttle.on_overload()
+        session = FakeSession()
+        loader = BulkLoader(session, self.statement,
+                            partition_key_indexes=[0], max_batch_rows=4,
+                            throttle=throttle)
+
+        report = loader.load([[1, c] for c in 'abcd'])
+
+        self.assertEqual(report.rows, 4)
+        self.assertEqual(report.requests, 2)
+        self.assertTrue(all(statement.is_idempotent
+                            for statement, _ in session.requests))
+        self.assertLessEqual(session.max_in_flight, throttle.concurrency)
+
+    def test_overload_slows_down(self):
+        self.statement.is_idempotent = True
+        throttle = AdaptiveThrottle(max_concurrency=8,
+                                    initial_concurrency=8)
+        session = FakeSession(errors=[write_timeout()])
+        loader = BulkLoader(session, self.statement, throttle=throttle,
+                            retry_delay=0.001)
+
+        report = loader.load([[1, 'a']])
+
+        self.assertEqual(report.rows, 1)
+        self.assertEqual(throttle.decreases, 1)
+        self.assertEqual(throttle.concurrency, 4)
+
+    def test_max_rows_per_second(self):
+        loader = BulkLoader(FakeSession(), self.statement,
+                            max_rows_per_second=1000)
+
+        report = loader.load([[i, 'a'] for i in range(50)])
+
+        self.assertEqual(report.rows, 50)
+        self.assertGreaterEqual(report.elapsed, 0.045)
+        self.assertGreater(report.throttled, 0)
+
+    def test_invalid_concurrency(self):
+        with self.assertRaises(ValueError):
+            BulkLoader(FakeSession(), self.statement, concurrency=0)
+
+    def test_rows_per_second_without_elapsed(self):
+        self.assertEqual(LoadReport(rows=10).rows_per_second, 0.0)
+
+
+class TestAdaptiveThrottle(unittest.TestCase):
+    def test_additive_increase(self):
+        throttle = AdaptiveThrottle(max_concurrency=4, initial_concurrency=2,
+                                    max_batch_rows=20)
+        throttle.batch_rows = 10
+
+        for _ in range(2):
+            throttle.on_success(0.01)
+        self.assertEqual((throttle.concurrency, throttle.batch_rows), (3, 12))
+
+        for _ in range(100):
+            throttle.on_success(0.01)
+        self.assertEqual((throttle.concurrency, throttle.batch_rows), (4, 20))
+
+    def test_multiplicative_decrease(self):
+        throttle = AdaptiveThrottle(max_concurrency=64,
+                                    initial_concurrency=64, cooldown=60)
+
+        throttle.on_overload()
+        throttle.on_overload()
+
+        self.assertEqual(throttle.concurrency, 32)
+        self.assertEqual(throttle.batch_rows, 50)
+        self.assertEqual(throttle.decreases, 1)
+
+    def test_target_latency(self):
+        throttle = AdaptiveThrottle(max_concurrency=8, initial_concurrency=8,
+                                    min_concurrency=6, target_latency=0.1)
+
+        throttle.on_success(0.5)
+
+        self.assertEqual(throttle.concurrency, 6)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            AdaptiveThrottle(max_concurrency=2, min_concurrency=4)
+        with self.assertRaises(ValueError):
+            AdaptiveThrottle(decrease_factor=1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_acquire(self):
+        limiter = RateLimiter(rows_per_second=1000)
+
+        start = time.perf_counter()
+        for _ in range(3):
+            limiter.acquire(10)
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.019)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+
+class TestPartitionBatches(unittest.TestCase):
+    def test_estimate_row_size(self):
+        self.assertEqual(estimate_row_size(['abc', 'é', None, 1, b'xy']),
+                         3 + 2 + 8 + 2)
+
+    def test_single_partition_batches(self):
+        rows = [[1, 'a'], [2, 'b'], [1, 'c'], [1, 'd'], [2, 'e']]
+        batches = list(partition_batches(rows, [0], max_rows=2))
+        self.assertEqual(batches, [
+            [[1, 'a'], [1, 'c']],
+            [[2, 'b'], [2, 'e']],
+            [[1, 'd']],
+        ])
+
+    def test_max_bytes(self):
+        rows = [[1, 'x' * 10], [1, 'y' * 10], [1, 'z' * 10]]
+        batches = list(partition_batches(rows, [0], max_bytes=40))
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+
+
+class TestCassandraTableManagerBulkInsert(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession()
+        self.session.execute = Mock()
+        connector = CassandraConnector(contact_points=['127.0.0.1'])
+        connector.session = self.session
+        self.manager = CassandraTableManager(connector, 'keyspace')
+
+    def test_bulk_insert(self):
+        self.manager.create_table(
+            'users_by_song', {'song': 'text', 'userId': 'int'},
+            partition_key=['song'], clustering_key=['userId'])
+
+        report = self.manager.bulk_insert(
+            'users_by_song',
+            [{'song': 'a', 'userId': 1}, {'song': 'a', 'userId': 2},
+             {'song': 'b', 'userId': 3}],
+            group_by_partition=True
+        )
+
+        self.assertEqual(report.rows, 3)
+        self.assertEqual(report.requests, 2)
+        self.session.prepare.assert_called_once_with(
+            "INSERT INTO users_by_song (song, userId) VALUES (?, ?)")
+        self.assertTrue(all(statement.is_idempotent
+                            for statement, _ in self.session.requests))
+
+    def test_bulk_insert_unknown_partition_key(self):
+        with self.assertRaises(ValueError):
+            self.manager.bulk_insert('unknown', [{'a': 1}],
+                                     group_by_partition=True)
+
+    def test_bulk_insert_no_data(self):
+        self.assertEqual(self.manager.bulk_insert('table', []).rows, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from libs.databases.managers.cache import QueryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = QueryCache(max_entries=2, ttl=10, clock=self.clock)
+
+    def test_hits_and_misses(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', [1])
+
+        self.assertEqual(self.cache.get('a'), [1])
+        self.assertEqual(self.cache.get('b', 'missing'), 'missing')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+        self.assertAlmostEqual(self.cache.hit_rate, 1 / 3)
+
+    def test_least_recently_used_eviction(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+        self.cache.put('c', 3)
+
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.info()['evictions'], 1)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_ttl(self):
+        self.cache.put('a', 1)
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get('a'), 1)
+
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.info()['expirations'], 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_no_ttl(self):
+        cache = QueryCache(ttl=None, clock=self.clock)
+        cache.put('a', 1)
+        self.clock.now = 1e9
+        self.assertEqual(cache.get('a'), 1)
+
+    def test_put_after_invalidation(self):
+        generation = self.cache.generation
+        self.cache.clear()
+
+        self.assertFalse(self.cache.put('a', 1, generation))
+        self.assertIsNone(self.cache.get('a'))
+        self.assertTrue(self.cache.put('a', 1, self.cache.generation))
+        self.assertEqual(self.cache.get('a'), 1)
+
+    def test_clear(self):
+        self.cache.put('a', 1)
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.info()['invalidations'], 1)
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            QueryCache(max_entries=0)
+        with self.assertRaises(ValueError):
+            QueryCache(ttl=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,493 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import numpy as np
+import pandas as pd
+from cassandra.query import BatchStatement, BatchType
+from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.managers.cassandra_db import CassandraTableManager
+from libs.databases.managers.checkpoint import LoadCheckpoint
+from libs.databases.tests.fakes import FakeSession, PagedSession
+from libs.files.writers.csv import CSVWriter
+
+
+class TestCassandraTableManager(unittest.TestCase):
+    def setUp(self):
+        self.connector = CassandraConnector(contact_points=['127.0.0.1'])
+        self.session = self.connector.session = FakeSession()
+        self.manager = CassandraTableManager(self.connector, 'keyspace')
+        self.data = [
+            {'userId': 1, 'sessionId': 10, 'itemInSession': 0},
+            {'userId': 2, 'sessionId': 20, 'itemInSession': 0},
+            {'userId': 1, 'sessionId': 10, 'itemInSession': 1},
+        ]
+
+    def executed(self):
+        return [statement for statement, _ in self.session.requests]
+
+    def inserted(self):
+        return [parameters for _, parameters in self.session.requests]
+
+    def test_create_table(self):
+        self.manager.create_table(
+            'song_by_user_and_session',
+            {'userId': 'int', 'sessionId': 'int', 'itemInSession': 'int'},
+            partition_key=['userId', 'sessionId'],
+            clustering_key=['itemInSession'])
+
+        self.session.execute.assert_called_once_with(
+            "CREATE TABLE IF NOT EXISTS song_by_user_and_session "
+            "(userId int, sessionId int, itemInSession int, "
+            "PRIMARY KEY ((userId, sessionId), itemInSession))")
+        self.assertEqual(
+            self.manager.tables['song_by_user_and_session']['partition_key'],
+            ['userId', 'sessionId'])
+
+        self.manager.drop_table('song_by_user_and_session')
+        self.assertNotIn('song_by_user_and_session', self.manager.tables)
+
+    def test_insert_data_unknown_table(self):
+        self.manager.insert_data('table', self.data)
+
+        statements = self.executed()
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(statements[0].batch_type, BatchType.LOGGED)
+
+    def test_insert_data_groups_by_partition(self):
+        self.manager.insert_data('table', self.data,
+                                 partition_key=['userId', 'sessionId'])
+
+        batches = [statement for statement in self.executed()
+                   if isinstance(statement, BatchStatement)]
+        self.assertEqual(len(self.executed()), 2)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].batch_type, BatchType.UNLOGGED)
+        self.assertEqual(len(batches[0]), 2)
+        # The single row partition is sent without a batch
+        self.assertEqual(self.inserted()[1], [2, 20, 0])
+
+    def test_insert_data_max_batch_rows(self):
+        manager = CassandraTableManager(self.connector, 'keyspace',
+                                        max_batch_rows=1)
+        manager.tables['table'] = {'partition_key': ['userId'],
+                                   'clustering_key': []}
+        manager.insert_data('table', self.data)
+
+        self.assertEqual(len(self.executed()), 3)
+        self.assertFalse(any(isinstance(statement, BatchStatement)
+                             for statement in self.executed()))
+
+    def test_insert_data_partition_columns(self):
+        # Without a clustering key only sessionId is the partition key
+        self.create_song_length()
+        data = [{'sessionId': i % 2, 'itemInSession': i, 'song': 'a'}
+                for i in range(6)]
+
+        self.manager.insert_data('song_length', data)
+
+        batches = self.executed()
+        self.assertEqual(len(batches), 2)
+        self.assertTrue(all(batch.batch_type == BatchType.UNLOGGED
+                            for batch in batches))
+        self.assertEqual([len(batch) for batch in batches], [3, 3])
+
+    def test_insert_data_concurrent(self):
+        manager = CassandraTableManager(self.connector, 'keyspace',
+                                        concurrency=4)
+        data = [{'userId': i, 'song': 'a'} for i in range(40)]
+
+        manager.insert_data('table', data, partition_key=['userId'])
+
+        # One asynchronous round trip per partition, at most 4 in flight
+        self.assertEqual(len(self.session.requests), 40)
+        self.assertLessEqual(self.session.max_in_flight, 4)
+        self.session.execute.assert_not_called()
+
+    def test_insert_data_error(self):
+        self.session.errors = [None, None, RuntimeError("write timeout")]
+
+        with self.assertRaisesRegex(RuntimeError, "write timeout"):
+            self.manager.insert_data(
+                'table', [{'userId': i, 'song': 'a'} for i in range(10)],
+                partition_key=['userId'])
+
+    def test_insert_data_reuses_prepared_statement(self):
+        self.manager.insert_data('table', self.data)
+        self.manager.insert_data('table', self.data)
+        self.session.prepare.assert_called_once()
+
+        # Schema changes invalidate the prepared statements
+        self.manager.drop_table('table')
+        self.manager.insert_data('table', self.data)
+        self.assertEqual(self.session.prepare.call_count, 2)
+
+    def test_insert_data_frame(self):
+        self.manager.create_table(
+            'users_by_song', {'song': 'text', 'userId': 'int'},
+            partition_key=['song'], clustering_key=['userId'])
+        data = pd.DataFrame({'song': ['a', None], 'userId': [1.0, np.nan]})
+
+        rows = self.manager.insert_data('users_by_song', data)
+
+        self.assertEqual(rows, 2)
+        values = self.inserted()
+        self.assertEqual(values, [('a', 1), (None, None)])
+        self.assertIs(type(values[0][1]), int)
+
+    def test_insert_data_column_arrays(self):
+        rows = self.manager.insert_data(
+            'table', {'userId': np.array([1, 2]), 'song': ['a', 'b']},
+            partition_key=['userId'])
+
+        self.assertEqual(rows, 2)
+        self.assertEqual(self.inserted(), [(1, 'a'), (2, 'b')])
+
+    def test_insert_data_empty(self):
+        self.assertEqual(self.manager.insert_data('table', pd.DataFrame()),
+                         0)
+        self.assertEqual(self.session.requests, [])
+
+    def test_insert_resumable(self):
+        chunks = {
+            'a.csv': [pd.DataFrame({'userId': [1, 2]}),
+                      pd.DataFrame({'userId': [3]})],
+            'b.csv': [pd.DataFrame({'userId': [4, 5, 6]})],
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            state_path = os.path.join(directory, 'load.json')
+            # The cluster fails on the third request: the second chunk
+            self.session.errors = [None, None, RuntimeError("timeout")]
+            with self.assertRaises(RuntimeError):
+                self.manager.insert_resumable(
+                    'table', chunks, LoadCheckpoint(state_path),
+                    partition_key=['userId'])
+
+            self.session.requests.clear()
+            # Resumed with another chunk size for b.csv
+            chunks['b.csv'] = [pd.DataFrame({'userId': [4]}),
+                               pd.DataFrame({'userId': [5, 6]})]
+            checkpoint = LoadCheckpoint(state_path)
+            rows = self.manager.insert_resumable(
+                'table', chunks, checkpoint, partition_key=['userId'])
+
+            self.assertEqual(rows, 4)
+            self.assertEqual(self.inserted(), [(3,), (4,), (5,), (6,)])
+            self.assertTrue(checkpoint.is_done('table', 'b.csv'))
+
+            checkpoint.commit('table', 'b.csv', 1)
+            self.session.requests.clear()
+            rows = self.manager.insert_resumable(
+                'table', chunks.items(), checkpoint,
+                partition_key=['userId'])
+            self.assertEqual(rows, 2)
+            self.assertEqual(self.inserted(), [(5,), (6,)])
+
+    def create_song_length(self):
+        self.manager.create_table(
+            'song_length',
+            {'sessionId': 'int', 'itemInSession': 'int', 'song': 'text'},
+            partition_key=['sessionId', 'itemInSession'], clustering_key=[])
+
+    def test_lookup(self):
+        self.create_song_length()
+        self.session.execute.return_value = [(338, 4, 'a')]
+
+        rows = self.manager.lookup('song_length',
+                                   {'sessionId': 338, 'itemInSession': 4},
+                                   columns=['song'])
+
+        self.assertEqual(rows, [(338, 4, 'a')])
+        statement = self.session.execute.call_args.args[0]
+        self.assertEqual(statement.query_string,
+                         "SELECT song FROM song_length "
+                         "WHERE sessionId = %s AND itemInSession = %s")
+        self.assertEqual(self.session.execute.call_args.args[1], [338, 4])
+
+    def test_lookup_checks_key(self):
+        self.create_song_length()
+
+        with self.assertRaises(ValueError):
+            self.manager.lookup('song_length', {'itemInSession': 4})
+        with self.assertRaises(ValueError):
+            self.manager.lookup('song_length', {})
+        with self.assertRaises(TypeError):
+            self.manager.lookup('song_length', {'sessionId': '338'})
+        with self.assertRaises(TypeError):
+            self.manager.lookup('song_length', {'sessionId': True})
+
+    def test_lookup_cache(self):
+        self.create_song_length()
+        self.manager.enable_lookup_cache(max_entries=10)
+        self.session.execute.reset_mock()
+        self.session.execute.return_value = [(338, 4, 'a')]
+        key = {'sessionId': 338}
+
+        for _ in range(3):
+            self.assertEqual(self.manager.lookup('song_length', key),
+                             [(338, 4, 'a')])
+        self.manager.lookup('song_length', key, use_cache=False)
+
+        self.assertEqual(self.session.execute.call_count, 2)
+        info = self.manager.lookup_cache_info()['song_length']
+        self.assertEqual((info['hits'], info['misses']), (2, 1))
+
+        # Writes through the manager invalidate the table's cache
+        self.manager.insert_data('song_length', [
+            {'sessionId': 338, 'itemInSession': 5, 'song': 'b'}])
+        self.manager.lookup('song_length', key)
+        self.assertEqual(self.session.execute.call_count, 3)
+        self.assertEqual(
+            self.manager.lookup_cache_info()['song_length']['invalidations'],
+            1)
+
+        self.manager.disable_lookup_cache()
+        self.assertEqual(self.manager.lookup_cache_info(), {})
+
+    def test_lookup_cache_invalidated_after_write(self):
+        self.create_song_length()
+        self.manager.enable_lookup_cache(max_entries=10)
+        key = {'sessionId': 338}
+        rows = [(338, 4, 'a')]
+
+        def write(parameters):
+            # A lookup racing with the write caches the old rows
+            self.manager.lookup('song_length', key)
+            rows.append((338, 5, 'b'))
+            return ()
+
+        self.session.execute.side_effect = lambda *args, **kwargs: \
+            list(rows)
+        self.session.results = write
+        self.manager.insert_data('song_length', [
+            {'sessionId': 338, 'itemInSession': 5, 'song': 'b'}])
+
+        self.assertEqual(self.manager.lookup('song_length', key),
+                         [(338, 4, 'a'), (338, 5, 'b')])
+
+    def test_lookup_cache_write_during_read(self):
+        self.create_song_length()
+        self.manager.enable_lookup_cache(max_entries=10)
+        key = {'sessionId': 338}
+        rows = [(338, 4, 'a')]
+
+        def read(*args, **kwargs):
+            result = list(rows)
+            if len(rows) == 1:
+                # A write completes between the read and its caching
+                rows.append((338, 5, 'b'))
+                self.manager.insert_data('song_length', [
+                    {'sessionId': 338, 'itemInSession': 5, 'song': 'b'}])
+            return result
+
+        self.session.execute.reset_mock()
+        self.session.execute.side_effect = read
+
+        self.assertEqual(self.manager.lookup('song_length', key),
+                         [(338, 4, 'a')])
+        self.assertEqual(self.manager.lookup('song_length', key),
+                         [(338, 4, 'a'), (338, 5, 'b')])
+        self.assertEqual(self.session.execute.call_count, 2)
+
+    def test_query_with_parameters(self):
+        query = "SELECT * FROM song_length " \
+                "WHERE sessionId = ? AND itemInSession = ?"
+        self.session.execute.return_value = [(338, 4)]
+
+        df = self.manager.query_to_dataframe(query, parameters=(338, 4))
+
+        statement = self.session.execute.call_args.args[0]
+        self.assertEqual(statement.query_string,
+                         query.replace('?', '%s'))
+        self.assertEqual(self.session.execute.call_args.args[1], (338, 4))
+        self.assertEqual(df.values.tolist(), [[338, 4]])
+
+    def test_export_query(self):
+        result_set = Mock(column_names=['song', 'userId'],
+                          current_rows=[('a', 1), ('b', 2)],
+                          has_more_pages=False)
+        self.session.execute.return_value = result_set
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'users_by_song.csv')
+            rows = self.manager.export_query(
+                "SELECT song, userId FROM users_by_song",
+                CSVWriter(), file_path)
+
+            self.assertEqual(rows, 2)
+            with open(file_path) as f:
+                self.assertEqual(f.read(), 'song,userId\na,1\nb,2\n')
+
+    def use_fake_session(self):
+        # Rows of song_length: (sessionId, itemInSession, song)
+        rows = [(338, 4, 'a'), (338, 5, 'b'), (339, 1, 'c')]
+
+        def results(parameters):
+            session_id, items = parameters[0], parameters[1:]
+            if items and isinstance(items[0], list):
+                items = items[0]
+            return [row for row in rows if row[0] == session_id
+                    and (not items or row[1] in items)]
+
+        session = self.connector.session = FakeSession(results=results)
+        return session
+
+    def test_lookup_many(self):
+        self.create_song_length()
+        session = self.use_fake_session()
+
+        data = self.manager.lookup_many(
+            'song_length', [{'sessionId': 339}, {'sessionId': 338},
+                            {'sessionId': 1}])
+
+        self.assertEqual(data.values.tolist(),
+                         [[339, 1, 'c'], [338, 4, 'a'], [338, 5, 'b']])
+        self.assertEqual(len(session.requests), 3)
+        self.assertEqual(session.requests[0][0].query_string,
+                         "SELECT * FROM song_length WHERE sessionId = %s")
+
+    def test_lookup_many_coalesces_in_queries(self):
+        self.create_song_length()
+        session = self.use_fake_session()
+        keys = [{'sessionId': 338, 'itemInSession': 4},
+                {'sessionId': 339, 'itemInSession': 1},
+                {'sessionId': 338, 'itemInSession': 5}]
+
+        data = self.manager.lookup_many('song_length', keys)
+
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data.values.tolist(),
+                         [[338, 4, 'a'], [338, 5, 'b'], [339, 1, 'c']])
+        self.assertEqual(len(session.requests), 2)
+        self.assertEqual(session.requests[0][1], [339, 1])
+        statement, parameters = session.requests[1]
+        self.assertEqual(statement.query_string,
+                         "SELECT * FROM song_length "
+                         "WHERE sessionId = %s AND itemInSession IN %s")
+        self.assertEqual(parameters, [338, [4, 5]])
+
+        # Coalescing is disabled with max_in_keys=0
+        session.requests.clear()
+        self.manager.lookup_many('song_length', keys, max_in_keys=0)
+        self.assertEqual(len(session.requests), 3)
+
+    def test_lookup_many_cache(self):
+        self.create_song_length()
+        session = self.use_fake_session()
+        self.manager.enable_lookup_cache()
+        keys = [{'sessionId': 338}, {'sessionId': 339}]
+
+        self.manager.lookup_many('song_length', keys)
+        data = self.manager.lookup_many('song_length', keys)
+
+        self.assertEqual(len(session.requests), 2)
+        self.assertEqual(len(data), 3)
+        self.assertEqual(self.manager.lookup('song_length', keys[1]),
+                         [(339, 1, 'c')])
+        self.assertEqual(len(session.requests), 2)
+
+    def test_lookup_many_coalesced_keys_not_cached(self):
+        self.create_song_length()
+        session = self.use_fake_session()
+        self.manager.enable_lookup_cache()
+        keys = [{'sessionId': 338, 'itemInSession': 5},
+                {'sessionId': 338, 'itemInSession': 4}]
+
+        for _ in range(2):
+            data = self.manager.lookup_many('song_length', keys)
+        # In clustering order, queried again as nothing was cached
+        self.assertEqual(data.values.tolist(),
+                         [[338, 4, 'a'], [338, 5, 'b']])
+        self.assertEqual(len(session.requests), 2)
+
+        for _ in range(2):
+            data = self.manager.lookup_many('song_length', keys,
+                                            max_in_keys=0)
+        self.assertEqual(data.values.tolist(),
+                         [[338, 5, 'b'], [338, 4, 'a']])
+        self.assertEqual(len(session.requests), 4)
+
+    def test_lookup_many_invalid_keys(self):
+        self.create_song_length()
+
+        empty = self.manager.lookup_many('song_length', [],
+                                         columns=['song'])
+        self.assertEqual(list(empty.columns), ['song'])
+        with self.assertRaises(ValueError):
+            self.manager.lookup_many(
+                'song_length', [{'sessionId': 338},
+                                {'sessionId': 338, 'itemInSession': 4}])
+        with self.assertRaises(TypeError):
+            self.manager.lookup_many('song_length', [{'sessionId': '338'}])
+
+
+class TestCassandraTableManagerAsync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.connector = CassandraConnector(contact_points=['127.0.0.1'])
+        self.session = self.connector.session = PagedSession(pages=[[]])
+        self.manager = CassandraTableManager(self.connector, 'keyspace',
+                                             max_batch_rows=2)
+        self.manager.tables['table'] = {
+            'columns': {'userId': 'int', 'song': 'text'},
+            'partition_key': ['userId'], 'clustering_key': []}
+
+    async def test_insert_data_async(self):
+        data = pd.DataFrame({'userId': [1.0, 2.0, 1.0, 1.0],
+                             'song': ['a', 'b', 'c', 'd']})
+
+        rows = await self.manager.insert_data_async('table', data,
+                                                    concurrency=2)
+
+        self.assertEqual(rows, 4)
+        self.assertLessEqual(self.session.max_in_flight, 2)
+        statements = [statement for statement, _, _ in
+                      self.session.requests]
+        # Partition 1 is split into a batch of 2 rows and a single row
+        self.assertEqual(len(statements), 3)
+        batches = [statement for statement in statements
+                   if isinstance(statement, BatchStatement)]
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].batch_type, BatchType.UNLOGGED)
+        single = [parameters for _, parameters, _ in self.session.requests
+                  if parameters is not None]
+        self.assertEqual(sorted(single), [(1, 'd'), (2, 'b')])
+        self.assertIs(type(single[0][0]), int)
+
+    async def test_insert_data_async_without_partition_key(self):
+        rows = await self.manager.insert_data_async(
+            'other', [{'a': 1}, {'a': 2}])
+
+        self.assertEqual(rows, 2)
+        self.assertEqual([parameters for _, parameters, _ in
+                          self.session.requests], [[1], [2]])
+        self.assertEqual(
+            await self.manager.insert_data_async('other', []), 0)
+
+    async def test_insert_data_async_error(self):
+        self.session.error = RuntimeError("write timeout")
+        data = [{'userId': i, 'song': 'a'} for i in range(20)]
+
+        with self.assertRaises(RuntimeError):
+            await self.manager.insert_data_async('table', data,
+                                                 concurrency=1)
+        await asyncio.sleep(0.05)
+
+        # The first failure cancels the requests not sent yet; one may
+        # take the slot freed by the failure before the cancellation
+        self.assertLessEqual(len(self.session.requests), 2)
+
+    async def test_execute_query_async(self):
+        self.session.pages = [[(1, 'a')], [(2, 'b')]]
+
+        rows = await self.manager.execute_query_async(
+            "SELECT * FROM table WHERE userId = ?", [1])
+        data = await self.manager.query_to_dataframe_async(
+            "SELECT * FROM table")
+
+        self.assertEqual(rows, [(1, 'a'), (2, 'b')])
+        self.assertEqual(data.values.tolist(), [[1, 'a'], [2, 'b']])
+
+
+if __name__ == '__main__':
+    unittest.main()
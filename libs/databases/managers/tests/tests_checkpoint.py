@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from libs.databases.managers.checkpoint import LoadCheckpoint
+
+
+class TestLoadCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.directory.name, 'state',
+                                       'load.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_commit_persists(self):
+        checkpoint = LoadCheckpoint(self.state_path)
+        checkpoint.commit('song_length', 'a.csv', 100)
+        checkpoint.commit('song_length', 'b.csv', 50, done=True)
+
+        checkpoint = LoadCheckpoint(self.state_path)
+        self.assertEqual(checkpoint.offset('song_length', 'a.csv'), 100)
+        self.assertFalse(checkpoint.is_done('song_length', 'a.csv'))
+        self.assertTrue(checkpoint.is_done('song_length', 'b.csv'))
+        self.assertEqual(checkpoint.offset('users_by_song', 'a.csv'), 0)
+        self.assertIsNone(checkpoint.get('users_by_song', 'a.csv'))
+        self.assertFalse(os.path.exists(f"{self.state_path}.tmp"))
+
+    def test_reset(self):
+        checkpoint = LoadCheckpoint(self.state_path)
+        checkpoint.commit('song_length', 'a.csv', 100)
+        checkpoint.commit('users_by_song', 'a.csv', 100)
+
+        checkpoint.reset('song_length')
+        self.assertEqual(checkpoint.offset('song_length', 'a.csv'), 0)
+        self.assertEqual(checkpoint.offset('users_by_song', 'a.csv'), 100)
+
+        checkpoint.reset()
+        self.assertEqual(LoadCheckpoint(self.state_path).tables, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
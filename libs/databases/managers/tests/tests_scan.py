@@ -0,0 +1,184 @@
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+import pandas as pd
+from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.managers.cassandra_db import CassandraTableManager
+from libs.databases.managers.scan import (
+    MAX_TOKEN, MIN_TOKEN, TableScanner, split_token_range, token_ranges
+)
+from libs.databases.tests.fakes import prepare
+from libs.files.writers.csv import CSVWriter
+from libs.files.writers.parquet import ParquetWriter
+
+
+def token(user_id):
+    """
+    Stand-in for the Murmur3 hash of a partition key.
+    """
+    return MIN_TOKEN + 1 + user_id * (MAX_TOKEN // 50)
+
+
+class FakeConnector:
+    """
+    Connector stand-in answering token range queries from a DataFrame.
+    """
+
+    def __init__(self, data, ring=None, fail_on=None):
+        self.data = data
+        self.fail_on = fail_on
+        self.queries = []
+        self.lock = threading.Lock()
+        token_map = SimpleNamespace(
+            ring=[SimpleNamespace(value=value) for value in ring]) \
+            if ring is not None else None
+        self.cluster = SimpleNamespace(
+            metadata=SimpleNamespace(token_map=token_map))
+
+    def iter_dataframes(self, query, parameters, fetch_size):
+        with self.lock:
+            self.queries.append((query, parameters))
+        start, end = parameters
+        if self.fail_on is not None and start < self.fail_on <= end:
+            raise RuntimeError("read timeout")
+        tokens = self.data['userId'].map(token)
+        rows = self.data[(tokens > start) & (tokens <= end)]
+        for i in range(0, max(len(rows), 1), fetch_size):
+            yield rows.iloc[i:i + fetch_size]
+
+
+class TestTokenRanges(unittest.TestCase):
+    def test_split_token_range(self):
+        self.assertEqual(split_token_range(0, 10, 3),
+                         [(0, 3), (3, 6), (6, 10)])
+        self.assertEqual(split_token_range(0, 2, 5), [(0, 1), (1, 2)])
+
+    def test_token_ranges_cover_ring(self):
+        ranges = token_ranges(8)
+
+        self.assertEqual(len(ranges), 8)
+        self.assertEqual(ranges[0][0], MIN_TOKEN)
+        self.assertEqual(ranges[-1][1], MAX_TOKEN)
+        for previous, current in zip(ranges, ranges[1:]):
+            self.assertEqual(previous[1], current[0])
+
+    def test_token_ranges_split_at_ring(self):
+        ranges = token_ranges(4, ring=[100, -100, 100])
+
+        self.assertEqual(len(ranges), 6)
+        ends = [end for _, end in ranges]
+        self.assertIn(-100, ends)
+        self.assertIn(100, ends)
+
+
+class TestTableScanner(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({'userId': range(40),
+                                  'song': [f"s{i}" for i in range(40)]})
+
+    def test_iter_dataframes(self):
+        connector = FakeConnector(self.data, ring=[0])
+        scanner = TableScanner(connector, 'users', ['userId'],
+                               columns=['userId', 'song'], splits=6,
+                               max_workers=3, fetch_size=4)
+
+        rows = pd.concat(list(scanner.iter_dataframes()))
+
+        self.assertEqual(sorted(rows['userId']), list(range(40)))
+        self.assertEqual(len(connector.queries), 6)
+        self.assertEqual(
+            connector.queries[0][0],
+            "SELECT userId, song FROM users "
+            "WHERE token(userId) > ? AND token(userId) <= ?")
+
+    def test_error_stops_scan(self):
+        connector = FakeConnector(self.data, fail_on=token(10))
+        scanner = TableScanner(connector, 'users', ['userId'], splits=4,
+                               max_workers=2)
+
+        with self.assertRaises(RuntimeError):
+            list(scanner.iter_dataframes())
+
+    def test_close_early(self):
+        connector = FakeConnector(self.data)
+        scanner = TableScanner(connector, 'users', ['userId'], splits=16,
+                               max_workers=2, fetch_size=1, queue_size=1)
+
+        pages = scanner.iter_dataframes()
+        next(pages)
+        pages.close()
+
+        self.assertLess(len(connector.queries), 16)
+
+    def test_export(self):
+        connector = FakeConnector(self.data)
+        scanner = TableScanner(connector, 'users', ['userId'], splits=5,
+                               fetch_size=7)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'users.csv')
+            rows = scanner.export(CSVWriter(), path)
+            exported = pd.read_csv(path)
+
+        self.assertEqual(rows, 40)
+        self.assertEqual(sorted(exported['userId']), list(range(40)))
+        self.assertEqual(list(exported.columns), ['userId', 'song'])
+
+    def test_export_parquet_null_column(self):
+        # The pages of the first ranges only have nulls in firstName
+        data = self.data.assign(firstName=[
+            None if user_id < 20 else f"n{user_id}"
+            for user_id in self.data['userId']])
+        connector = FakeConnector(data)
+        scanner = TableScanner(connector, 'users', ['userId'], splits=5,
+                               max_workers=1, fetch_size=4)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'users.parquet')
+            rows = scanner.export(ParquetWriter(), path)
+            exported = pd.read_parquet(path).sort_values('userId')
+
+        self.assertEqual(rows, 40)
+        self.assertEqual(exported['firstName'].tolist(),
+                         data['firstName'].tolist())
+
+    def test_base_exception_stops_scan(self):
+        connector = FakeConnector(self.data)
+        connector.iter_dataframes = Mock(side_effect=KeyboardInterrupt)
+        scanner = TableScanner(connector, 'users', ['userId'], splits=4,
+                               max_workers=2)
+
+        with self.assertRaises(KeyboardInterrupt):
+            list(scanner.iter_dataframes())
+
+
+class TestCassandraTableManagerScan(unittest.TestCase):
+    def setUp(self):
+        connector = CassandraConnector(contact_points=['127.0.0.1'])
+        connector.session = Mock()
+        connector.session.prepare.side_effect = prepare
+        self.manager = CassandraTableManager(connector, 'keyspace')
+
+    def test_partition_key_of_table(self):
+        self.manager.create_table(
+            'users_by_song', {'song': 'text', 'userId': 'int'},
+            partition_key=['song', 'userId'], clustering_key=[])
+
+        scanner = self.manager.table_scanner('users_by_song')
+
+        # Without a clustering key only the first column is hashed
+        self.assertEqual(scanner.partition_key, ['song'])
+        self.assertEqual(
+            self.manager.table_scanner('t', partition_key=['a', 'b'])
+            .partition_key, ['a', 'b'])
+
+    def test_unknown_partition_key(self):
+        with self.assertRaises(ValueError):
+            self.manager.table_scanner('unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
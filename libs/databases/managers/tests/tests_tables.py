@@ -0,0 +1,126 @@
+import unittest
+import numpy as np
+import pandas as pd
+from cassandra.query import BatchStatement
+from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.managers.cassandra_db import CassandraTableManager
+from libs.databases.managers.tables import (
+    Column, ColumnChunk, FanOutLoader, TableDefinition, to_python_list
+)
+from libs.databases.tests.fakes import FakeSession
+
+
+class TestTableDefinition(unittest.TestCase):
+    def test_from_types(self):
+        table = TableDefinition.from_types(
+            'users_by_song', {'song': 'text', 'user_id': 'int'},
+            partition_key=['song'], clustering_key=['user_id'],
+            sources={'user_id': 'userId'})
+
+        self.assertEqual(table.column_names, ['song', 'user_id'])
+        self.assertEqual(table.source_columns, ['song', 'userId'])
+        self.assertEqual(table.column_types(),
+                         {'song': 'text', 'user_id': 'int'})
+
+    def test_invalid_keys(self):
+        with self.assertRaises(ValueError):
+            TableDefinition('t', [Column('a', 'int')], partition_key=[])
+        with self.assertRaises(ValueError):
+            TableDefinition('t', [Column('a', 'int')], partition_key=['b'])
+        with self.assertRaises(ValueError):
+            TableDefinition('t', [Column('a', 'int'), Column('a', 'text')],
+                            partition_key=['a'])
+
+    def test_rows(self):
+        table = TableDefinition('t', [Column('b', 'text'),
+                                      Column('user', 'int', source='a')],
+                                partition_key=['user'])
+        chunk = ColumnChunk({'a': [1, 2], 'b': ['x', 'y']}, 2)
+
+        self.assertEqual(list(table.rows(chunk)), [('x', 1), ('y', 2)])
+
+
+class TestColumnChunk(unittest.TestCase):
+    def test_from_frame(self):
+        data = pd.DataFrame({
+            'a': pd.array([1, None], dtype='Int32'),
+            'b': pd.Categorical(['x', None]),
+            'c': [1.5, np.nan],
+            'd': ['s', 't'],
+        })
+
+        chunk = ColumnChunk.from_frame(data, ['a', 'b', 'c'])
+
+        self.assertEqual(len(chunk), 2)
+        self.assertEqual(chunk.columns, {'a': [1, None], 'b': ['x', None],
+                                         'c': [1.5, None]})
+        self.assertIs(type(chunk.columns['a'][0]), int)
+
+    def test_to_python_list_integer_type(self):
+        values = to_python_list(pd.Series([1.0, np.nan]), 'int')
+
+        self.assertEqual(values, [1, None])
+        self.assertIs(type(values[0]), int)
+        with self.assertRaises(TypeError):
+            to_python_list(pd.Series([1.5]), 'int')
+
+    def test_to_python_list_object(self):
+        self.assertEqual(to_python_list(pd.Series(['a', None])),
+                         ['a', None])
+
+
+class TestFanOutLoader(unittest.TestCase):
+    def setUp(self):
+        connector = CassandraConnector(contact_points=['127.0.0.1'])
+        self.session = connector.session = FakeSession()
+        self.manager = CassandraTableManager(connector, 'keyspace')
+        self.tables = [
+            TableDefinition.from_types(
+                'song_length', {'sessionId': 'int', 'song': 'text'},
+                partition_key=['sessionId']),
+            TableDefinition.from_types(
+                'users_by_song', {'song': 'text', 'userId': 'int'},
+                partition_key=['song', 'userId']),
+        ]
+        self.loader = FanOutLoader(self.manager, self.tables)
+
+    def test_create_tables(self):
+        self.loader.create_tables(drop_existing=True)
+
+        executed = [call.args[0] for call in
+                    self.session.execute.call_args_list]
+        self.assertEqual(executed[0], "DROP TABLE IF EXISTS song_length")
+        self.assertIn("PRIMARY KEY (song, userId)", executed[-1])
+        self.assertEqual(set(self.manager.tables),
+                         {'song_length', 'users_by_song'})
+
+    def test_load(self):
+        data = pd.DataFrame({'sessionId': [1, 2], 'song': ['a', 'b'],
+                             'userId': [10, 20], 'artist': ['x', 'y']})
+
+        rows = self.loader.load([data, data.iloc[:1]])
+
+        self.assertEqual(rows, {'song_length': 3, 'users_by_song': 3})
+        self.assertEqual(self.loader.source_columns,
+                         ['sessionId', 'song', 'userId'])
+        values = [parameters for _, parameters in self.session.requests]
+        self.assertEqual(values, [(1, 'a'), (2, 'b'), ('a', 10), ('b', 20),
+                                  (1, 'a'), ('a', 10)])
+
+    def test_load_batches_by_partition_columns(self):
+        data = pd.DataFrame({'sessionId': [1, 1, 2], 'song': ['a'] * 3,
+                             'userId': [10, 20, 30]})
+
+        self.loader.load([data])
+
+        # users_by_song has no clustering key, so only song is hashed:
+        # its 3 rows are one UNLOGGED batch, not 3 single row requests
+        batches = [statement for statement, _ in self.session.requests
+                   if isinstance(statement, BatchStatement)]
+        self.assertEqual([len(batch) for batch in batches], [2, 3])
+        self.assertEqual(len(self.session.requests), 3)
+        self.assertEqual(self.tables[1].partition_columns, ['song'])
+
+
+if __name__ == '__main__':
+    unittest.main()
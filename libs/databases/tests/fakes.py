@@ -0,0 +1,142 @@
+"""
+Stand-ins for the Cassandra driver shared by the database tests.
+"""
+import threading
+from types import SimpleNamespace
+from unittest.mock import Mock
+from cassandra.query import SimpleStatement
+
+
+def prepare(query):
+    """
+    Stand-in for Session.prepare that can be added to batches.
+    """
+    return SimpleStatement(query.replace('?', '%s'))
+
+
+class FakeFuture:
+    """
+    ResponseFuture stand-in completing on a separate thread.
+    """
+
+    def __init__(self, session, error=None, rows=()):
+        self.session = session
+        self.error = error
+        self.rows = list(rows)
+        self.done = threading.Event()
+
+    def add_callbacks(self, callback, errback, callback_args=(),
+                      errback_args=()):
+        def complete():
+            with self.session.lock:
+                self.session.in_flight -= 1
+            self.done.set()
+            if self.error is not None:
+                errback(self.error, *errback_args)
+            else:
+                callback(self.rows, *callback_args)
+
+        threading.Timer(0.001, complete).start()
+
+    def result(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.rows
+
+
+class FakeSession:
+    """
+    Session stand-in recording the asynchronous requests and the peak
+    concurrency. Synchronous calls go to the execute Mock.
+    """
+
+    def __init__(self, fail_on=None, errors=None, results=None):
+        self.fail_on = fail_on
+        # Function returning the rows of a request from its parameters
+        self.results = results
+        # Errors returned by the successive requests, None for a success
+        self.errors = list(errors or [])
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.execute = Mock()
+        self.prepare = Mock(side_effect=prepare)
+
+    def execute_async(self, statement, parameters=None, **kwargs):
+        with self.lock:
+            self.requests.append((statement, parameters))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        error = self.errors.pop(0) if self.errors else None
+        if self.fail_on is not None and parameters == self.fail_on:
+            error = RuntimeError("write timeout")
+        rows = self.results(parameters) if self.results else ()
+        return FakeFuture(self, error, rows)
+
+
+class PagedFuture:
+    """
+    ResponseFuture stand-in delivering pages on a driver-like thread and
+    calling the callbacks again for every fetched page.
+    """
+
+    def __init__(self, session, pages, error=None):
+        self.session = session
+        self.pages = list(pages)
+        self.error = error
+        self.page = -1
+        self.callbacks = []
+        self.errbacks = []
+
+    @property
+    def has_more_pages(self):
+        return self.page + 1 < len(self.pages)
+
+    def add_callbacks(self, callback, errback):
+        self.callbacks.append(callback)
+        self.errbacks.append(errback)
+        self.start_fetching_next_page()
+
+    def start_fetching_next_page(self):
+        self.session.fetches += 1
+        threading.Timer(0.001, self._complete).start()
+
+    def _complete(self):
+        with self.session.lock:
+            self.session.in_flight -= 1
+        if self.error is not None:
+            for errback in self.errbacks:
+                errback(self.error)
+            return
+        self.page += 1
+        for callback in self.callbacks:
+            callback(self.pages[self.page])
+
+    def result(self):
+        return SimpleNamespace(column_names=['a', 'b'])
+
+
+class PagedSession:
+    """
+    Session stand-in answering every query with pages of rows.
+    """
+
+    def __init__(self, pages=None, error=None):
+        self.pages = pages
+        self.error = error
+        self.lock = threading.Lock()
+        self.requests = []
+        self.fetches = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prepare = Mock(side_effect=prepare)
+
+    def execute_async(self, statement, parameters=None, **kwargs):
+        with self.lock:
+            self.requests.append((statement, parameters, kwargs))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        pages = self.pages if self.pages is not None else [[parameters]]
+        return PagedFuture(self, pages, self.error)
@@ -1,14 +1,156 @@
 
+import datetime
+import fnmatch
 import os
-import glob
+import re
+from libs.files.manifest import FileManifest
+
+# Date in the name of the event files, e.g. 2018-11-01-events.csv
+DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+
+def _to_date(value):
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
 
 
 class FileCollector:
-    def __init__(self, root_dir):
+    def __init__(self, root_dir, manifest_path=None, include=None,
+                 exclude=('.*',), extensions=None, start_date=None,
+                 end_date=None):
+        """
+        Initialize a new instance of FileCollector.
+
+        :param root_dir: The directory to collect files from, recursively.
+        :param manifest_path: The path of the manifest of loaded files
+                              (default is None, which disables it).
+        :param include: Glob patterns, one of which file names must match
+                        (default is None, which includes every file).
+        :param exclude: Glob patterns of file and directory names to skip
+                        (default skips hidden ones, such as .DS_Store).
+        :param extensions: File extensions to keep, e.g. ['.csv']
+                           (default is None, which keeps all).
+        :param start_date: The first date to keep, as a date or a
+                           'YYYY-MM-DD' string, taken from the
+                           YYYY-MM-DD in the file names (default is None).
+        :param end_date: The last date to keep (default is None).
+                         Files without a date in their name are skipped
+                         when a date range is set.
+        """
         self.root_dir = root_dir
+        self.manifest = FileManifest(manifest_path) \
+            if manifest_path is not None else None
+        self.include = list(include) if include is not None else None
+        self.exclude = list(exclude or [])
+        self.extensions = tuple(extensions) if extensions is not None \
+            else None
+        self.start_date = _to_date(start_date)
+        self.end_date = _to_date(end_date)
+
+    def _is_manifest(self, path):
+        """
+        Whether a path is the manifest or its temporary file, which may
+        be stored under the root directory.
+        """
+        if self.manifest is None:
+            return False
+        path = os.path.abspath(path)
+        return path in (os.path.abspath(self.manifest.manifest_path),
+                        os.path.abspath(self.manifest.temp_path))
+
+    def _is_excluded(self, name):
+        return any(fnmatch.fnmatch(name, pattern)
+                   for pattern in self.exclude)
+
+    def _in_date_range(self, name):
+        if self.start_date is None and self.end_date is None:
+            return True
+
+        match = DATE_PATTERN.search(name)
+        if match is None:
+            return False
+        try:
+            date = datetime.date(*map(int, match.groups()))
+        except ValueError:
+            return False
+        return (self.start_date is None or date >= self.start_date) and \
+            (self.end_date is None or date <= self.end_date)
+
+    def _is_selected(self, name):
+        if self.include is not None and not any(
+                fnmatch.fnmatch(name, pattern) for pattern in self.include):
+            return False
+        if self.extensions is not None and \
+                not name.endswith(self.extensions):
+            return False
+        return self._in_date_range(name)
+
+    def iter_files(self):
+        """
+        Lazily iterate over the files under the root directory in a single
+        os.scandir pass, skipping directories and the files not matching
+        the filters. The order is deterministic: the files of a directory
+        sorted by name, then its subdirectories in name order.
+
+        :return: An iterator of file paths.
+        """
+        stack = [self.root_dir]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as scanner:
+                    entries = sorted(scanner, key=lambda entry: entry.name)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                if self._is_excluded(entry.name):
+                    continue
+                if entry.is_dir():
+                    subdirectories.append(entry.path)
+                elif self._is_selected(entry.name) and \
+                        not self._is_manifest(entry.path):
+                    yield entry.path
+            # Visit the subdirectories in order after the files
+            stack.extend(reversed(subdirectories))
 
     def collect_files(self):
-        file_path_list = []
-        for root, dirs, files in os.walk(self.root_dir):
-            file_path_list.extend(glob.glob(os.path.join(root, '*')))
-        return file_path_list
+        return list(self.iter_files())
+
+    def collect_new_files(self):
+        """
+        Collect the files that are new or changed since they were
+        marked as loaded in the manifest.
+
+        :return: A list of file paths.
+        """
+        if self.manifest is None:
+            raise ValueError("A manifest_path is required to collect "
+                             "new files.")
+        return [
+            file_path for file_path in self.iter_files()
+            if self.manifest.is_changed(file_path)
+        ]
+
+    def mark_loaded(self, file_paths, rows=None):
+        """
+        Record files as loaded in the manifest and save it.
+
+        :param file_paths: A file path or a list of file paths.
+        :param rows: The number of rows loaded, or a dictionary with
+                     the number of rows per file path (default is None).
+        """
+        if self.manifest is None:
+            raise ValueError("A manifest_path is required to mark files "
+                             "as loaded.")
+        if isinstance(file_paths, str):
+            rows = {file_paths: rows}
+            file_paths = [file_paths]
+        elif not isinstance(rows, dict):
+            rows = {}
+
+        for file_path in file_paths:
+            self.manifest.record(file_path, rows.get(file_path))
+        self.manifest.save()
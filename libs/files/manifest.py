@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+
+
+class FileManifest:
+    """
+    Persistent record of the files already loaded, used to skip
+    unchanged files on the next run.
+    """
+
+    def __init__(self, manifest_path):
+        """
+        Initialize a new instance of FileManifest.
+
+        :param manifest_path: The path of the JSON file holding the
+                              manifest. It is created on the first save.
+        """
+        self.manifest_path = manifest_path
+        self.entries = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf8') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.abspath(file_path)
+
+    @staticmethod
+    def hash_file(file_path, block_size=1024 * 1024):
+        """
+        Compute the SHA-256 of a file's content.
+
+        :param file_path: The path of the file.
+        :param block_size: The number of bytes read at a time.
+        :return: The hexadecimal digest.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def is_changed(self, file_path):
+        """
+        Check whether a file is new or changed since it was recorded.
+        Files with the recorded size and mtime are unchanged without
+        being read; otherwise their content hash is compared. The
+        manifest is not modified: see update to stop hashing files that
+        were touched without being changed.
+
+        :param file_path: The path of the file.
+        :return: True if the file is new or its content changed.
+        """
+        entry = self.entries.get(self._key(file_path))
+        if entry is None:
+            return True
+
+        stat = os.stat(file_path)
+        if stat.st_size == entry['size'] and \
+                stat.st_mtime_ns == entry['mtime_ns']:
+            return False
+        if stat.st_size != entry['size']:
+            return True
+
+        # Touched but possibly unchanged, e.g. copied again
+        return self.hash_file(file_path) != entry['sha256']
+
+    def update(self, file_paths):
+        """
+        Record the new mtime of files touched without their content
+        changing, so the next checks do not hash them again, and save
+        the manifest if any entry changed. New and changed files are
+        left to record.
+
+        :param file_paths: A list of file paths.
+        :return: The number of entries updated.
+        """
+        updated = 0
+        for file_path in file_paths:
+            entry = self.get(file_path)
+            if entry is None:
+                continue
+            mtime_ns = os.stat(file_path).st_mtime_ns
+            if mtime_ns != entry['mtime_ns'] and \
+                    not self.is_changed(file_path):
+                entry['mtime_ns'] = mtime_ns
+                updated += 1
+        if updated:
+            self.save()
+        return updated
+
+    def record(self, file_path, rows=None):
+        """
+        Record a file as loaded.
+
+        :param file_path: The path of the file.
+        :param rows: The number of rows loaded from the file, if known.
+        """
+        stat = os.stat(file_path)
+        self.entries[self._key(file_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': self.hash_file(file_path),
+            'rows': rows,
+        }
+
+    def get(self, file_path):
+        """
+        Get the recorded entry of a file.
+
+        :param file_path: The path of the file.
+        :return: The entry, or None if the file was never recorded.
+        """
+        return self.entries.get(self._key(file_path))
+
+    @property
+    def temp_path(self):
+        """
+        The path of the temporary file the manifest is written through.
+        """
+        return f"{self.manifest_path}.tmp"
+
+    def save(self):
+        """
+        Write the manifest atomically, through a temporary file.
+        """
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = self.temp_path
+        with open(temp_path, 'w', encoding='utf8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
@@ -1,4 +1,11 @@
 import abc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
 
 
 class BaseReader(abc.ABC):
@@ -6,15 +13,31 @@ class BaseReader(abc.ABC):
     Abstract base class for a data reader.
     """
 
-    def __init__(self, file_paths, data=[]):
+    def __init__(self, file_paths, data=[], max_workers=None,
+                 executor='thread', lazy=False):
         """
         Initialize a new instance of DataReader.
 
         :param file_paths: A list of file paths to read data from.
+        :param max_workers: The number of workers used to parse files
+                            concurrently (default is None, which reads
+                            the files sequentially).
+        :param executor: The kind of pool used when max_workers is set,
+                         either 'thread' or 'process' (default is 'thread').
+        :param lazy: If True, the files are not read on initialization
+                     (default is False).
         """
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"Unknown executor '{executor}', "
+                f"expected one of {sorted(EXECUTORS)}."
+            )
         self.file_paths = file_paths
         self.data = data
-        self.read_files()
+        self.max_workers = max_workers
+        self.executor = executor
+        if not lazy:
+            self.read_files()
 
     @abc.abstractmethod
     def read_file(self, file_path):
@@ -24,12 +47,50 @@ class BaseReader(abc.ABC):
         :param file_path: The path of the file to read.
         """
 
+    @abc.abstractmethod
+    def parse_file(self, file_path):
+        """
+        Parse a file and return its data without storing it.
+        Must be implemented by subclasses.
+
+        :param file_path: The path of the file to parse.
+        :return: The data parsed from the file.
+        """
+
+    @abc.abstractmethod
+    def merge(self, parsed):
+        """
+        Merge the data parsed from several files into self.data.
+        Must be implemented by subclasses.
+
+        :param parsed: A list with the data of each file, in file order.
+        """
+
+    def map_files(self, func):
+        """
+        Apply func to every file in self.file_paths, using a pool of
+        self.max_workers workers when it is set.
+
+        :param func: A callable taking a file path.
+        :return: A list with the results, in the order of self.file_paths.
+        """
+        if self.max_workers is None:
+            return [func(file_path) for file_path in self.file_paths]
+
+        pool_class = EXECUTORS[self.executor]
+        with pool_class(max_workers=self.max_workers) as pool:
+            return list(pool.map(func, self.file_paths))
+
     def read_files(self):
         """
         Read data from all files in self.file_paths.
         """
-        for file_path in self.file_paths:
-            self.read_file(file_path)
+        if self.max_workers is None:
+            for file_path in self.file_paths:
+                self.read_file(file_path)
+            return
+
+        self.merge(self.map_files(self.parse_file))
 
     def get_data(self):
         """
@@ -1,6 +1,15 @@
 import os
 import pandas as pd
 from libs.files.readers.base_reader import BaseReader
+from libs.files.readers.filters import Filter, as_filter, filter_frame
+from libs.files.readers.schema import concat, memory_usage
+from libs.metrics.registry import increment, timed
+
+# Rows parsed at a time when filters are pushed down into the parsing
+PARSE_CHUNKSIZE = 100_000
+
+# Labels of the reader metrics
+METRIC_LABELS = {'format': 'csv'}
 
 
 class CSVReader(BaseReader):
@@ -8,45 +17,252 @@ class CSVReader(BaseReader):
     Class to read data from CSV files.
     """
 
-    def __init__(self, file_paths, encoding='utf8'):
+    def __init__(self, file_paths, encoding='utf8', max_workers=None,
+                 executor='thread', chunksize=None, columns=None,
+                 filters=None, dtype=None):
         """
         Initialize a new instance of CSVReader.
 
         :param file_paths: A list of CSV file paths to read data from.
         :param encoding: The encoding of the CSV files.
+        :param max_workers: The number of workers used to parse the files
+                            concurrently (default is None, which parses
+                            them sequentially).
+        :param executor: The kind of pool used when max_workers is set,
+                         either 'thread' or 'process' (default is 'thread').
+        :param chunksize: The number of rows per chunk in streaming mode
+                          (default is None, which loads every file into
+                          self.data on initialization). When set, the files
+                          are only read through iter_chunks.
+        :param columns: The columns to keep (default is None, which keeps
+                        all columns). Only these columns and the ones
+                        read by the filters are parsed.
+        :param filters: A list of filters (see apply_filter) applied to
+                        each parsed chunk, so non-matching rows are never
+                        held in the combined data (default is None).
+        :param dtype: A dictionary of column names and the dtypes to
+                      parse them with, such as
+                      libs.files.readers.schema.EVENT_SCHEMA
+                      (default is None, which infers them).
         """
+        if chunksize is not None and chunksize <= 0:
+            raise ValueError("chunksize must be a positive integer.")
         self.encoding = encoding
+        self.chunksize = chunksize
+        self.columns = list(columns) if columns is not None else None
+        self.filters = list(filters or [])
+        self.dtype = dtype
         super().__init__(
             file_paths,
             data=pd.DataFrame(),
+            max_workers=max_workers,
+            executor=executor,
+            lazy=self.streaming,
         )
 
-    def read_file(self, file_path):
+    @property
+    def streaming(self):
         """
-        Read data from a CSV file.
+        Whether the reader yields chunks instead of loading all the data.
+        """
+        return self.chunksize is not None
+
+    def _usecols(self):
+        """
+        Get the columns to parse: the projected columns plus the ones
+        read by the filters, or None when all columns are needed.
+        """
+        if self.columns is None:
+            return None
+
+        usecols = list(self.columns)
+        for condition in self.filters:
+            if not isinstance(condition, Filter) or not condition.columns:
+                # The columns read by the filter are unknown
+                return None
+            usecols.extend(column for column in condition.columns
+                           if column not in usecols)
+        return usecols
+
+    def _read_csv(self, file_path, chunksize=None):
+        """
+        Call pandas.read_csv with the projection and dtypes pushed down.
 
         :param file_path: The path of the CSV file to read.
+        :param chunksize: The number of rows per chunk (default is None,
+                          which reads the whole file at once).
+        :return: A DataFrame, or a reader of DataFrames if chunksize is set.
         """
-        if os.path.getsize(file_path) == 0:
+        size = os.path.getsize(file_path)
+        if size == 0:
             raise ValueError(f"The file '{file_path}' is empty.")
+        increment('reader_files_total', labels=METRIC_LABELS)
+        increment('reader_bytes_total', size, METRIC_LABELS)
+
+        usecols = self._usecols()
+        dtype = self.dtype
+        if dtype is not None and usecols is not None:
+            dtype = {column: column_dtype
+                     for column, column_dtype in dtype.items()
+                     if column in usecols}
+
+        return pd.read_csv(file_path, encoding=self.encoding,
+                           usecols=usecols, dtype=dtype,
+                           chunksize=chunksize)
 
-        df = pd.read_csv(file_path, encoding=self.encoding)
+    def _process_chunk(self, chunk):
+        """
+        Apply the filters and the column projection to a parsed chunk.
+
+        :param chunk: The parsed DataFrame.
+        :return: The filtered and projected DataFrame.
+        """
+        rows = len(chunk)
+        for condition in self.filters:
+            chunk = filter_frame(chunk, condition)
+        if self.filters:
+            increment('reader_rows_filtered_total', rows - len(chunk),
+                      METRIC_LABELS)
+        if self.columns is not None:
+            chunk = chunk[self.columns]
+        return chunk
 
-        self.data = pd.concat([self.data] + [df], ignore_index=True)
+    def parse_file(self, file_path):
+        """
+        Parse a CSV file into a DataFrame without storing it.
+        When filters are set, the file is parsed in chunks and the
+        non-matching rows are dropped from each chunk.
+
+        :param file_path: The path of the CSV file to parse.
+        :return: The parsed DataFrame.
+        """
+        with timed('reader_parse_seconds', METRIC_LABELS):
+            if not self.filters:
+                df = self._process_chunk(self._read_csv(file_path))
+            else:
+                with self._read_csv(file_path, PARSE_CHUNKSIZE) as chunks:
+                    parts = [self._process_chunk(chunk) for chunk in chunks]
+                df = concat(parts)
+        increment('reader_rows_total', len(df), METRIC_LABELS)
 
         # Check if the file is empty
-        if self.data.empty:
+        if df.empty:
             print(f"Warning: The file '{file_path}' is empty.")
 
-    def apply_filter(self, condition):
+        return df
+
+    def merge(self, parsed):
+        """
+        Append the parsed DataFrames to the data with a single concat.
+
+        :param parsed: A list of DataFrames, in file order.
+        """
+        self.data = concat([self.data] + list(parsed))
+
+    def read_file(self, file_path):
+        """
+        Read data from a CSV file.
+
+        :param file_path: The path of the CSV file to read.
+        """
+        self.merge([self.parse_file(file_path)])
+
+    def read_files(self):
+        """
+        Read data from all files in self.file_paths, concatenating
+        them once at the end instead of once per file.
+        """
+        with timed('reader_read_seconds', METRIC_LABELS):
+            self.merge(self.map_files(self.parse_file))
+
+    def memory_usage(self):
+        """
+        Get the memory used by the data, including the Python objects
+        referenced by its object columns.
+
+        :return: The memory usage in bytes.
+        """
+        return memory_usage(self.data)
+
+    def iter_file_chunks(self, file_path, chunksize):
+        """
+        Iterate over a CSV file in chunks of at most chunksize rows,
+        with the registered filters applied.
+
+        :param file_path: The path of the CSV file to read.
+        :param chunksize: The maximum number of rows per chunk.
+        :return: An iterator of DataFrames.
+        """
+        with self._read_csv(file_path, chunksize) as chunks:
+            for chunk in chunks:
+                chunk = self._process_chunk(chunk)
+                increment('reader_rows_total', len(chunk), METRIC_LABELS)
+                yield chunk
+
+    def iter_chunks(self, chunksize=None):
+        """
+        Iterate over the rows of all files in DataFrames of chunksize rows.
+        Chunks span file boundaries, so only the last one may be smaller,
+        and at most about two chunks are held in memory at a time.
+
+        :param chunksize: The number of rows per chunk
+                          (default is self.chunksize).
+        :return: An iterator of DataFrames.
+        """
+        chunksize = chunksize or self.chunksize
+        if chunksize is None:
+            raise ValueError("A chunksize is required to iterate in chunks.")
+
+        pending = []
+        pending_rows = 0
+        for file_path in self.file_paths:
+            for chunk in self.iter_file_chunks(file_path, chunksize):
+                if chunk.empty:
+                    continue
+                pending.append(chunk)
+                pending_rows += len(chunk)
+                if pending_rows < chunksize:
+                    continue
+
+                buffer = concat(pending)
+                start = 0
+                while len(buffer) - start >= chunksize:
+                    yield buffer.iloc[start:start + chunksize] \
+                        .reset_index(drop=True)
+                    start += chunksize
+                pending = [buffer.iloc[start:]]
+                pending_rows = len(buffer) - start
+
+        if pending_rows:
+            yield concat(pending)
+
+    def apply_filter(self, condition, vectorized=False):
         """
         Apply a filter to remove rows from the data DataFrame
         based on the given condition.
 
         :param condition: A boolean condition to filter the rows.
-                          The condition should be in the form
-                          of a lambda function that takes a row
-                          as input and returns True if the row should
-                          be kept, False otherwise.
+                          Either a Filter from
+                          libs.files.readers.filters (e.g.
+                          notnull('artist') & eq('page', 'NextSong')),
+                          evaluated column-wise, or a lambda function
+                          that takes a row as input and returns True if
+                          the row should be kept, False otherwise.
+                          In streaming mode the filter is applied to each
+                          chunk as it is read.
+        :param vectorized: If True, condition is a callable that takes
+                           the whole DataFrame and returns a boolean mask
+                           (default is False).
         """
-        self.data = self.data[self.data.apply(condition, axis=1)]
+        if vectorized:
+            condition = as_filter(condition)
+
+        if self.streaming:
+            self.filters.append(condition)
+            return
+
+        rows = len(self.data)
+        with timed('reader_filter_seconds', METRIC_LABELS):
+            self.data = filter_frame(self.data, condition)
+        increment('reader_rows_filtered_total', rows - len(self.data),
+                  METRIC_LABELS)
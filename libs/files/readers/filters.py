@@ -0,0 +1,204 @@
+import operator
+import pandas as pd
+
+
+class Filter:
+    """
+    Vectorized filter evaluated column-wise on a whole DataFrame.
+
+    Filters can be combined with the &, | and ~ operators. The built-in
+    filters (notnull, eq, ...) and their combinations only hold their
+    operator, columns and values, so they can be pickled and sent to
+    process pool workers.
+    """
+
+    def __init__(self, func, columns=(), arrow=None):
+        """
+        Initialize a new instance of Filter.
+
+        :param func: A callable that takes a DataFrame and returns a
+                     boolean Series (or array) with True for the rows
+                     to keep. It must be a module-level function for the
+                     filter to be picklable.
+        :param columns: The columns the filter reads, if known.
+        :param arrow: A callable that takes the pyarrow.compute module
+                      and returns the equivalent pyarrow expression, used
+                      to push the filter down into columnar readers
+                      (default is None).
+        """
+        self.op = 'call'
+        self.args = (func, arrow)
+        self.columns = tuple(columns)
+
+    @classmethod
+    def _of(cls, op, args, columns):
+        """
+        Build a filter applying a built-in operator.
+
+        :param op: The name of the operator, a key of _PANDAS_OPS.
+        :param args: The arguments of the operator.
+        :param columns: The columns the filter reads.
+        """
+        condition = cls.__new__(cls)
+        condition.op = op
+        condition.args = tuple(args)
+        condition.columns = tuple(columns)
+        return condition
+
+    def __call__(self, data):
+        """
+        Evaluate the filter on a DataFrame.
+
+        :param data: The DataFrame to evaluate.
+        :return: A boolean mask with True for the rows to keep.
+        """
+        return _PANDAS_OPS[self.op](data, *self.args)
+
+    def to_arrow(self):
+        """
+        Get the filter as a pyarrow expression.
+
+        :return: The pyarrow.compute.Expression, or None if the filter
+                 has no pyarrow equivalent.
+        """
+        import pyarrow.compute as pc
+        return self._arrow(pc)
+
+    def _arrow(self, pc):
+        return _ARROW_OPS[self.op](pc, *self.args)
+
+    def _combine(self, other, op):
+        other = as_filter(other)
+        return Filter._of(
+            op, (self, other),
+            self.columns + tuple(column for column in other.columns
+                                 if column not in self.columns))
+
+    def __and__(self, other):
+        return self._combine(other, 'and')
+
+    def __or__(self, other):
+        return self._combine(other, 'or')
+
+    def __invert__(self):
+        return Filter._of('not', (self,), self.columns)
+
+
+def _binary_arrow(op):
+    def arrow(pc, left, right):
+        left, right = left._arrow(pc), right._arrow(pc)
+        if left is None or right is None:
+            return None
+        return op(left, right)
+    return arrow
+
+
+def _invert_arrow(pc, condition):
+    expression = condition._arrow(pc)
+    return None if expression is None else ~expression
+
+
+def _call_arrow(pc, func, arrow):
+    return None if arrow is None else arrow(pc)
+
+
+# Evaluation of the operators on a DataFrame
+_PANDAS_OPS = {
+    'call': lambda data, func, arrow: func(data),
+    'notnull': lambda data, column: data[column].notna(),
+    'isnull': lambda data, column: data[column].isna(),
+    'eq': lambda data, column, value: data[column] == value,
+    'ne': lambda data, column, value: data[column] != value,
+    'isin': lambda data, column, values: data[column].isin(values),
+    'and': lambda data, left, right: left(data) & right(data),
+    'or': lambda data, left, right: left(data) | right(data),
+    'not': lambda data, condition: ~condition(data),
+}
+
+# Translation of the operators to pyarrow expressions
+_ARROW_OPS = {
+    'call': _call_arrow,
+    'notnull': lambda pc, column: pc.field(column).is_valid(),
+    'isnull': lambda pc, column: pc.field(column).is_null(),
+    'eq': lambda pc, column, value: pc.field(column) == value,
+    # Nulls are not equal to value, as in pandas
+    'ne': lambda pc, column, value: (pc.field(column) != value)
+    | pc.field(column).is_null(),
+    'isin': lambda pc, column, values: pc.field(column).isin(values),
+    'and': _binary_arrow(operator.and_),
+    'or': _binary_arrow(operator.or_),
+    'not': _invert_arrow,
+}
+
+
+def as_filter(condition):
+    """
+    Wrap a DataFrame callable into a Filter.
+
+    :param condition: A Filter or a callable that takes a DataFrame and
+                      returns a boolean mask.
+    :return: The condition as a Filter.
+    """
+    if isinstance(condition, Filter):
+        return condition
+    return Filter(condition)
+
+
+def notnull(column):
+    """
+    Keep the rows where column is not null.
+    """
+    return Filter._of('notnull', (column,), [column])
+
+
+def isnull(column):
+    """
+    Keep the rows where column is null.
+    """
+    return Filter._of('isnull', (column,), [column])
+
+
+def eq(column, value):
+    """
+    Keep the rows where column is equal to value.
+    """
+    return Filter._of('eq', (column, value), [column])
+
+
+def ne(column, value):
+    """
+    Keep the rows where column is not equal to value.
+    """
+    return Filter._of('ne', (column, value), [column])
+
+
+def isin(column, values):
+    """
+    Keep the rows where column is one of values.
+    """
+    return Filter._of('isin', (column, list(values)), [column])
+
+
+def filter_frame(data, condition):
+    """
+    Remove the rows of a DataFrame that do not match a condition.
+
+    :param data: The DataFrame to filter.
+    :param condition: A Filter, evaluated column-wise, or a legacy
+                      lambda function that takes a row and returns True
+                      if the row should be kept, evaluated row by row.
+    :return: The filtered DataFrame.
+    """
+    if data.empty:
+        return data
+
+    if isinstance(condition, Filter):
+        mask = condition(data)
+    else:
+        mask = data.apply(condition, axis=1)
+
+    if not (isinstance(mask, pd.Series) and mask.dtype == bool):
+        # Nullable comparisons may return NA, which drops the row
+        mask = pd.Series(mask, index=data.index).fillna(False).astype(bool)
+
+    return data[mask]
@@ -0,0 +1,147 @@
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pandas as pd
+from libs.files.readers.base_reader import BaseReader
+from libs.files.readers.filters import Filter, filter_frame
+from libs.files.readers.schema import concat
+
+
+class ParquetReader(BaseReader):
+    """
+    Class to read data from Parquet files.
+    """
+
+    def __init__(self, file_paths, columns=None, filters=None,
+                 max_workers=None, executor='thread'):
+        """
+        Initialize a new instance of ParquetReader.
+
+        :param file_paths: A list of Parquet file paths to read data from.
+        :param columns: The columns to read (default is None, which reads
+                        all columns).
+        :param filters: A list of filters from libs.files.readers.filters.
+                        Filters with a pyarrow equivalent are pushed down
+                        into the reader, which skips the row groups whose
+                        statistics cannot match; the others are applied
+                        after reading (default is None).
+        :param max_workers: The number of workers used to read the files
+                            concurrently (default is None, which reads
+                            them sequentially).
+        :param executor: The kind of pool used when max_workers is set,
+                         either 'thread' or 'process' (default is 'thread').
+        """
+        self.columns = list(columns) if columns is not None else None
+        self.filters = list(filters or [])
+        super().__init__(
+            file_paths,
+            data=pd.DataFrame(),
+            max_workers=max_workers,
+            executor=executor,
+        )
+
+    def _split_filters(self):
+        """
+        Split the filters into a pyarrow expression to push down and the
+        filters to apply after reading.
+        """
+        expression = None
+        remaining = []
+        for condition in self.filters:
+            arrow = condition.to_arrow() \
+                if isinstance(condition, Filter) else None
+            if arrow is None:
+                remaining.append(condition)
+            elif expression is None:
+                expression = arrow
+            else:
+                expression = expression & arrow
+        return expression, remaining
+
+    def _read_columns(self):
+        """
+        Get the columns to read: the projected columns plus the ones
+        read by the filters.
+        """
+        if self.columns is None:
+            return None
+
+        columns = list(self.columns)
+        for condition in self.filters:
+            if not isinstance(condition, Filter) or not condition.columns:
+                # The columns read by the filter are unknown
+                return None
+            columns.extend(column for column in condition.columns
+                           if column not in columns)
+        return columns
+
+    def read_table(self, file_path, columns, expression):
+        """
+        Read a file into a pyarrow Table.
+
+        :param file_path: The path of the file to read.
+        :param columns: The columns to read, or None for all of them.
+        :param expression: The pyarrow filter expression, or None.
+        :return: The pyarrow Table.
+        """
+        return pq.read_table(file_path, columns=columns, filters=expression)
+
+    def parse_file(self, file_path):
+        """
+        Parse a file into a DataFrame without storing it.
+
+        :param file_path: The path of the file to parse.
+        :return: The parsed DataFrame.
+        """
+        expression, remaining = self._split_filters()
+        table = self.read_table(file_path, self._read_columns(), expression)
+        df = table.to_pandas()
+        for condition in remaining:
+            df = filter_frame(df, condition)
+        if self.columns is not None:
+            df = df[self.columns]
+        return df
+
+    def merge(self, parsed):
+        """
+        Append the parsed DataFrames to the data with a single concat.
+
+        :param parsed: A list of DataFrames, in file order.
+        """
+        self.data = concat([self.data] + list(parsed))
+
+    def read_file(self, file_path):
+        """
+        Read data from a file.
+
+        :param file_path: The path of the file to read.
+        """
+        self.merge([self.parse_file(file_path)])
+
+    def read_files(self):
+        """
+        Read data from all files in self.file_paths, concatenating
+        them once at the end.
+        """
+        self.merge(self.map_files(self.parse_file))
+
+
+class FeatherReader(ParquetReader):
+    """
+    Class to read data from Feather (Arrow IPC) files.
+    """
+
+    def read_table(self, file_path, columns, expression):
+        """
+        Read a file into a pyarrow Table. Feather files have no row
+        group statistics, so the filter expression is evaluated on the
+        table after reading.
+
+        :param file_path: The path of the file to read.
+        :param columns: The columns to read, or None for all of them.
+        :param expression: The pyarrow filter expression, or None.
+        :return: The pyarrow Table.
+        """
+        table = feather.read_table(file_path, columns=columns)
+        if expression is not None:
+            table = table.filter(expression)
+        return table
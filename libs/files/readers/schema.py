@@ -0,0 +1,105 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Declared dtypes of the raw event data. Low-cardinality text columns
+# are categoricals, integer columns use the smallest nullable integer
+# type that fits them and timestamps are int64 epoch milliseconds.
+EVENT_SCHEMA = {
+    'artist': 'object',
+    'auth': 'category',
+    'firstName': 'category',
+    'gender': 'category',
+    'itemInSession': 'Int16',
+    'lastName': 'category',
+    'length': 'float64',
+    'level': 'category',
+    'location': 'category',
+    'method': 'category',
+    'page': 'category',
+    'registration': 'Int64',
+    'sessionId': 'Int32',
+    'song': 'object',
+    'status': 'Int16',
+    'ts': 'Int64',
+    'userId': 'Int32',
+}
+
+
+def apply_schema(data, schema=EVENT_SCHEMA):
+    """
+    Cast the columns of a DataFrame to the dtypes of a schema.
+    Columns missing from the DataFrame are ignored.
+
+    :param data: The DataFrame to cast.
+    :param schema: A dictionary of column names and their dtypes
+                   (default is EVENT_SCHEMA).
+    :return: The DataFrame with the schema dtypes.
+    """
+    return data.astype({
+        column: dtype for column, dtype in schema.items()
+        if column in data.columns
+    })
+
+
+def concat(frames):
+    """
+    Concatenate DataFrames keeping their categorical columns categorical.
+    pandas.concat falls back to object when the categories of the frames
+    differ, so the categories are unified first.
+
+    :param frames: A list of DataFrames with the same columns.
+    :return: The concatenated DataFrame, with a new index.
+    """
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+
+    dtypes = {}
+    for column in frames[0].columns:
+        if all(isinstance(frame[column].dtype, pd.CategoricalDtype)
+               for frame in frames):
+            categories = union_categoricals(
+                [frame[column] for frame in frames]).categories
+            dtypes[column] = pd.CategoricalDtype(categories)
+
+    if dtypes and len(frames) > 1:
+        frames = [frame.astype(dtypes) for frame in frames]
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def memory_usage(data):
+    """
+    Get the memory used by a DataFrame, including the Python objects
+    referenced by its object columns.
+
+    :param data: The DataFrame to measure.
+    :return: The memory usage in bytes.
+    """
+    return int(data.memory_usage(deep=True).sum())
+
+
+def memory_report(before, after):
+    """
+    Describe the memory usage of a DataFrame before and after a change,
+    such as applying a schema.
+
+    :param before: The original DataFrame.
+    :param after: The changed DataFrame.
+    :return: A report with the usage per column and in total.
+    """
+    lines = [f"{'column':<16}{'before':>14}{'after':>14}"]
+    before_usage = before.memory_usage(deep=True)
+    after_usage = after.memory_usage(deep=True)
+    for column in before_usage.index:
+        lines.append(
+            f"{column:<16}{before_usage[column]:>14,}"
+            f"{after_usage.get(column, 0):>14,}"
+        )
+
+    total_before = memory_usage(before)
+    total_after = memory_usage(after)
+    lines.append(f"{'total':<16}{total_before:>14,}{total_after:>14,}")
+    if total_after:
+        lines.append(f"reduction: {total_before / total_after:.1f}x")
+    return '\n'.join(lines)
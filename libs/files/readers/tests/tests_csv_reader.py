@@ -1,6 +1,7 @@
 import os
 import unittest
 from libs.files.readers.csv_reader import CSVReader
+from libs.files.readers.filters import Filter, eq
 
 
 class TestCSVReader(unittest.TestCase):
@@ -83,6 +84,95 @@ class TestCSVReader(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             self.csv_reader.read_file(nonexistent_file)
 
+    def test_parallel_read_files(self):
+        """
+        Test reading files concurrently keeps the file order.
+        """
+        for executor in ('thread', 'process'):
+            csv_reader = CSVReader(
+                [self.test_file, self.header_only_file, self.test_file],
+                max_workers=2,
+                executor=executor,
+            )
+            self.assertEqual(csv_reader.get_data_length(), 4)
+            self.assertEqual(
+                csv_reader.get_data()['name'].tolist(),
+                ['John', 'Jane', 'John', 'Jane']
+            )
+            self.assertEqual(csv_reader.get_data().index.tolist(),
+                             [0, 1, 2, 3])
+
+    def test_parallel_read_with_filters(self):
+        """
+        Test that pushed-down filters can be sent to process workers.
+        """
+        for executor in ('thread', 'process'):
+            csv_reader = CSVReader(
+                [self.test_file, self.test_file],
+                max_workers=2,
+                executor=executor,
+                filters=[eq('name', 'Jane')],
+            )
+            self.assertEqual(csv_reader.get_data()['name'].tolist(),
+                             ['Jane', 'Jane'])
+
+    def test_parallel_empty_file(self):
+        """
+        Test reading an empty file concurrently.
+        """
+        with self.assertRaises(ValueError):
+            CSVReader([self.test_file, self.empty_file], max_workers=2)
+
+    def test_invalid_executor(self):
+        """
+        Test that an unknown executor is rejected.
+        """
+        with self.assertRaises(ValueError):
+            CSVReader([self.test_file], max_workers=2, executor='fiber')
+
+    def test_streaming_does_not_load_data(self):
+        """
+        Test that a streaming reader does not read the files upfront.
+        """
+        csv_reader = CSVReader([self.test_file], chunksize=1)
+        self.assertTrue(csv_reader.streaming)
+        self.assertTrue(csv_reader.get_data().empty)
+
+    def test_iter_chunks_spans_files(self):
+        """
+        Test that chunks have a fixed size across file boundaries.
+        """
+        csv_reader = CSVReader(
+            [self.test_file, self.header_only_file, self.test_file],
+            chunksize=3
+        )
+        chunks = list(csv_reader.iter_chunks())
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 1])
+        self.assertEqual(
+            chunks[0]['name'].tolist(), ['John', 'Jane', 'John'])
+        self.assertEqual(chunks[0].index.tolist(), [0, 1, 2])
+        self.assertEqual(chunks[1].iloc[0].tolist(), [2, 'Jane', 30])
+
+    def test_iter_chunks_with_filter(self):
+        """
+        Test that filters are applied to each chunk in streaming mode.
+        """
+        csv_reader = CSVReader([self.test_file, self.test_file],
+                               chunksize=1)
+        csv_reader.apply_filter(lambda row: row['name'] == 'Jane')
+        chunks = list(csv_reader.iter_chunks())
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(all(chunk['name'].eq('Jane').all()
+                            for chunk in chunks))
+
+    def test_iter_chunks_empty_file(self):
+        """
+        Test streaming an empty file.
+        """
+        csv_reader = CSVReader([self.empty_file], chunksize=10)
+        with self.assertRaises(ValueError):
+            list(csv_reader.iter_chunks())
+
     def test_apply_filter(self):
         """
         Test applying a filter to remove rows from the data DataFrame.
@@ -95,6 +185,57 @@ class TestCSVReader(unittest.TestCase):
         self.assertEqual(len(filtered_data), 1)
         self.assertEqual(filtered_data.iloc[0].tolist(), [1, 'John', 25])
 
+    def test_apply_vectorized_filter(self):
+        """
+        Test applying a column-wise filter.
+        """
+        self.csv_reader.apply_filter(eq('name', 'Jane'))
+        filtered_data = self.csv_reader.get_data()
+        self.assertEqual(filtered_data['name'].tolist(), ['Jane'])
+
+        self.csv_reader.apply_filter(
+            lambda data: data['age'] > 40, vectorized=True)
+        self.assertTrue(self.csv_reader.get_data().empty)
+
+    def test_projection_and_filter_pushdown(self):
+        """
+        Test parsing only some columns and rows of the files.
+        """
+        csv_reader = CSVReader(
+            [self.test_file, self.header_only_file],
+            columns=['age', 'id'],
+            filters=[eq('name', 'Jane')],
+            dtype={'id': 'int32', 'name': 'string', 'age': 'int8'},
+        )
+        data = csv_reader.get_data()
+        self.assertEqual(data.columns.tolist(), ['age', 'id'])
+        self.assertEqual(data.values.tolist(), [[30, 2]])
+        self.assertEqual(str(data['id'].dtype), 'int32')
+        self.assertEqual(str(data['age'].dtype), 'int8')
+
+    def test_pushdown_with_row_filter(self):
+        """
+        Test that a filter reading unknown columns still gets them.
+        """
+        csv_reader = CSVReader(
+            [self.test_file],
+            columns=['id'],
+            filters=[lambda row: row['name'] == 'John',
+                     Filter(lambda data: data['age'] < 30)],
+        )
+        self.assertEqual(csv_reader.get_data().values.tolist(), [[1]])
+
+    def test_streaming_pushdown(self):
+        """
+        Test the projection and filters in streaming mode.
+        """
+        csv_reader = CSVReader([self.test_file, self.test_file],
+                               chunksize=10, columns=['name'],
+                               filters=[eq('age', 25)])
+        chunks = list(csv_reader.iter_chunks())
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0].values.tolist(), [['John'], ['John']])
+
 
 if __name__ == '__main__':
     unittest.main()
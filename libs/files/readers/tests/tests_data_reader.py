@@ -14,9 +14,37 @@ class TestDataReaders(unittest.TestCase):
                 # Implement a mock read_file method for testing
                 self.data.append("Test data")
 
+            def parse_file(self, file_path):
+                return "Test data"
+
+            def merge(self, parsed):
+                self.data.extend(parsed)
+
         # Instantiate the DataReaderMock and call the read_file method
         reader = DataReaderMock([])
         reader.read_file("test_file.txt")
 
         # Assert that the data was properly populated
         self.assertEqual(reader.data, ["Test data"])
+
+    def test_missing_parallel_hooks(self):
+        class DataReaderMock(BaseReader):
+            def read_file(self, file_path):
+                self.data.append(file_path)
+
+        with self.assertRaises(TypeError):
+            DataReaderMock(['test_file.txt'], data=[])
+
+    def test_parallel_read(self):
+        class DataReaderMock(BaseReader):
+            def read_file(self, file_path):
+                self.data.append(file_path)
+
+            def parse_file(self, file_path):
+                return file_path.upper()
+
+            def merge(self, parsed):
+                self.data.extend(parsed)
+
+        reader = DataReaderMock(['a.txt', 'b.txt'], data=[], max_workers=2)
+        self.assertEqual(reader.data, ['A.TXT', 'B.TXT'])
@@ -0,0 +1,76 @@
+import pickle
+import unittest
+import pandas as pd
+from libs.files.readers.filters import (
+    Filter, eq, filter_frame, isin, isnull, ne, notnull
+)
+
+
+class TestFilters(unittest.TestCase):
+    """
+    Test cases for the vectorized filters.
+    """
+
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'artist': ['Mynt', None, 'Taylor Swift', None],
+            'page': ['NextSong', 'Home', 'NextSong', 'Logout'],
+        })
+
+    def test_notnull(self):
+        result = filter_frame(self.data, notnull('artist'))
+        self.assertEqual(result['artist'].tolist(), ['Mynt', 'Taylor Swift'])
+        # The original index is kept, as with the row-wise filter
+        self.assertEqual(result.index.tolist(), [0, 2])
+
+    def test_isnull(self):
+        result = filter_frame(self.data, isnull('artist'))
+        self.assertEqual(result['page'].tolist(), ['Home', 'Logout'])
+
+    def test_eq_ne_isin(self):
+        self.assertEqual(
+            len(filter_frame(self.data, eq('page', 'NextSong'))), 2)
+        self.assertEqual(
+            len(filter_frame(self.data, ne('page', 'NextSong'))), 2)
+        self.assertEqual(
+            len(filter_frame(self.data, isin('page', ['Home', 'Logout']))),
+            2)
+
+    def test_combined_filters(self):
+        condition = notnull('artist') & eq('page', 'NextSong') \
+            | eq('page', 'Logout')
+        result = filter_frame(self.data, condition)
+        self.assertEqual(result.index.tolist(), [0, 2, 3])
+        self.assertEqual(condition.columns, ('artist', 'page'))
+
+        result = filter_frame(self.data, ~eq('page', 'NextSong'))
+        self.assertEqual(result.index.tolist(), [1, 3])
+
+    def test_pickle(self):
+        condition = ~(notnull('artist') & isin('page', ['NextSong'])) \
+            | ne('page', 'Home')
+        restored = pickle.loads(pickle.dumps(condition))
+
+        self.assertEqual(filter_frame(self.data, restored).index.tolist(),
+                         filter_frame(self.data, condition).index.tolist())
+        self.assertEqual(restored.columns, ('artist', 'page'))
+        self.assertEqual(str(restored.to_arrow()),
+                         str(condition.to_arrow()))
+
+    def test_frame_callable(self):
+        condition = Filter(lambda data: data['page'].str.startswith('N'))
+        result = filter_frame(self.data, condition)
+        self.assertEqual(result.index.tolist(), [0, 2])
+
+    def test_row_lambda(self):
+        result = filter_frame(self.data, lambda row: pd.notnull(row['artist']))
+        self.assertEqual(result.index.tolist(), [0, 2])
+
+    def test_empty_frame(self):
+        empty = self.data.iloc[0:0]
+        self.assertTrue(filter_frame(empty, notnull('artist')).empty)
+        self.assertTrue(filter_frame(empty, lambda row: True).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from libs.files.readers.filters import Filter, eq, notnull
+from libs.files.readers.parquet_reader import FeatherReader, ParquetReader
+from libs.files.readers.schema import apply_schema
+from libs.files.writers.parquet import FeatherWriter, ParquetWriter
+
+
+class TestParquetReader(unittest.TestCase):
+    """
+    Test cases for ParquetReader and FeatherReader classes.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data = apply_schema(pd.DataFrame({
+            'artist': ['Mynt', None, 'Taylor Swift', 'Train'],
+            'level': ['free', 'free', 'paid', 'paid'],
+            'sessionId': [52, 52, 53, 54],
+            'userId': [8.0, None, 10.0, 10.0],
+        }))
+        self.parquet_file = os.path.join(self.directory.name, 'events.parquet')
+        ParquetWriter(row_group_size=2).write_data(self.parquet_file,
+                                                   self.data)
+        self.feather_file = os.path.join(self.directory.name, 'events.feather')
+        FeatherWriter().write_data(self.feather_file, self.data)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_keeps_dtypes(self):
+        for reader_class, file_path in ((ParquetReader, self.parquet_file),
+                                        (FeatherReader, self.feather_file)):
+            data = reader_class([file_path]).get_data()
+            pd.testing.assert_frame_equal(data, self.data)
+
+    def test_projection_and_filters(self):
+        for reader_class, file_path in ((ParquetReader, self.parquet_file),
+                                        (FeatherReader, self.feather_file)):
+            reader = reader_class(
+                [file_path, file_path],
+                columns=['sessionId', 'userId'],
+                filters=[notnull('artist') & eq('level', 'paid'),
+                         Filter(lambda data: data['sessionId'] > 53,
+                                columns=['sessionId'])],
+            )
+            data = reader.get_data()
+            self.assertEqual(data.columns.tolist(), ['sessionId', 'userId'])
+            self.assertEqual(data.values.tolist(), [[54, 10], [54, 10]])
+            self.assertEqual(str(data['userId'].dtype), 'Int32')
+
+    def test_parallel_read(self):
+        reader = ParquetReader([self.parquet_file] * 3, max_workers=3)
+        self.assertEqual(reader.get_data_length(), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import pandas as pd
+from libs.files.readers.schema import (
+    EVENT_SCHEMA, apply_schema, concat, memory_report, memory_usage
+)
+
+
+class TestSchema(unittest.TestCase):
+    """
+    Test cases for the event schema helpers.
+    """
+
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'level': ['free', 'paid', 'free'],
+            'userId': [8.0, None, 10.0],
+            'ts': [1.54111E+12, 1.54112E+12, 1.54113E+12],
+            'extra': [1, 2, 3],
+        })
+
+    def test_apply_schema(self):
+        data = apply_schema(self.data)
+        self.assertEqual(str(data['level'].dtype), 'category')
+        self.assertEqual(str(data['userId'].dtype), 'Int32')
+        self.assertEqual(str(data['ts'].dtype), 'Int64')
+        self.assertEqual(data['userId'].tolist(), [8, pd.NA, 10])
+        self.assertEqual(data['ts'].iloc[0], 1541110000000)
+        # Columns outside of the schema are left untouched
+        self.assertEqual(data['extra'].dtype, self.data['extra'].dtype)
+
+    def test_concat_keeps_categoricals(self):
+        first = apply_schema(self.data.iloc[:1])
+        second = apply_schema(self.data.iloc[1:])
+        data = concat([pd.DataFrame(), first, second])
+        self.assertEqual(str(data['level'].dtype), 'category')
+        self.assertEqual(data['level'].tolist(), ['free', 'paid', 'free'])
+        self.assertEqual(data.index.tolist(), [0, 1, 2])
+
+    def test_concat_nothing(self):
+        self.assertTrue(concat([pd.DataFrame()]).empty)
+
+    def test_memory_report(self):
+        data = pd.DataFrame({
+            column: ['free'] * 1000 for column in ('level', 'gender')
+        })
+        compact = apply_schema(data)
+        self.assertLess(memory_usage(compact), memory_usage(data))
+        report = memory_report(data, compact)
+        self.assertIn('level', report)
+        self.assertIn('reduction', report)
+
+    def test_schema_covers_event_columns(self):
+        self.assertEqual(len(EVENT_SCHEMA), 17)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,48 +1,85 @@
+import datetime
+import os
+import tempfile
 import unittest
-from unittest.mock import patch
 from libs.files.collector import FileCollector
 
 
 class TestFileCollector(unittest.TestCase):
-    @patch('os.walk')
-    @patch('glob.glob')
-    def test_collect_files(self, mock_glob, mock_walk):
-        # Set up the mock return values
-        mock_walk.return_value = [
-            ('/path/to/test_directory', [], ['file1.txt']),
-            ('/path/to/test_directory/subdir', [], ['file2.txt'])
-        ]
-        mock_glob.return_value = ['/path/to/test_directory/file1.txt', '/path/to/test_directory/subdir/file2.txt']
-
-        # Create an instance of FileCollector
-        file_collector = FileCollector('/path/to/test_directory')
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        for name in [
+            'b/2018-11-02-events.csv',
+            'b/2018-11-01-events.csv',
+            'a/2018-11-30-events.csv',
+            'a/notes.txt',
+            'a/.DS_Store',
+            '.hidden/2018-11-03-events.csv',
+            'top.csv',
+        ]:
+            file_path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            open(file_path, 'w').close()
+        os.makedirs(os.path.join(self.root, 'empty'))
 
-        # Collect the files
-        files = file_collector.collect_files()
+    def tearDown(self):
+        self.directory.cleanup()
 
-        # Check the collected files
-        expected_files = {
-            '/path/to/test_directory/file1.txt',
-            '/path/to/test_directory/subdir/file2.txt'
-        }
-        self.assertSetEqual(set(files), expected_files)
+    def relative(self, files):
+        return [os.path.relpath(file_path, self.root) for file_path in files]
 
-    @patch('os.walk')
-    @patch('glob.glob')
-    def test_collect_files_empty_directory(self, mock_glob, mock_walk):
-        # Set up the mock return values for an empty directory
-        mock_walk.return_value = []
-        mock_glob.return_value = []
+    def test_collect_files(self):
+        # Collect the files
+        files = FileCollector(self.root).collect_files()
 
-        # Create an instance of FileCollector
-        file_collector = FileCollector('/path/to/empty_directory')
+        # Directories and hidden entries are skipped, the order is stable
+        self.assertEqual(self.relative(files), [
+            'top.csv',
+            'a/2018-11-30-events.csv',
+            'a/notes.txt',
+            'b/2018-11-01-events.csv',
+            'b/2018-11-02-events.csv',
+        ])
 
-        # Collect the files
-        files = file_collector.collect_files()
+    def test_collect_files_empty_directory(self):
+        # Collect the files of an empty directory
+        files = FileCollector(os.path.join(self.root, 'empty')) \
+            .collect_files()
 
         # Check that no files are collected
         self.assertEqual(len(files), 0)
 
+    def test_collect_files_missing_directory(self):
+        files = FileCollector(os.path.join(self.root, 'missing')) \
+            .collect_files()
+        self.assertEqual(files, [])
+
+    def test_include_exclude_and_extensions(self):
+        collector = FileCollector(self.root, include=['*-events.*'],
+                                  exclude=['a', '.*'], extensions=['.csv'])
+        self.assertEqual(self.relative(collector.collect_files()), [
+            'b/2018-11-01-events.csv',
+            'b/2018-11-02-events.csv',
+        ])
+
+        collector = FileCollector(self.root, exclude=[],
+                                  extensions=['.txt'])
+        self.assertEqual(self.relative(collector.collect_files()),
+                         ['a/notes.txt'])
+
+    def test_date_range(self):
+        collector = FileCollector(self.root, start_date='2018-11-02',
+                                  end_date=datetime.date(2018, 11, 30))
+        self.assertEqual(self.relative(collector.collect_files()), [
+            'a/2018-11-30-events.csv',
+            'b/2018-11-02-events.csv',
+        ])
+
+    def test_iter_files_is_lazy(self):
+        files = FileCollector(self.root).iter_files()
+        self.assertEqual(self.relative([next(files)]), ['top.csv'])
+
 
 if __name__ == '__main__':
     unittest.main()
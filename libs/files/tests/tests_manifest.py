@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from libs.files.collector import FileCollector
+from libs.files.manifest import FileManifest
+
+
+class ManifestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.manifest_path = os.path.join(self.root, 'state',
+                                          'manifest.json')
+        self.file_path = self.write('2018-11-01-events.csv', 'a,b\n1,2\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        file_path = os.path.join(self.root, name)
+        with open(file_path, 'w') as f:
+            f.write(content)
+        return file_path
+
+
+class TestFileManifest(ManifestTestCase):
+    def test_record_and_reload(self):
+        manifest = FileManifest(self.manifest_path)
+        self.assertTrue(manifest.is_changed(self.file_path))
+
+        manifest.record(self.file_path, rows=1)
+        manifest.save()
+
+        reloaded = FileManifest(self.manifest_path)
+        self.assertFalse(reloaded.is_changed(self.file_path))
+        self.assertEqual(reloaded.get(self.file_path)['rows'], 1)
+
+    def test_changed_content(self):
+        manifest = FileManifest(self.manifest_path)
+        manifest.record(self.file_path)
+
+        self.write('2018-11-01-events.csv', 'a,b\n1,3\n')
+        os.utime(self.file_path, ns=(0, 0))
+        self.assertTrue(manifest.is_changed(self.file_path))
+
+    def test_touched_but_unchanged(self):
+        manifest = FileManifest(self.manifest_path)
+        manifest.record(self.file_path)
+
+        os.utime(self.file_path, ns=(0, 0))
+        self.assertFalse(manifest.is_changed(self.file_path))
+        # Checking does not modify the manifest
+        self.assertNotEqual(manifest.get(self.file_path)['mtime_ns'], 0)
+        self.assertFalse(os.path.exists(self.manifest_path))
+
+        self.assertEqual(manifest.update([self.file_path]), 1)
+        reloaded = FileManifest(self.manifest_path)
+        self.assertEqual(reloaded.get(self.file_path)['mtime_ns'], 0)
+        self.assertEqual(reloaded.update([self.file_path]), 0)
+
+
+class TestFileCollectorManifest(ManifestTestCase):
+    def test_collect_new_files(self):
+        collector = FileCollector(self.root, manifest_path=os.path.join(
+            self.root, 'manifest.json'))
+        self.assertEqual(collector.collect_new_files(), [self.file_path])
+
+        collector.mark_loaded(self.file_path, rows=1)
+        new_file = self.write('2018-11-02-events.csv', 'a,b\n3,4\n')
+        # A temporary manifest left by an interrupted save
+        self.write('manifest.json.tmp', '{}')
+
+        collector = FileCollector(self.root, manifest_path=os.path.join(
+            self.root, 'manifest.json'))
+        self.assertEqual(collector.collect_new_files(), [new_file])
+
+    def test_collect_new_files_without_manifest(self):
+        with self.assertRaises(ValueError):
+            FileCollector(self.root).collect_new_files()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,11 @@
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+import pandas as pd
+from libs.files.writers.partitioning import (
+    PartitionSpec, partition_keys, partition_path
+)
 
 
 class BaseWriter(ABC):
@@ -6,6 +13,9 @@ class BaseWriter(ABC):
     Abstract base class for different types of writers.
     """
 
+    # File extension of the partition files
+    extension = ''
+
     def __init__(self, encoding='utf8'):
         """
         Initialize a new instance of BaseWriter.
@@ -23,3 +33,54 @@ class BaseWriter(ABC):
         :param header: The header row to write.
         :param data: The data rows to write.
         """
+
+    def write_partitioned(self, directory: str, data: pd.DataFrame,
+                          partition_by: PartitionSpec,
+                          columns: list[str] = None,
+                          max_workers: int = None,
+                          file_name: str = 'part') -> Dict[str, int]:
+        """
+        Write data as a partitioned dataset: one file per partition, in
+        a name=value directory tree under directory, e.g.
+        directory/date=2018-11-01/part.csv. Partitions are written in
+        parallel.
+
+        Only the partitions present in data are written, replacing their
+        previous file, so reprocessing a subset of the data leaves the
+        other partitions untouched.
+
+        :param directory: The root directory of the dataset.
+        :param data: The data rows to write as a pandas DataFrame.
+        :param partition_by: A column name, a list of column names, or a
+                             dictionary of partition names and either a
+                             column name or a function of the DataFrame
+                             returning the key of each row, such as
+                             partitioning.event_date() or
+                             partitioning.bucket('sessionId', 8).
+        :param columns: The columns to include in the files
+                        (default is None, which includes all columns).
+        :param max_workers: The maximum number of partitions written at
+                            once (default is None, which uses the
+                            ThreadPoolExecutor default).
+        :param file_name: The name of the partition files, without
+                          extension (default is 'part').
+        :return: A dictionary of the written file paths and their number
+                 of rows.
+        """
+        keys = partition_keys(data, partition_by)
+        names = list(keys.columns)
+        groups = data.groupby([keys[name] for name in names],
+                              sort=True, dropna=False, observed=True)
+
+        def write(item):
+            values, partition = item
+            if not isinstance(values, tuple):
+                values = (values,)
+            file_path = os.path.join(directory,
+                                     partition_path(names, values),
+                                     file_name + self.extension)
+            self.write_data(file_path, partition, columns=columns)
+            return file_path, len(partition)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(executor.map(write, groups))
@@ -1,6 +1,184 @@
+import gzip
+import io
 import os
+import secrets
+from typing import Iterable, Tuple
 import pandas as pd
 from libs.files.writers.base import BaseWriter
+from libs.metrics.registry import get_registry, increment, timed
+
+# Size of the write buffer of the streamed files
+BUFFER_SIZE = 1024 * 1024
+COMPRESSIONS = (None, 'gzip', 'zstd')
+
+# Labels of the writer metrics
+METRIC_LABELS = {'format': 'csv'}
+
+
+def _create_temp_file(file_path: str) -> Tuple[int, str]:
+    """
+    Create a new hidden temporary file next to a file, e.g.
+    '.events.csv.1f2e3d4c.tmp'. Unlike tempfile.mkstemp, which creates it
+    readable by its owner only, it gets the mode of a file created by
+    open: 0o666 less the current umask, applied by the kernel.
+
+    :param file_path: The path of the target file.
+    :return: The file descriptor, open for writing, and the path.
+    """
+    directory, name = os.path.split(file_path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        temp_path = os.path.join(directory,
+                                 f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(temp_path, flags, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+class CSVStreamWriter:
+    """
+    Context manager appending DataFrame chunks to a CSV file.
+
+    The file is opened once and the header written with the first chunk.
+    Chunks go to a temporary file next to the target, optionally gzip or
+    zstd compressed, which replaces the target only when the writer is
+    closed without error, so readers never see a partial file.
+    """
+
+    def __init__(self, file_path: str, columns: list[str] = None,
+                 encoding: str = 'utf8', sep: str = ',',
+                 compression: str = None, buffer_size: int = BUFFER_SIZE):
+        """
+        Initialize a new instance of CSVStreamWriter.
+
+        :param file_path: The path of the CSV file to write.
+        :param columns: The columns to include in the output
+                        (default is None, which includes the columns of
+                        the first chunk).
+        :param encoding: The encoding of the CSV file (default is 'utf8').
+        :param sep: The separator to use in the CSV file (default is ',').
+        :param compression: None, 'gzip' or 'zstd' (default is None).
+                            zstd requires the zstandard package.
+        :param buffer_size: The size in bytes of the write buffer
+                            (default is 1MB).
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression '{compression}', "
+                f"expected one of {COMPRESSIONS}."
+            )
+        self.file_path = file_path
+        self.columns = columns
+        self.encoding = encoding
+        self.sep = sep
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.rows = 0
+
+        self._temp_path = None
+        self._raw = None
+        self._stream = None
+        self._header = True
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the writer is not open.
+        """
+        return self._stream is None
+
+    def open(self) -> None:
+        """
+        Open the temporary file the chunks are written to.
+        """
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Hidden, so file collectors skip it while it is being written
+        fd, self._temp_path = _create_temp_file(self.file_path)
+        self._raw = io.open(fd, 'wb', buffering=self.buffer_size)
+        try:
+            self._stream = io.TextIOWrapper(
+                self._compressor(self._raw), encoding=self.encoding,
+                newline='')
+        except Exception:
+            self.abort()
+            raise
+
+    def _compressor(self, raw):
+        """
+        Wrap the raw file in the compression stream.
+        """
+        if self.compression == 'gzip':
+            return gzip.GzipFile(fileobj=raw, mode='wb')
+        if self.compression == 'zstd':
+            import zstandard
+            return zstandard.ZstdCompressor().stream_writer(raw)
+        return raw
+
+    def write(self, chunk: pd.DataFrame) -> int:
+        """
+        Append a chunk of rows, writing the header with the first one.
+
+        :param chunk: A DataFrame with the data rows.
+        :return: The number of rows written.
+        """
+        if self.closed:
+            raise ValueError("The writer is not open.")
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        with timed('writer_chunk_seconds', METRIC_LABELS):
+            chunk[self.columns].to_csv(self._stream, sep=self.sep,
+                                       index=False, header=self._header)
+        self._header = False
+        self.rows += len(chunk)
+        increment('writer_rows_total', len(chunk), METRIC_LABELS)
+        return len(chunk)
+
+    def close(self) -> None:
+        """
+        Flush the rows and move the temporary file to the target path.
+        """
+        if self.closed:
+            return
+        if self._header and self.columns is not None:
+            self.write(pd.DataFrame(columns=self.columns))
+        self._stream.close()
+        self._raw.close()
+        if get_registry().enabled:
+            increment('writer_bytes_total',
+                      os.path.getsize(self._temp_path), METRIC_LABELS)
+        # Make sure the content is on disk before it replaces the target
+        with open(self._temp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(self._temp_path, self.file_path)
+        self._stream = None
+
+    def abort(self) -> None:
+        """
+        Discard the rows written so far and remove the temporary file.
+        """
+        for handle in (self._stream, self._raw):
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+        self._stream = None
+        if self._temp_path is not None and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
 
 
 class CSVWriter(BaseWriter):
@@ -8,6 +186,8 @@ class CSVWriter(BaseWriter):
     Writer class for writing data to a CSV file.
     """
 
+    extension = '.csv'
+
     def __init__(self, encoding: str = 'utf8', sep: str = ','):
         """
         Initialize a new instance of CSVWriter.
@@ -36,6 +216,55 @@ class CSVWriter(BaseWriter):
         if columns is not None:
             data = data[columns]
 
-        data.to_csv(file_path, sep=self.sep,
-                    index=False, encoding=self.encoding)
+        with timed('writer_write_seconds', METRIC_LABELS):
+            data.to_csv(file_path, sep=self.sep,
+                        index=False, encoding=self.encoding)
+        increment('writer_rows_total', len(data), METRIC_LABELS)
+        if get_registry().enabled:
+            increment('writer_bytes_total', os.path.getsize(file_path),
+                      METRIC_LABELS)
         return data
+
+    def open(self, file_path: str, columns: list[str] = None,
+             compression: str = None,
+             buffer_size: int = BUFFER_SIZE) -> CSVStreamWriter:
+        """
+        Open a streaming writer to append chunks to the CSV file, e.g.
+
+            with writer.open(file_path, compression='gzip') as stream:
+                for chunk in chunks:
+                    stream.write(chunk)
+
+        :param file_path: The path of the CSV file to write.
+        :param columns: The columns to include in the output
+                        (default is None, which includes the columns of
+                        the first chunk).
+        :param compression: None, 'gzip' or 'zstd' (default is None).
+        :param buffer_size: The size in bytes of the write buffer
+                            (default is 1MB).
+        """
+        return CSVStreamWriter(file_path, columns=columns,
+                               encoding=self.encoding, sep=self.sep,
+                               compression=compression,
+                               buffer_size=buffer_size)
+
+    def write_chunks(self, file_path: str, chunks: Iterable[pd.DataFrame],
+                     columns: list[str] = None,
+                     compression: str = None) -> int:
+        """
+        Write an iterable of DataFrame chunks to the CSV file, writing
+        the header once and appending each chunk as it arrives, so only
+        one chunk is held in memory at a time.
+
+        :param file_path: The path of the CSV file to write.
+        :param chunks: An iterable of DataFrames with the data rows.
+        :param columns: The columns to include in the output
+                        (default is None, which includes all columns).
+        :param compression: None, 'gzip' or 'zstd' (default is None).
+        :return: The number of rows written.
+        """
+        with self.open(file_path, columns=columns,
+                       compression=compression) as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+        return stream.rows
@@ -0,0 +1,233 @@
+from typing import Iterable
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from libs.files.writers.base import BaseWriter
+from libs.metrics.registry import get_registry, increment, timed
+
+# Rows of the first chunks held back while a column only has nulls, to
+# infer its type from the next chunks
+MAX_PENDING_ROWS = 1_000_000
+
+
+class ParquetWriter(BaseWriter):
+    """
+    Writer class for writing data to a Parquet file.
+    """
+
+    extension = '.parquet'
+
+    def __init__(self, compression: str = 'snappy',
+                 row_group_size: int = None):
+        """
+        Initialize a new instance of ParquetWriter.
+
+        :param compression: The compression codec, e.g. 'snappy', 'zstd',
+                            'gzip' or 'none' (default is 'snappy').
+        :param row_group_size: The maximum number of rows per row group
+                               (default is None, which uses the pyarrow
+                               default). Smaller row groups let filtered
+                               reads skip more data.
+        """
+        super().__init__()
+        self.compression = compression
+        self.row_group_size = row_group_size
+
+    @staticmethod
+    def to_table(data: pd.DataFrame, columns: list[str] = None) -> pa.Table:
+        """
+        Convert a DataFrame to a pyarrow Table, keeping the pandas dtypes
+        (categoricals, nullable integers) in the file metadata.
+
+        :param data: The DataFrame to convert.
+        :param columns: The columns to include (default is None, which
+                        includes all columns).
+        """
+        if columns is not None:
+            data = data[columns]
+        return pa.Table.from_pandas(data, preserve_index=False)
+
+    def write_data(self, file_path: str, data: pd.DataFrame,
+                   columns: list[str] = None) -> pd.DataFrame:
+        """
+        Write data to the Parquet file.
+
+        :param file_path: The path of the Parquet file to write.
+        :param data: The data rows to write as a pandas DataFrame.
+        :param columns: The columns to include in the output
+                        (default is None, which includes all columns).
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if columns is not None:
+            data = data[columns]
+
+        with timed('writer_write_seconds', {'format': 'parquet'}):
+            pq.write_table(self.to_table(data), file_path,
+                           compression=self.compression,
+                           row_group_size=self.row_group_size)
+        _count_written(file_path, len(data), 'parquet')
+        return data
+
+    def write_chunks(self, file_path: str, chunks: Iterable[pd.DataFrame],
+                     columns: list[str] = None,
+                     schema: pa.Schema = None) -> int:
+        """
+        Write an iterable of DataFrame chunks to the Parquet file, each
+        chunk becoming one or more row groups.
+
+        The file schema is fixed when the file is opened. Without an
+        explicit schema, it is unified from the first chunks, which are
+        held back while a column only has nulls (up to MAX_PENDING_ROWS
+        rows), so that a column empty in the first chunk takes the type
+        of its values in the later ones.
+
+        :param file_path: The path of the Parquet file to write.
+        :param chunks: An iterable of DataFrames with the same columns.
+        :param columns: The columns to include in the output
+                        (default is None, which includes all columns).
+        :param schema: The schema of the file, to which every chunk is
+                       cast (default is None, which infers it).
+        :return: The number of rows written.
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        rows = 0
+        writer = None
+        pending = []
+        pending_rows = 0
+        empty_table = None
+
+        def write(table):
+            with timed('writer_chunk_seconds', {'format': 'parquet'}):
+                writer.write_table(_cast(table, writer.schema),
+                                   row_group_size=self.row_group_size)
+            return table.num_rows
+
+        try:
+            for chunk in chunks:
+                table = self.to_table(chunk, columns)
+                if table.num_rows == 0:
+                    # Empty chunks may lack the column types
+                    if empty_table is None:
+                        empty_table = table
+                    continue
+                if writer is not None:
+                    rows += write(table)
+                    continue
+
+                pending.append(table)
+                pending_rows += table.num_rows
+                file_schema = schema or pa.unify_schemas(
+                    [table.schema for table in pending])
+                if _has_null_fields(file_schema) and \
+                        pending_rows < MAX_PENDING_ROWS:
+                    continue
+                writer = pq.ParquetWriter(file_path, file_schema,
+                                          compression=self.compression)
+                for table in pending:
+                    rows += write(table)
+                pending = []
+
+            if pending:
+                writer = pq.ParquetWriter(
+                    file_path, schema or pa.unify_schemas(
+                        [table.schema for table in pending]),
+                    compression=self.compression)
+                for table in pending:
+                    rows += write(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None and (empty_table is not None or schema):
+            pq.write_table(_cast(empty_table, schema) if schema
+                           else empty_table, file_path,
+                           compression=self.compression)
+        if writer is not None or empty_table is not None or schema:
+            _count_written(file_path, rows, 'parquet')
+        return rows
+
+
+def _has_null_fields(schema: pa.Schema) -> bool:
+    """
+    Whether a schema has columns of the null type, i.e. only nulls.
+    """
+    return any(pa.types.is_null(field.type) for field in schema)
+
+
+def _cast(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """
+    Cast a table to the schema of a file.
+
+    :raises ValueError: If a column cannot be cast, e.g. a column that
+                        only had nulls when the schema was inferred.
+    """
+    if table is None:
+        return schema.empty_table()
+    if table.schema.equals(schema):
+        return table
+    try:
+        return table.select(schema.names).cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as error:
+        raise ValueError(
+            f"The chunk does not match the schema of the file: {error}. "
+            "Pass an explicit schema to write_chunks.") from error
+
+
+class FeatherWriter(BaseWriter):
+    """
+    Writer class for writing data to a Feather (Arrow IPC) file.
+    """
+
+    extension = '.feather'
+
+    def __init__(self, compression: str = 'lz4'):
+        """
+        Initialize a new instance of FeatherWriter.
+
+        :param compression: The compression codec, 'lz4', 'zstd' or
+                            'uncompressed' (default is 'lz4').
+        """
+        super().__init__()
+        self.compression = compression
+
+    def write_data(self, file_path: str, data: pd.DataFrame,
+                   columns: list[str] = None) -> pd.DataFrame:
+        """
+        Write data to the Feather file.
+
+        :param file_path: The path of the Feather file to write.
+        :param data: The data rows to write as a pandas DataFrame.
+        :param columns: The columns to include in the output
+                        (default is None, which includes all columns).
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if columns is not None:
+            data = data[columns]
+
+        with timed('writer_write_seconds', {'format': 'feather'}):
+            feather.write_feather(ParquetWriter.to_table(data), file_path,
+                                  compression=self.compression)
+        _count_written(file_path, len(data), 'feather')
+        return data
+
+
+def _count_written(file_path: str, rows: int, file_format: str) -> None:
+    """
+    Count the rows and bytes of a written file in the writer metrics.
+    """
+    if not get_registry().enabled:
+        return
+    labels = {'format': file_format}
+    increment('writer_rows_total', rows, labels)
+    increment('writer_bytes_total', os.path.getsize(file_path), labels)
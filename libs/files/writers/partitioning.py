@@ -0,0 +1,105 @@
+import os
+from typing import Callable, Dict, List, Union
+from urllib.parse import quote, unquote
+import pandas as pd
+from pandas.api.types import is_integer_dtype
+
+# Directory name value of the rows whose partition key is missing
+NULL_PARTITION = '__null__'
+
+PartitionSpec = Union[str, List[str], Dict[str, Union[str, Callable]]]
+
+
+def event_date(column: str = 'ts') -> Callable:
+    """
+    Partition function keying rows by the UTC date of an epoch
+    milliseconds timestamp column, e.g. '2018-11-01'.
+
+    :param column: The timestamp column (default is 'ts').
+    """
+    def key(data):
+        dates = pd.to_datetime(data[column], unit='ms', utc=True)
+        return dates.dt.strftime('%Y-%m-%d')
+    return key
+
+
+def bucket(column: str, buckets: int) -> Callable:
+    """
+    Partition function spreading rows over a fixed number of buckets of
+    a column. Integer columns are bucketed by modulo, other columns by a
+    stable hash of their values.
+
+    :param column: The column to bucket, e.g. 'sessionId'.
+    :param buckets: The number of buckets.
+    """
+    if buckets <= 0:
+        raise ValueError("buckets must be a positive integer.")
+
+    def key(data):
+        values = data[column]
+        if is_integer_dtype(values.dtype):
+            return values % buckets
+        hashes = pd.util.hash_pandas_object(values, index=False)
+        return (hashes % buckets).where(values.notna())
+    return key
+
+
+def partition_keys(data: pd.DataFrame,
+                   partition_by: PartitionSpec) -> pd.DataFrame:
+    """
+    Compute the partition key columns of a DataFrame.
+
+    :param data: The DataFrame to partition.
+    :param partition_by: A column name, a list of column names, or a
+                         dictionary of partition names and either a
+                         column name or a function of the DataFrame
+                         returning the key of each row.
+    :return: A DataFrame with one column per partition level.
+    """
+    if isinstance(partition_by, str):
+        partition_by = [partition_by]
+    if not isinstance(partition_by, dict):
+        partition_by = {column: column for column in partition_by}
+    if not partition_by:
+        raise ValueError("partition_by must name at least one partition.")
+
+    keys = {}
+    for name, spec in partition_by.items():
+        keys[name] = data[spec] if isinstance(spec, str) else spec(data)
+    return pd.DataFrame(keys, index=data.index)
+
+
+def partition_path(names: List[str], values: tuple) -> str:
+    """
+    Build the relative directory of a partition, one name=value level
+    per partition key, e.g. 'date=2018-11-01/bucket=3'. Values are
+    percent-encoded, so a separator in a value, e.g. 'AC/DC', stays in
+    a single directory level.
+
+    :param names: The partition names.
+    :param values: The partition key values, in the order of names.
+    """
+    parts = []
+    for name, value in zip(names, values):
+        value = NULL_PARTITION if pd.isna(value) \
+            else quote(str(value), safe='')
+        parts.append(f"{name}={value}")
+    return os.path.join(*parts)
+
+
+def partition_values(path: str) -> Dict[str, str]:
+    """
+    Parse the partition key values from the name=value directories of a
+    partition file path.
+
+    :param path: The path of a partition file or directory.
+    :return: A dictionary of partition names and values; missing keys
+             are None.
+    """
+    values = {}
+    for part in os.path.normpath(path).split(os.sep):
+        name, sep, value = part.partition('=')
+        if sep:
+            values[name] = None if value == NULL_PARTITION \
+                else unquote(value)
+    return values
@@ -1,8 +1,17 @@
+import gzip
 import unittest
 import os
+import tempfile
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from unittest.mock import patch
+from libs.files.readers.parquet_reader import ParquetReader
 from libs.files.writers.csv import CSVWriter
+from libs.files.writers.parquet import ParquetWriter
+from libs.files.writers.partitioning import (
+    bucket, event_date, partition_values
+)
 
 
 class TestCSVWriter(unittest.TestCase):
@@ -54,6 +63,228 @@ class TestCSVWriter(unittest.TestCase):
         mock_to_csv.assert_called_once_with(
             file_path, sep=',', index=False, encoding='utf8')
 
+    def test_write_chunks(self):
+        chunks = [
+            pd.DataFrame({'A': [1, 2], 'B': [3, 4]}),
+            pd.DataFrame({'A': [], 'B': []}),
+            pd.DataFrame({'A': [5], 'B': [6]}),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'out', 'test_file.csv')
+            rows = self.writer.write_chunks(file_path, chunks, columns=['A'])
+
+            self.assertEqual(rows, 3)
+            with open(file_path) as f:
+                self.assertEqual(f.read(), 'A\n1\n2\n5\n')
+
+
+class TestCSVStreamWriter(unittest.TestCase):
+    def setUp(self):
+        self.chunks = [
+            pd.DataFrame({'A': [1, 2], 'B': ['x', 'y']}),
+            pd.DataFrame({'B': ['z'], 'A': [3]}),
+        ]
+
+    def test_append_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'out', 'events.csv')
+            with CSVWriter().open(file_path) as stream:
+                for chunk in self.chunks:
+                    stream.write(chunk)
+                self.assertFalse(os.path.exists(file_path))
+
+            self.assertEqual(stream.rows, 3)
+            with open(file_path) as f:
+                self.assertEqual(f.read(), 'A,B\n1,x\n2,y\n3,z\n')
+            self.assertEqual(os.listdir(os.path.dirname(file_path)),
+                             ['events.csv'])
+
+    def test_file_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'events.csv')
+            other_path = os.path.join(directory, 'other.csv')
+            CSVWriter().write_chunks(file_path, self.chunks)
+            with open(other_path, 'w'):
+                pass
+
+            # The same mode as a file created by open, not 0600
+            self.assertEqual(os.stat(file_path).st_mode,
+                             os.stat(other_path).st_mode)
+
+            # The umask current when the file is written applies
+            previous = os.umask(0o027)
+            try:
+                CSVWriter().write_chunks(file_path, self.chunks)
+            finally:
+                os.umask(previous)
+            self.assertEqual(os.stat(file_path).st_mode & 0o777, 0o640)
+
+    def test_gzip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'events.csv.gz')
+            rows = CSVWriter().write_chunks(file_path, self.chunks,
+                                            compression='gzip')
+
+            self.assertEqual(rows, 3)
+            with gzip.open(file_path, 'rt') as f:
+                self.assertEqual(f.read(), 'A,B\n1,x\n2,y\n3,z\n')
+
+    def test_zstd(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'events.csv.zst')
+            CSVWriter().write_chunks(file_path, self.chunks,
+                                     columns=['B'], compression='zstd')
+
+            self.assertEqual(pd.read_csv(file_path)['B'].tolist(),
+                             ['x', 'y', 'z'])
+
+    def test_error_keeps_previous_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'events.csv')
+            with open(file_path, 'w') as f:
+                f.write('previous')
+
+            with self.assertRaises(KeyError):
+                with CSVWriter().open(file_path, columns=['A']) as stream:
+                    stream.write(self.chunks[0])
+                    stream.write(pd.DataFrame({'C': [1]}))
+
+            with open(file_path) as f:
+                self.assertEqual(f.read(), 'previous')
+            self.assertEqual(os.listdir(directory), ['events.csv'])
+
+    def test_header_without_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'events.csv')
+            with CSVWriter().open(file_path, columns=['A', 'B']):
+                pass
+
+            with open(file_path) as f:
+                self.assertEqual(f.read(), 'A,B\n')
+
+    def test_invalid_compression(self):
+        with self.assertRaises(ValueError):
+            CSVWriter().open('events.csv', compression='bz2')
+
+
+class TestParquetWriter(unittest.TestCase):
+    def test_write_chunks(self):
+        chunks = [
+            pd.DataFrame({'song': ['a', 'b'], 'userId': [1, 2]}),
+            pd.DataFrame({'song': [], 'userId': []}),
+            pd.DataFrame({'song': ['c'], 'userId': [3]}),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'out', 'songs.parquet')
+            rows = ParquetWriter(compression='zstd').write_chunks(
+                file_path, chunks, columns=['song'])
+
+            self.assertEqual(rows, 3)
+            data = ParquetReader([file_path]).get_data()
+            self.assertEqual(data['song'].tolist(), ['a', 'b', 'c'])
+
+    def test_write_chunks_null_column(self):
+        chunks = [pd.DataFrame({'a': [1], 's': [None]}),
+                  pd.DataFrame({'a': [2], 's': ['x']})]
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'songs.parquet')
+            rows = ParquetWriter().write_chunks(file_path, chunks)
+
+            self.assertEqual(rows, 2)
+            self.assertEqual(pq.read_schema(file_path).field('s').type,
+                             pa.string())
+            data = ParquetReader([file_path]).get_data()
+            self.assertEqual(data['s'].tolist(), [None, 'x'])
+
+    def test_write_chunks_schema(self):
+        schema = pa.schema([('a', pa.int32()), ('s', pa.string())])
+        chunks = [pd.DataFrame({'s': [None], 'a': [1]})]
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'songs.parquet')
+            ParquetWriter().write_chunks(file_path, chunks, schema=schema)
+            self.assertTrue(pq.read_schema(file_path)
+                            .remove_metadata().equals(schema))
+
+            empty_path = os.path.join(directory, 'empty.parquet')
+            self.assertEqual(
+                ParquetWriter().write_chunks(empty_path, [], schema=schema),
+                0)
+            self.assertEqual(pq.read_schema(empty_path).names, ['a', 's'])
+
+
+class TestWritePartitioned(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'sessionId': pd.array([1, 2, 3, 4, None], dtype='Int32'),
+            'song': ['a', 'b', 'c', 'd', 'e'],
+            # 2018-11-01 and 2018-11-02 in epoch milliseconds
+            'ts': [1541030400000, 1541030400000, 1541116800000,
+                   1541116800000, 1541116800000],
+        })
+
+    def test_partition_by_date_and_bucket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            files = CSVWriter().write_partitioned(
+                directory, self.data,
+                {'date': event_date('ts'), 'bucket': bucket('sessionId', 2)},
+                columns=['sessionId', 'song'], max_workers=2)
+
+            paths = {os.path.relpath(path, directory): rows
+                     for path, rows in files.items()}
+            self.assertEqual(paths, {
+                os.path.join('date=2018-11-01', 'bucket=0', 'part.csv'): 1,
+                os.path.join('date=2018-11-01', 'bucket=1', 'part.csv'): 1,
+                os.path.join('date=2018-11-02', 'bucket=0', 'part.csv'): 1,
+                os.path.join('date=2018-11-02', 'bucket=1', 'part.csv'): 1,
+                os.path.join('date=2018-11-02', 'bucket=__null__',
+                             'part.csv'): 1,
+            })
+            path = os.path.join(directory, 'date=2018-11-02', 'bucket=1',
+                                'part.csv')
+            with open(path) as f:
+                self.assertEqual(f.read(), 'sessionId,song\n3,c\n')
+
+    def test_rewrites_only_present_partitions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = ParquetWriter()
+            writer.write_partitioned(directory, self.data, 'song')
+            files = writer.write_partitioned(
+                directory, self.data[self.data['song'] == 'a'], 'song')
+
+            self.assertEqual(list(files.values()), [1])
+            self.assertEqual(len(os.listdir(directory)), 5)
+            data = ParquetReader(list(files)).get_data()
+            self.assertEqual(data['song'].tolist(), ['a'])
+
+    def test_partition_values(self):
+        path = os.path.join('out', 'date=2018-11-01', 'bucket=__null__',
+                            'part.csv')
+        self.assertEqual(partition_values(path),
+                         {'date': '2018-11-01', 'bucket': None})
+
+    def test_partition_values_quoted(self):
+        data = pd.DataFrame({'artist': ['AC/DC', '50% off', 'a=b'],
+                             'song': ['x', 'y', 'z']})
+        with tempfile.TemporaryDirectory() as directory:
+            files = CSVWriter().write_partitioned(directory, data, 'artist')
+
+            self.assertEqual(sorted(os.listdir(directory)), [
+                'artist=50%25%20off', 'artist=AC%2FDC', 'artist=a%3Db'])
+            self.assertEqual(
+                sorted(partition_values(path)['artist'] for path in files),
+                ['50% off', 'AC/DC', 'a=b'])
+
+    def test_bucket_strings(self):
+        keys = bucket('song', 4)(self.data)
+        self.assertTrue(keys.between(0, 3).all())
+        self.assertEqual(keys.tolist(), bucket('song', 4)(self.data).tolist())
+
+    def test_invalid_partitions(self):
+        with self.assertRaises(ValueError):
+            bucket('sessionId', 0)
+        with self.assertRaises(ValueError):
+            CSVWriter().write_partitioned('out', self.data, [])
+
 
 if __name__ == '__main__':
     unittest.main()
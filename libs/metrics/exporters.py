@@ -0,0 +1,147 @@
+import logging
+import math
+import os
+from typing import List
+from libs.metrics.registry import (
+    Counter, Histogram, Labels, MetricsRegistry, get_registry
+)
+
+logger = logging.getLogger('libs.metrics')
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value or bucket bound in the Prometheus text format.
+    """
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    """
+    Format labels as {name="value",...}, or an empty string.
+    """
+    labels = labels + extra
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def _escape(value: str) -> str:
+    """
+    Escape a label value: backslashes, double quotes and line feeds.
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+def format_prometheus(registry: MetricsRegistry = None) -> str:
+    """
+    Format the metrics of a registry in the Prometheus text exposition
+    format.
+
+    Args:
+        registry: The registry (default is None, which uses the current
+                  registry).
+
+    Returns:
+        str: The metrics, one sample per line.
+    """
+    registry = registry or get_registry()
+    lines: List[str] = []
+    typed = set()
+    for metric in registry.collect():
+        if metric.name not in typed:
+            typed.add(metric.name)
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Counter):
+            lines.append(f"{metric.name}{_format_labels(metric.labels)} "
+                         f"{_format_value(metric.value)}")
+            continue
+        for bound, count in metric.cumulative_counts():
+            le = (('le', _format_value(float(bound))),)
+            lines.append(f"{metric.name}_bucket"
+                         f"{_format_labels(metric.labels, le)} {count}")
+        labels = _format_labels(metric.labels)
+        lines.append(f"{metric.name}_sum{labels} "
+                     f"{_format_value(metric.sum)}")
+        lines.append(f"{metric.name}_count{labels} {metric.count}")
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+class PrometheusFileExporter:
+    """
+    Exporter writing the metrics to a file in the Prometheus text format,
+    e.g. for the textfile collector of the node exporter.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Initialize a new instance of PrometheusFileExporter.
+
+        Args:
+            file_path: The path of the file to write, usually ending
+                       with .prom.
+        """
+        self.file_path = file_path
+
+    def export(self, registry: MetricsRegistry = None) -> None:
+        """
+        Write the metrics atomically, through a temporary file, so the
+        collector never reads a partial file.
+
+        Args:
+            registry: The registry (default is None, which uses the
+                      current registry).
+        """
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self.file_path}.tmp"
+        with open(temp_path, 'w', encoding='utf8') as f:
+            f.write(format_prometheus(registry))
+        os.replace(temp_path, self.file_path)
+
+
+class LogExporter:
+    """
+    Exporter logging one line per metric.
+    """
+
+    def __init__(self, log: logging.Logger = None,
+                 level: int = logging.INFO):
+        """
+        Initialize a new instance of LogExporter.
+
+        Args:
+            log: The logger (default is None, which uses the
+                 'libs.metrics' logger).
+            level: The level of the lines (default is logging.INFO).
+        """
+        self.log = log or logger
+        self.level = level
+
+    def export(self, registry: MetricsRegistry = None) -> None:
+        """
+        Log the metrics.
+
+        Args:
+            registry: The registry (default is None, which uses the
+                      current registry).
+        """
+        registry = registry or get_registry()
+        for metric in registry.collect():
+            name = f"{metric.name}{_format_labels(metric.labels)}"
+            if isinstance(metric, Histogram):
+                self.log.log(
+                    self.level, "%s count=%d sum=%.6g mean=%.6g max=%.6g",
+                    name, metric.count, metric.sum, metric.mean,
+                    metric.max or 0)
+            else:
+                self.log.log(self.level, "%s %s", name,
+                             _format_value(metric.value))
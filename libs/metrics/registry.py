@@ -0,0 +1,346 @@
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Upper bounds of the buckets of the latency histograms, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0, 30.0, 60.0)
+# Upper bounds of the buckets of the size histograms, e.g. rows per batch
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000,
+                50000, 100000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Optional[Dict[str, object]]) -> Labels:
+    """
+    Convert a dictionary of labels to the sorted tuple keying a metric.
+    """
+    if not labels:
+        return ()
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Counter:
+    """
+    A monotonically increasing count, e.g. of rows or bytes processed.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name: str, labels: Labels = ()):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def increment(self, value: Union[int, float] = 1) -> None:
+        """
+        Add a value to the count.
+
+        Args:
+            value: The value to add (default is 1).
+        """
+        with self._lock:
+            self.value += value
+
+
+class Histogram:
+    """
+    A distribution of observed values, e.g. latencies or batch sizes,
+    counted in cumulative buckets.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, labels: Labels = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Counts per bucket, the last one for values above all bounds
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Record an observed value.
+
+        Args:
+            value: The value to record.
+        """
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    @property
+    def mean(self) -> float:
+        """
+        The mean of the observed values.
+        """
+        return self.sum / self.count if self.count else 0.0
+
+    def cumulative_counts(self) -> List[Tuple[float, int]]:
+        """
+        Get the number of values at or below each bucket bound, ending
+        with the infinite bound.
+        """
+        with self._lock:
+            counts = list(self.counts)
+        total = 0
+        cumulative = []
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class MetricsRegistry:
+    """
+    Thread-safe collection of the metrics of a process, created on their
+    first use and identified by their name and labels.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, labels: Optional[Dict[str, object]],
+             **kwargs):
+        key = (name, _labels(labels))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = cls(name, key[1], **kwargs)
+                    self._metrics[key] = metric
+        if not isinstance(metric, cls):
+            raise TypeError(f"The metric '{name}' is a {metric.kind}.")
+        return metric
+
+    def counter(self, name: str,
+                labels: Dict[str, object] = None) -> Counter:
+        """
+        Get a counter, creating it on first use.
+
+        Args:
+            name: The name of the counter, e.g. 'reader_rows_total'.
+            labels: The labels of the counter, e.g. {'table': name}
+                    (default is None).
+
+        Returns:
+            Counter: The counter.
+        """
+        return self._get(Counter, name, labels)
+
+    def histogram(self, name: str, labels: Dict[str, object] = None,
+                  buckets: Sequence[float] = None) -> Histogram:
+        """
+        Get a histogram, creating it on first use.
+
+        Args:
+            name: The name of the histogram, e.g. 'writer_write_seconds'.
+            labels: The labels of the histogram (default is None).
+            buckets: The upper bounds of the buckets, only used when the
+                     histogram is created (default is None, which uses
+                     LATENCY_BUCKETS).
+
+        Returns:
+            Histogram: The histogram.
+        """
+        return self._get(Histogram, name, labels,
+                         buckets=buckets or LATENCY_BUCKETS)
+
+    def increment(self, name: str, value: Union[int, float] = 1,
+                  labels: Dict[str, object] = None) -> None:
+        """
+        Add a value to a counter.
+        """
+        self.counter(name, labels).increment(value)
+
+    def observe(self, name: str, value: float,
+                labels: Dict[str, object] = None,
+                buckets: Sequence[float] = None) -> None:
+        """
+        Record a value in a histogram.
+        """
+        self.histogram(name, labels, buckets).observe(value)
+
+    def collect(self) -> List[Union[Counter, Histogram]]:
+        """
+        Get all the metrics, sorted by name and labels.
+        """
+        with self._lock:
+            return [self._metrics[key] for key in sorted(self._metrics)]
+
+    def reset(self) -> None:
+        """
+        Remove all the metrics.
+        """
+        with self._lock:
+            self._metrics.clear()
+
+
+class NullRegistry(MetricsRegistry):
+    """
+    Registry discarding every value, used while instrumentation is
+    disabled.
+    """
+
+    enabled = False
+
+    def increment(self, name: str, value: Union[int, float] = 1,
+                  labels: Dict[str, object] = None) -> None:
+        pass
+
+    def observe(self, name: str, value: float,
+                labels: Dict[str, object] = None,
+                buckets: Sequence[float] = None) -> None:
+        pass
+
+
+_registry: MetricsRegistry = NullRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Get the registry the instrumented code records its metrics in.
+    """
+    return _registry
+
+
+def set_registry(registry: MetricsRegistry) -> MetricsRegistry:
+    """
+    Replace the registry the instrumented code records its metrics in.
+
+    Args:
+        registry: The new registry.
+
+    Returns:
+        MetricsRegistry: The previous registry.
+    """
+    global _registry
+    previous, _registry = _registry, registry
+    return previous
+
+
+def enable(registry: MetricsRegistry = None) -> MetricsRegistry:
+    """
+    Start recording metrics.
+
+    Args:
+        registry: The registry to record in (default is None, which
+                  keeps the current registry if it is enabled, or
+                  creates a new one).
+
+    Returns:
+        MetricsRegistry: The registry metrics are recorded in.
+    """
+    if registry is None:
+        registry = _registry if _registry.enabled else MetricsRegistry()
+    set_registry(registry)
+    return registry
+
+
+def disable() -> None:
+    """
+    Stop recording metrics.
+    """
+    set_registry(NullRegistry())
+
+
+def increment(name: str, value: Union[int, float] = 1,
+              labels: Dict[str, object] = None) -> None:
+    """
+    Add a value to a counter of the current registry.
+
+    Args:
+        name: The name of the counter.
+        value: The value to add (default is 1).
+        labels: The labels of the counter (default is None).
+    """
+    _registry.increment(name, value, labels)
+
+
+def observe(name: str, value: float, labels: Dict[str, object] = None,
+            buckets: Sequence[float] = None) -> None:
+    """
+    Record a value in a histogram of the current registry.
+
+    Args:
+        name: The name of the histogram.
+        value: The value to record.
+        labels: The labels of the histogram (default is None).
+        buckets: The upper bounds of the buckets (default is None, which
+                 uses LATENCY_BUCKETS).
+    """
+    _registry.observe(name, value, labels, buckets)
+
+
+class timed:
+    """
+    Context manager and decorator recording the duration of a block or
+    function in seconds in a histogram of the current registry, e.g.
+
+        with timed('reader_parse_seconds'):
+            ...
+
+        @timed('pipeline_run_seconds')
+        def run():
+            ...
+
+    The clock is not read while instrumentation is disabled.
+    """
+
+    __slots__ = ('name', 'labels', 'buckets', '_start')
+
+    def __init__(self, name: str, labels: Dict[str, object] = None,
+                 buckets: Sequence[float] = None):
+        """
+        Initialize a new instance of timed.
+
+        Args:
+            name: The name of the histogram.
+            labels: The labels of the histogram (default is None).
+            buckets: The upper bounds of the buckets (default is None,
+                     which uses LATENCY_BUCKETS).
+        """
+        self.name = name
+        self.labels = labels
+        self.buckets = buckets
+        self._start = None
+
+    def __enter__(self) -> 'timed':
+        if _registry.enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._start is not None:
+            _registry.observe(self.name, time.perf_counter() - self._start,
+                              self.labels, self.buckets)
+            self._start = None
+
+    def __call__(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # A new timer per call, so concurrent calls do not share it
+            with timed(self.name, self.labels, self.buckets):
+                return func(*args, **kwargs)
+
+        return wrapper
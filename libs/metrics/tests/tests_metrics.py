@@ -0,0 +1,137 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from libs.files.writers.csv import CSVWriter
+from libs.metrics import registry as metrics
+from libs.metrics.exporters import (
+    LogExporter, PrometheusFileExporter, format_prometheus
+)
+from libs.metrics.registry import (
+    Histogram, MetricsRegistry, NullRegistry, timed
+)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_labels(self):
+        self.registry.increment('rows_total', 5, {'table': 'a'})
+        self.registry.increment('rows_total', 2, {'table': 'a'})
+        self.registry.increment('rows_total', labels={'table': 'b'})
+
+        self.assertEqual(
+            [(m.labels, m.value) for m in self.registry.collect()],
+            [((('table', 'a'),), 7), ((('table', 'b'),), 1)])
+
+    def test_histogram(self):
+        histogram = Histogram('latency_seconds', buckets=[1, 0.1])
+        for value in (0.05, 0.5, 0.5, 3):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative_counts(),
+                         [(0.1, 1), (1, 3), (float('inf'), 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.mean, 1.0125)
+        self.assertEqual(histogram.max, 3)
+
+    def test_kind_conflict(self):
+        self.registry.increment('rows')
+
+        with self.assertRaises(TypeError):
+            self.registry.observe('rows', 1.0)
+
+
+class TestModuleApi(unittest.TestCase):
+    def setUp(self):
+        self.previous = metrics.get_registry()
+
+    def tearDown(self):
+        metrics.set_registry(self.previous)
+
+    def test_disabled_by_default(self):
+        metrics.disable()
+        with patch('libs.metrics.registry.time.perf_counter') as clock:
+            with timed('block_seconds'):
+                pass
+            metrics.increment('rows_total')
+
+        clock.assert_not_called()
+        self.assertIsInstance(metrics.get_registry(), NullRegistry)
+        self.assertEqual(metrics.get_registry().collect(), [])
+
+    def test_timed(self):
+        registry = metrics.enable()
+
+        @timed('call_seconds', {'name': 'f'})
+        def f(x):
+            return x * 2
+
+        self.assertEqual(f(2), 4)
+        f(3)
+        with timed('block_seconds'):
+            pass
+
+        histograms = {m.name: m for m in registry.collect()}
+        self.assertEqual(histograms['call_seconds'].count, 2)
+        self.assertEqual(histograms['block_seconds'].count, 1)
+        self.assertIs(metrics.enable(), registry)
+
+    def test_writer_metrics(self):
+        registry = metrics.enable(MetricsRegistry())
+        data = pd.DataFrame({'a': range(10)})
+
+        with tempfile.TemporaryDirectory() as directory:
+            CSVWriter().write_data(os.path.join(directory, 'a.csv'), data)
+
+        values = {(m.name, m.labels): m for m in registry.collect()}
+        labels = (('format', 'csv'),)
+        self.assertEqual(values[('writer_rows_total', labels)].value, 10)
+        self.assertGreater(values[('writer_bytes_total', labels)].value, 0)
+        self.assertEqual(values[('writer_write_seconds', labels)].count, 1)
+
+
+class TestExporters(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.increment('rows_total', 3, {'table': 'x"y'})
+        self.registry.observe('batch_rows', 20, buckets=[10, 100])
+
+    def test_format_prometheus(self):
+        self.assertEqual(format_prometheus(self.registry), (
+            '# TYPE batch_rows histogram\n'
+            'batch_rows_bucket{le="10"} 0\n'
+            'batch_rows_bucket{le="100"} 1\n'
+            'batch_rows_bucket{le="+Inf"} 1\n'
+            'batch_rows_sum 20\n'
+            'batch_rows_count 1\n'
+            '# TYPE rows_total counter\n'
+            'rows_total{table="x\\"y"} 3\n'
+        ))
+        self.assertEqual(format_prometheus(MetricsRegistry()), '')
+
+    def test_prometheus_file_exporter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'metrics', 'etl.prom')
+            PrometheusFileExporter(path).export(self.registry)
+
+            with open(path, encoding='utf8') as f:
+                self.assertEqual(f.read(), format_prometheus(self.registry))
+            self.assertEqual(os.listdir(os.path.dirname(path)),
+                             ['etl.prom'])
+
+    def test_log_exporter(self):
+        with self.assertLogs('libs.metrics', logging.INFO) as logs:
+            LogExporter().export(self.registry)
+
+        self.assertEqual(logs.output, [
+            'INFO:libs.metrics:batch_rows count=1 sum=20 mean=20 max=20',
+            'INFO:libs.metrics:rows_total{table="x\\"y"} 3',
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Run the ETL pipeline from the raw event files to the processed file and
+the Cassandra query tables.
+
+Usage (from the repository root):
+    python -m libs.pipeline --raw-dir data/raw/event_data \
+        --processed-file data/processed/event_datafile_new.csv \
+        --contact-points cassandra --keyspace data_modeling
+"""
+import argparse
+from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.managers.cassandra_db import CassandraTableManager
+from libs.files.collector import FileCollector
+from libs.metrics import registry as metrics
+from libs.metrics.exporters import PrometheusFileExporter
+from libs.pipeline.pipeline import (
+    DEFAULT_CHUNKSIZE, DEFAULT_QUEUE_SIZE, EventPipeline
+)
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m libs.pipeline',
+        description="Load the raw event files into the processed file "
+                    "and the Cassandra query tables.")
+    parser.add_argument('--raw-dir', default='data/raw/event_data',
+                        help="directory of the raw event files")
+    parser.add_argument('--processed-file',
+                        help="path of the processed file to write")
+    parser.add_argument('--contact-points', nargs='*', default=[],
+                        help="Cassandra contact points; the tables are "
+                             "not loaded when none is given")
+    parser.add_argument('--keyspace', default='data_modeling')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="rows read at a time")
+    parser.add_argument('--queue-size', type=int,
+                        default=DEFAULT_QUEUE_SIZE,
+                        help="chunks buffered for each downstream stage")
+    parser.add_argument('--keep-tables', action='store_true',
+                        help="load into the existing tables instead of "
+                             "recreating them")
+    parser.add_argument('--metrics-file',
+                        help="path of a Prometheus text file to write the "
+                             "reader, writer and Cassandra metrics to")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_args(args)
+    if args.metrics_file:
+        metrics.enable()
+    file_paths = FileCollector(args.raw_dir, extensions=['.csv']) \
+        .collect_files()
+
+    connector = None
+    manager = None
+    if args.contact_points:
+        connector = CassandraConnector(contact_points=args.contact_points)
+        connector.connect()
+        manager = CassandraTableManager(connector, args.keyspace)
+        manager.create_keyspace()
+        manager.set_keyspace()
+
+    try:
+        pipeline = EventPipeline(
+            file_paths,
+            manager=manager,
+            processed_path=args.processed_file,
+            chunksize=args.chunksize,
+            queue_size=args.queue_size,
+            recreate_tables=not args.keep_tables,
+        )
+        report = pipeline.run()
+    finally:
+        if connector is not None:
+            connector.disconnect()
+
+    print(f"{len(file_paths)} files")
+    print(report)
+    if args.metrics_file:
+        PrometheusFileExporter(args.metrics_file).export()
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+import threading
+import time
+from functools import partial
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from libs.databases.managers.cassandra_db import CassandraTableManager
+from libs.databases.managers.tables import (
+    ColumnChunk, FanOutLoader, TableDefinition
+)
+from libs.files.readers.csv_reader import CSVReader
+from libs.files.readers.filters import notnull
+from libs.files.readers.schema import EVENT_SCHEMA
+from libs.files.writers.csv import CSVWriter
+from libs.pipeline.stages import ChunkQueue, StageStats
+
+# Rows read from the raw files at a time
+DEFAULT_CHUNKSIZE = 50_000
+# Chunks buffered between the reading and each downstream stage
+DEFAULT_QUEUE_SIZE = 4
+
+# Columns of the processed event file
+PROCESSED_COLUMNS = [
+    'artist', 'firstName', 'gender', 'itemInSession', 'lastName', 'length',
+    'level', 'location', 'sessionId', 'song', 'userId',
+]
+
+
+# Query tables of the music app history
+EVENT_TABLES = [
+    TableDefinition.from_types(
+        'song_length',
+        {'sessionId': 'int', 'itemInSession': 'int', 'artist': 'text',
+         'song': 'text', 'length': 'float'},
+        partition_key=['sessionId', 'itemInSession'],
+    ),
+    TableDefinition.from_types(
+        'song_by_user_and_session',
+        {'userId': 'int', 'sessionId': 'int', 'itemInSession': 'int',
+         'artist': 'text', 'song': 'text', 'firstName': 'text',
+         'lastName': 'text'},
+        partition_key=['userId', 'sessionId'],
+        clustering_key=['itemInSession'],
+    ),
+    TableDefinition.from_types(
+        'users_by_song',
+        {'song': 'text', 'userId': 'int', 'firstName': 'text',
+         'lastName': 'text'},
+        partition_key=['song', 'userId'],
+    ),
+]
+
+
+@dataclass
+class PipelineReport:
+    """
+    Summary of a pipeline run.
+
+    Attributes:
+        stages: The statistics of each stage, reading first.
+        elapsed: The wall time of the run in seconds.
+    """
+    stages: List[StageStats]
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        lines = [f"{'stage':<36}{'rows':>10}{'busy (s)':>10}"
+                 f"{'wait (s)':>10}{'rows/s':>12}"]
+        for stats in self.stages:
+            lines.append(
+                f"{stats.name:<36}{stats.rows:>10}{stats.busy:>10.2f}"
+                f"{stats.wait:>10.2f}{stats.rows_per_second:>12.0f}"
+            )
+        lines.append(f"total elapsed: {self.elapsed:.2f}s")
+        return '\n'.join(lines)
+
+
+class EventPipeline:
+    """
+    ETL pipeline from the raw event files to the processed file and the
+    Cassandra query tables.
+
+    The raw files are read once, in chunks, and every chunk is fanned
+    out through bounded queues to the stages writing the processed file
+    and loading each table, which run concurrently on their own threads.
+    Each chunk is converted once into column arrays shared by all the
+    table loading stages.
+    """
+
+    def __init__(self, file_paths: List[str],
+                 manager: Optional[CassandraTableManager] = None,
+                 tables: List[TableDefinition] = EVENT_TABLES,
+                 processed_path: Optional[str] = None,
+                 writer: Optional[CSVWriter] = None,
+                 chunksize: int = DEFAULT_CHUNKSIZE,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 filters: Optional[List] = None,
+                 recreate_tables: bool = True):
+        """
+        Initialize a new instance of EventPipeline.
+
+        Args:
+            file_paths: The raw event files to read.
+            manager: The manager of the keyspace to load the tables into
+                     (default is None, which skips the loading).
+            tables: The tables to load (default is EVENT_TABLES).
+            processed_path: The path of the processed file to write
+                            (default is None, which skips writing it).
+            writer: The writer of the processed file (default is None,
+                    which uses a CSVWriter).
+            chunksize: The number of rows per chunk (default is 50000).
+            queue_size: The maximum number of chunks buffered for each
+                        downstream stage (default is 4).
+            filters: The filters applied to the raw rows (default is
+                     None, which keeps the song plays, the rows with an
+                     artist).
+            recreate_tables: Whether the tables are dropped and created
+                             before loading (default is True).
+        """
+        if chunksize <= 0:
+            raise ValueError("chunksize must be a positive integer.")
+        if queue_size <= 0:
+            raise ValueError("queue_size must be a positive integer.")
+        self.file_paths = list(file_paths)
+        self.manager = manager
+        self.loader = FanOutLoader(
+            manager, tables if manager is not None else [])
+        self.processed_path = processed_path
+        self.writer = writer or CSVWriter()
+        self.chunksize = chunksize
+        self.queue_size = queue_size
+        self.filters = filters if filters is not None \
+            else [notnull('artist')]
+        self.recreate_tables = recreate_tables
+
+    def columns(self) -> List[str]:
+        """
+        Get the columns read from the raw files: the ones of the
+        processed file and of the tables.
+        """
+        columns = list(PROCESSED_COLUMNS) if self.processed_path else []
+        columns.extend(column for column in self.loader.source_columns
+                       if column not in columns)
+        return columns
+
+    @property
+    def tables(self) -> List[TableDefinition]:
+        """
+        The tables loaded by the pipeline.
+        """
+        return self.loader.tables
+
+    def _sinks(self) -> Dict[str, Tuple[Callable[[Iterable], int], bool]]:
+        """
+        Get the downstream stages, by name, as functions consuming an
+        iterable of chunks and whether they take ColumnChunks rather
+        than DataFrames.
+        """
+        sinks = {}
+        if self.processed_path:
+            sinks[f"write {self.processed_path}"] = (
+                lambda chunks: self.writer.write_chunks(
+                    self.processed_path, chunks, columns=PROCESSED_COLUMNS),
+                False,
+            )
+        for table in self.tables:
+            sinks[f"load {table.name}"] = (
+                partial(self.loader.load_table, table), True)
+        return sinks
+
+    def run(self) -> PipelineReport:
+        """
+        Run the pipeline and wait for every stage to finish.
+
+        Returns:
+            PipelineReport: The timing and throughput of each stage.
+
+        Raises:
+            The first error raised by a stage, once all the stages have
+            stopped.
+        """
+        start = time.perf_counter()
+        if self.tables:
+            self.loader.create_tables(drop_existing=self.recreate_tables)
+
+        read_stats = StageStats('read')
+        sinks = self._sinks()
+        queues = {name: ChunkQueue(self.queue_size, StageStats(name))
+                  for name in sinks}
+        errors = []
+        stop = threading.Event()
+
+        threads = [
+            threading.Thread(
+                target=self._consume,
+                args=(sink, queues[name], errors, stop),
+                name=f"pipeline-{name}", daemon=True,
+            )
+            for name, (sink, _) in sinks.items()
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._produce(
+                read_stats,
+                [queues[name] for name, (_, columnar) in sinks.items()
+                 if not columnar],
+                [queues[name] for name, (_, columnar) in sinks.items()
+                 if columnar],
+                stop,
+            )
+        except Exception as error:
+            errors.insert(0, error)
+        finally:
+            for chunk_queue in queues.values():
+                chunk_queue.close()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+        return PipelineReport(
+            stages=[read_stats] + [q.stats for q in queues.values()],
+            elapsed=time.perf_counter() - start,
+        )
+
+    def _produce(self, stats: StageStats, frame_queues: List[ChunkQueue],
+                 column_queues: List[ChunkQueue],
+                 stop: threading.Event) -> None:
+        """
+        Read the raw files in chunks and fan them out to the queues, as
+        DataFrames or, converted once, as ColumnChunks.
+        """
+        start = time.perf_counter()
+        reader = CSVReader(self.file_paths, chunksize=self.chunksize,
+                           columns=self.columns(), filters=self.filters,
+                           dtype=EVENT_SCHEMA)
+        try:
+            for chunk in reader.iter_chunks():
+                if stop.is_set():
+                    break
+                stats.chunks += 1
+                stats.rows += len(chunk)
+                for chunk_queue in frame_queues:
+                    stats.wait += chunk_queue.put(chunk)
+                if not column_queues:
+                    continue
+                columns = ColumnChunk.from_frame(
+                    chunk, self.loader.source_columns,
+                    self.loader.source_types())
+                for chunk_queue in column_queues:
+                    stats.wait += chunk_queue.put(columns)
+        finally:
+            stats.elapsed = time.perf_counter() - start
+
+    def _consume(self, sink: Callable, chunk_queue: ChunkQueue,
+                 errors: list, stop: threading.Event) -> None:
+        """
+        Run a downstream stage over the chunks of its queue.
+        """
+        start = time.perf_counter()
+        try:
+            sink(chunk_queue)
+        except Exception as error:
+            errors.append(error)
+            stop.set()
+        finally:
+            chunk_queue.drain()
+            chunk_queue.stats.elapsed = time.perf_counter() - start
@@ -0,0 +1,109 @@
+import queue
+import time
+from dataclasses import dataclass
+from typing import Iterator
+import pandas as pd
+
+# Marks the end of the chunks in a queue
+END = object()
+
+
+@dataclass
+class StageStats:
+    """
+    Timing and throughput of a pipeline stage.
+
+    Attributes:
+        name: The name of the stage.
+        rows: The number of rows the stage processed.
+        chunks: The number of chunks the stage processed.
+        elapsed: The wall time of the stage in seconds.
+        wait: The time in seconds the stage spent blocked on its queues,
+              waiting for input or for room downstream.
+    """
+    name: str
+    rows: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    wait: float = 0.0
+
+    @property
+    def busy(self) -> float:
+        """
+        The time in seconds the stage spent working.
+        """
+        return max(self.elapsed - self.wait, 0.0)
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        The throughput of the stage while working, in rows per second.
+        """
+        return self.rows / self.busy if self.busy else 0.0
+
+
+class ChunkQueue:
+    """
+    Bounded queue of DataFrame chunks between two pipeline stages.
+
+    The producer blocks while the queue is full, so a slow consumer
+    holds back the reading instead of letting chunks pile up in memory.
+    """
+
+    def __init__(self, maxsize: int, stats: StageStats):
+        """
+        Initialize a new instance of ChunkQueue.
+
+        Args:
+            maxsize: The maximum number of chunks in the queue.
+            stats: The statistics of the consuming stage.
+        """
+        if maxsize <= 0:
+            raise ValueError("The queue size must be a positive integer.")
+        self.stats = stats
+        self.done = False
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, chunk: pd.DataFrame) -> float:
+        """
+        Add a chunk, waiting while the queue is full.
+
+        Args:
+            chunk: The DataFrame to add.
+
+        Returns:
+            float: The time in seconds spent waiting.
+        """
+        start = time.perf_counter()
+        self._queue.put(chunk)
+        return time.perf_counter() - start
+
+    def close(self) -> None:
+        """
+        Signal the consumer that no more chunks will be added.
+        """
+        self._queue.put(END)
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over the chunks until the queue is closed.
+        """
+        while not self.done:
+            start = time.perf_counter()
+            chunk = self._queue.get()
+            self.stats.wait += time.perf_counter() - start
+            if chunk is END:
+                self.done = True
+                return
+            self.stats.chunks += 1
+            self.stats.rows += len(chunk)
+            yield chunk
+
+    def drain(self) -> None:
+        """
+        Discard the remaining chunks until the queue is closed, so the
+        producer never blocks on a consumer that stopped early.
+        """
+        while not self.done:
+            if self._queue.get() is END:
+                self.done = True
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import threading
+import unittest
+from cassandra.query import BatchStatement
+from libs.databases.connectors.cassandra_db import CassandraConnector
+from libs.databases.managers.cassandra_db import CassandraTableManager
+from libs.databases.tests.fakes import FakeSession
+from libs.pipeline.pipeline import EVENT_TABLES, EventPipeline
+from libs.pipeline.stages import ChunkQueue, StageStats
+
+HEADER = ('artist,auth,firstName,gender,itemInSession,lastName,length,'
+          'level,location,method,page,registration,sessionId,song,status,'
+          'ts,userId\n')
+ROWS = [
+    'Mynt,Logged In,Celeste,F,2,Williams,166.94812,free,"Klamath Falls, OR",'
+    'PUT,NextSong,1.54108E+12,52,Playa Haters,200,1.54121E+12,53\n',
+    ',Logged In,Celeste,F,1,Williams,,free,"Klamath Falls, OR",'
+    'GET,Home,1.54108E+12,52,,200,1.54121E+12,53\n',
+    'Taylor Swift,Logged In,Celeste,F,3,Williams,230.47791,free,'
+    '"Klamath Falls, OR",PUT,NextSong,1.54108E+12,52,You Belong With Me,'
+    '200,1.54121E+12,53\n',
+    "Des'ree,Logged In,Kaylee,F,1,Summers,246.30812,free,"
+    '"Phoenix-Mesa-Scottsdale, AZ",PUT,NextSong,1.54034E+12,139,'
+    'You Gotta Be,200,1.54111E+12,8\n',
+]
+
+
+class TestEventPipeline(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_paths = []
+        for i, rows in enumerate([ROWS[:2], ROWS[2:]]):
+            file_path = os.path.join(self.directory.name, f"events-{i}.csv")
+            with open(file_path, 'w') as f:
+                f.write(HEADER + ''.join(rows))
+            self.file_paths.append(file_path)
+
+        self.connector = CassandraConnector(contact_points=['127.0.0.1'])
+        self.session = self.connector.session = FakeSession()
+        self.manager = CassandraTableManager(self.connector, 'keyspace')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def inserted(self, table_name):
+        rows = []
+        for statement, parameters in self.session.requests:
+            if isinstance(statement, BatchStatement):
+                queries = [str(s) for s in statement._statements_and_parameters]
+                if any(f"INSERT INTO {table_name} " in q for q in queries):
+                    rows.extend(statement._statements_and_parameters)
+            elif f"INSERT INTO {table_name} " in str(statement):
+                rows.append(parameters)
+        return rows
+
+    def test_run(self):
+        processed_path = os.path.join(self.directory.name, 'processed',
+                                      'events.csv')
+        pipeline = EventPipeline(self.file_paths, manager=self.manager,
+                                 processed_path=processed_path,
+                                 chunksize=2, queue_size=1)
+
+        report = pipeline.run()
+
+        with open(processed_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'artist,firstName,gender,itemInSession,'
+                                   'lastName,length,level,location,'
+                                   'sessionId,song,userId')
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(set(self.manager.tables),
+                         {table.name for table in EVENT_TABLES})
+        for table in EVENT_TABLES:
+            self.assertEqual(len(self.inserted(table.name)), 3)
+
+        self.assertEqual([stats.name for stats in report.stages], [
+            'read', f"write {processed_path}", 'load song_length',
+            'load song_by_user_and_session', 'load users_by_song',
+        ])
+        self.assertTrue(all(stats.rows == 3 for stats in report.stages))
+        self.assertEqual(report.stages[0].chunks, 2)
+        self.assertIn('load users_by_song', str(report))
+
+    def test_song_length_values(self):
+        pipeline = EventPipeline(self.file_paths[1:], manager=self.manager,
+                                 tables=EVENT_TABLES[:1])
+
+        pipeline.run()
+
+        self.assertIn((52, 3, 'Taylor Swift', 'You Belong With Me',
+                       230.47791), self.inserted('song_length'))
+
+    def test_stage_error(self):
+        self.session.prepare.side_effect = RuntimeError("unavailable")
+        processed_path = os.path.join(self.directory.name, 'events.csv')
+        pipeline = EventPipeline(self.file_paths * 10, manager=self.manager,
+                                 processed_path=processed_path,
+                                 chunksize=1, queue_size=1)
+
+        with self.assertRaisesRegex(RuntimeError, "unavailable"):
+            pipeline.run()
+        self.assertEqual([thread.name for thread in threading.enumerate()
+                          if thread.name.startswith('pipeline-')], [])
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            EventPipeline(self.file_paths, chunksize=0)
+        with self.assertRaises(ValueError):
+            EventPipeline(self.file_paths, queue_size=0)
+
+
+class TestChunkQueue(unittest.TestCase):
+    def test_drain(self):
+        chunk_queue = ChunkQueue(2, StageStats('load'))
+        chunk_queue.put([1, 2])
+        chunk_queue.close()
+
+        chunk_queue.drain()
+
+        self.assertTrue(chunk_queue.done)
+        self.assertEqual(list(chunk_queue), [])
+        self.assertEqual(chunk_queue.stats.rows, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()